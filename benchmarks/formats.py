@@ -0,0 +1,257 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+
+from modules.format_index import FormatIndex, format_string
+
+# region Formatos sintéticos
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+VIDEO_CODECS = (
+    ("avc1.640028", "mp4"),
+    ("hev1.1.6.L120.90", "mp4"),
+    ("vp9", "webm"),
+    ("av01.0.08M.08", "mp4"),
+)
+FPS = (24, 30, 60)
+
+
+def format_ladder(count: int = 200, seed: int = 0) -> list:
+    """
+    Synthetic format list like the ones of YouTube: audio-only formats
+    followed by video formats from the lowest to the highest quality.
+    """
+    generator = random.Random(seed)
+    formats = []
+    for index, (acodec, ext) in enumerate(
+        (("mp4a.40.2", "m4a"), ("opus", "webm")) * 4
+    ):
+        formats.append(
+            {
+                "format_id": f"a{index}",
+                "format_note": "Default, high" if index == 2 else "low",
+                "resolution": "audio only",
+                "vcodec": "none",
+                "acodec": acodec,
+                "ext": ext,
+                "video_ext": "none",
+                "abr": 48 + 16 * index,
+            }
+        )
+
+    while len(formats) < count:
+        height = generator.choice(HEIGHTS)
+        vcodec, ext = generator.choice(VIDEO_CODECS)
+        formats.append(
+            {
+                "format_id": str(len(formats)),
+                "resolution": f"{height * 16 // 9}x{height}",
+                "height": height,
+                "fps": generator.choice(FPS),
+                "vcodec": vcodec,
+                "acodec": "none",
+                "ext": ext,
+                "video_ext": ext,
+                "tbr": height * 2.5,
+            }
+        )
+
+    # O yt-dlp entrega os formatos da pior para a melhor qualidade
+    formats[8:] = sorted(formats[8:], key=lambda f: (f["height"], f["fps"], f["tbr"]))
+    return formats
+
+
+# endregion
+
+
+# region Implementação anterior (referência)
+def legacy_find_best(formats, resolucao_desejada, codec_desejado, formato_desejado):
+    """find_best_video_format before the format index (sorts on every format)."""
+    codec_map = {
+        "h264": ["avc", "h264"],
+        "h265": ["hev", "h265", "hevc"],
+        "vp9": ["vp9"],
+        "av1": ["av01", "av1"],
+    }
+    formatos_validos = []
+    for fmt in formats:
+        vcodec = fmt.get("vcodec", "").lower()
+        altura = fmt.get("height", 0)
+        ext = fmt.get("ext", "").lower()
+        if vcodec == "none" or not altura:
+            continue
+
+        codec_match = False
+        if codec_desejado.lower() in codec_map:
+            for codec_termo in codec_map[codec_desejado.lower()]:
+                if codec_termo in vcodec:
+                    codec_match = True
+                    break
+
+        resolucao_match = altura == resolucao_desejada
+        formato_match = ext == formato_desejado.lower()
+        score = 0
+        if resolucao_match:
+            score += 100
+        if codec_match:
+            score += 50
+        if formato_match:
+            score += 25
+        score += altura * 0.01
+
+        if score > 0:
+            formatos_validos.append(
+                {
+                    "format_id": fmt.get("format_id"),
+                    "height": altura,
+                    "vcodec": vcodec,
+                    "ext": ext,
+                    "score": score,
+                    "resolucao_match": resolucao_match,
+                    "codec_match": codec_match,
+                    "formato_match": formato_match,
+                }
+            )
+            formatos_validos.sort(key=lambda x: x["score"], reverse=True)
+    return formatos_validos
+
+
+def legacy_presets(formats):
+    """Presets of extract_video_formats before the format index (two scans)."""
+    codec_map = {"vp09": "VP9", "avc": "H.264", "av01": "AV1", "vp8": "VP8"}
+    audio_id = None
+    for item in formats:
+        if (
+            item.get("resolution") == "audio only"
+            and item.get("format_note") == "Default, high"
+        ):
+            audio_id = item.get("format_id")
+            break
+
+    presets = []
+    for item in formats:
+        if item.get("video_ext") == "none":
+            continue
+        vcodec_id = item.get("vcodec", "")
+        vcodec = next(
+            (codec_map[key] for key in codec_map if key in vcodec_id), "Unknown"
+        )
+        if not all(k in item for k in ["format_id", "height", "video_ext", "fps"]):
+            continue
+        video_format = {
+            "id": item["format_id"],
+            "resolucao": int(item["height"]),
+            "ext": item["video_ext"],
+            "vcodec": vcodec,
+            "FPS": int(item["fps"]),
+        }
+        video_format["desc"] = (
+            f"{video_format['resolucao']}p {video_format['vcodec']} "
+            f"{video_format['FPS']}FPS.{video_format['ext']}"
+        )
+        presets.append(video_format)
+    presets.sort(key=lambda x: (x["resolucao"], x["FPS"]), reverse=True)
+    return presets, audio_id
+
+
+# endregion
+
+
+QUERY = (1080, "h264", "mp4")
+
+
+def check(formats: list):
+    """The index must rank and list the formats exactly like the old code."""
+    old = [f["format_id"] for f in legacy_find_best(formats, *QUERY)]
+    new = [f["format_id"] for f in FormatIndex(formats).best_video(*QUERY)]
+    if old != new:
+        raise AssertionError("the format index ranks the formats differently")
+
+    old_presets, old_audio = legacy_presets(formats)
+    index = FormatIndex(formats)
+    if [p["id"] for p in old_presets] != [p.format_id for p in index.presets()]:
+        raise AssertionError("the format index lists other presets")
+    if old_audio != index.default_audio_id:
+        raise AssertionError("the format index found another default audio")
+
+
+def measure(function, repeat: int, number: int) -> float:
+    """Median time of one call, in microseconds."""
+    times = timeit.repeat(function, repeat=repeat, number=number)
+    return round(statistics.median(times) / number * 1e6, 2)
+
+
+def run(count: int, repeat: int, number: int) -> dict:
+    formats = format_ladder(count)
+    check(formats)
+    index = FormatIndex(formats)
+
+    def legacy_item():
+        # Um item: presets da busca e o formato personalizado
+        legacy_presets(formats)
+        ranked = legacy_find_best(formats, *QUERY)
+        return format_string(ranked)
+
+    def indexed_item():
+        item_index = FormatIndex(formats)
+        item_index.presets()
+        return item_index.format_string(*QUERY)
+
+    results = {
+        "find_best/legacy": measure(
+            lambda: legacy_find_best(formats, *QUERY), repeat, number
+        ),
+        "find_best/index_build+query": measure(
+            lambda: FormatIndex(formats).best_video(*QUERY), repeat, number
+        ),
+        "find_best/index_cached_query": measure(
+            lambda: index.best_video(*QUERY), repeat, number
+        ),
+        "presets/legacy": measure(lambda: legacy_presets(formats), repeat, number),
+        "presets/index": measure(index.presets, repeat, number),
+        "item/legacy": measure(legacy_item, repeat, number),
+        "item/index": measure(indexed_item, repeat, number),
+    }
+    return {"formats": count, "unit": "microseconds per call", "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.formats",
+        description="Microbenchmarks of the format selection on synthetic format "
+        "ladders, old implementation against the format index. Results are "
+        "written as JSON.",
+    )
+    parser.add_argument(
+        "-f",
+        "--formats",
+        type=int,
+        action="append",
+        help="formats in the ladder; can be repeated (default: 50, 200)",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=5,
+        help="timing runs, the median is kept (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=200,
+        help="calls in each timing run (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    results = [
+        run(count, args.repeat, args.number) for count in args.formats or (50, 200)
+    ]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import functools
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MediaRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the synthetic media with byte ranges, a fixed latency before each
+    response and a bandwidth limit per connection.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    TYPES = {
+        ".mp4": "video/mp4",
+        ".m4a": "audio/mp4",
+        ".m4s": "video/iso.segment",
+        ".ts": "video/mp2t",
+        ".mpd": "application/dash+xml",
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".rss": "application/rss+xml",
+    }
+
+    def log_message(self, format, *args):
+        pass
+
+    def guess_type(self, path):
+        return self.TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and server.ranges:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), end)
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            self.send_body(f, end - start + 1)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def send_body(self, f, length: int):
+        bandwidth = self.server.bandwidth
+        started = time.monotonic()
+        sent = 0
+        try:
+            while sent < length:
+                data = f.read(min(self.CHUNK_SIZE, length - sent))
+                if not data:
+                    break
+                self.wfile.write(data)
+                sent += len(data)
+                if bandwidth:
+                    # Espera até o tempo que esses bytes levariam na banda pedida
+                    delay = sent / bandwidth - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class MediaServer:
+    """
+    Local HTTP server with synthetic media for the benchmarks, without any
+    network access.
+
+    The files are created in a temporary folder from a fixed seed, so every
+    run downloads exactly the same bytes:
+
+    - ``/progressive/N.mp4``: single files, downloaded by the HTTP downloader
+      (split in byte ranges by the RangeSplitDownloader)
+    - ``/dash/manifest.mpd``: DASH with a list of fragments
+    - ``/hls/master.m3u8``: HLS with a master and a media playlist
+    - ``/playlist.rss``: RSS feed whose items are the progressive files,
+      which yt-dlp's generic extractor reads as a playlist
+    - ``/audio.m4a``: real AAC audio, only when ffmpeg is available
+
+    Args:
+        latency (float): Seconds before each response
+        bandwidth (int): Bytes per second of each connection (0 = unlimited)
+        progressive_size (int): Size of each progressive file
+        progressive_count (int): Number of progressive files (playlist items)
+        fragment_size (int): Size of each DASH/HLS fragment
+        fragment_count (int): Number of DASH/HLS fragments
+        ffmpeg (str, optional): ffmpeg executable used to create the audio
+        ranges (bool): Answer range requests with 206; False sends the whole
+            file with 200, like servers without range support
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        progressive_size: int = 32 * 1024 * 1024,
+        progressive_count: int = 8,
+        fragment_size: int = 512 * 1024,
+        fragment_count: int = 40,
+        ffmpeg: str = None,
+        ranges: bool = True,
+    ):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.progressive_size = progressive_size
+        self.progressive_count = progressive_count
+        self.fragment_size = fragment_size
+        self.fragment_count = fragment_count
+        self.ffmpeg = ffmpeg
+        self.ranges = ranges
+        self.directory = None
+        self.has_audio = False
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix="easytuber-bench-")
+        handler = functools.partial(MediaRequestHandler, directory=self.directory)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._server.latency = self.latency
+        self._server.bandwidth = self.bandwidth
+        self._server.ranges = self.ranges
+
+        # Depois de abrir a porta: o RSS tem o endereço dos arquivos
+        self.create_media()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    # region Mídia sintética
+    def write_random(self, path: str, size: int, seed):
+        # random.Random com semente: os mesmos bytes em todas as execuções
+        generator = random.Random(seed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            left = size
+            while left > 0:
+                block = min(left, 1024 * 1024)
+                f.write(generator.randbytes(block))
+                left -= block
+
+    def create_media(self):
+        for index in range(1, self.progressive_count + 1):
+            self.write_random(
+                os.path.join(self.directory, "progressive", f"{index}.mp4"),
+                self.progressive_size,
+                f"progressive-{index}",
+            )
+
+        self.create_playlist()
+        self.create_dash()
+        self.create_hls()
+        self.has_audio = self.create_audio()
+
+    def create_playlist(self):
+        items = "".join(
+            f"<item><title>Video {index}</title><guid>video-{index}</guid>"
+            f'<enclosure url="{self.url(f"progressive/{index}.mp4")}" '
+            f'type="video/mp4" length="{self.progressive_size}"/></item>'
+            for index in range(1, self.progressive_count + 1)
+        )
+        with open(os.path.join(self.directory, "playlist.rss"), "w") as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Benchmark playlist</title>{items}</channel></rss>"
+            )
+
+    def create_dash(self):
+        directory = os.path.join(self.directory, "dash")
+        self.write_random(os.path.join(directory, "init.mp4"), 4096, "dash-init")
+        segments = ""
+        for index in range(1, self.fragment_count + 1):
+            self.write_random(
+                os.path.join(directory, f"seg{index}.m4s"),
+                self.fragment_size,
+                f"dash-{index}",
+            )
+            segments += f'<SegmentURL media="seg{index}.m4s"/>'
+
+        duration = self.fragment_count * 2
+        manifest = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" '
+            f'mediaPresentationDuration="PT{duration}S" minBufferTime="PT2S" '
+            'profiles="urn:mpeg:dash:profile:isoff-main:2011"><Period>'
+            '<AdaptationSet mimeType="video/mp4" segmentAlignment="true">'
+            '<Representation id="720p" bandwidth="2000000" width="1280" '
+            'height="720" frameRate="30" codecs="avc1.64001f,mp4a.40.2">'
+            '<SegmentList timescale="1" duration="2">'
+            f'<Initialization sourceURL="init.mp4"/>{segments}</SegmentList>'
+            "</Representation></AdaptationSet></Period></MPD>"
+        )
+        with open(os.path.join(directory, "manifest.mpd"), "w") as f:
+            f.write(manifest)
+
+    def create_hls(self):
+        directory = os.path.join(self.directory, "hls")
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-TARGETDURATION:2",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for index in range(self.fragment_count):
+            self.write_random(
+                os.path.join(directory, f"seg{index}.ts"),
+                self.fragment_size,
+                f"hls-{index}",
+            )
+            lines += ["#EXTINF:2.0,", f"seg{index}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        with open(os.path.join(directory, "720p.m3u8"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        master = (
+            "#EXTM3U\n"
+            '#EXT-X-STREAM-INF:BANDWIDTH=2000000,RESOLUTION=1280x720,FRAME-RATE=30,'
+            'CODECS="avc1.64001f,mp4a.40.2"\n'
+            "720p.m3u8\n"
+        )
+        with open(os.path.join(directory, "master.m3u8"), "w") as f:
+            f.write(master)
+
+    def create_audio(self) -> bool:
+        """Creates a real audio file (a sine wave), which ffmpeg can convert."""
+        if not self.ffmpeg:
+            return False
+        try:
+            subprocess.run(
+                [
+                    self.ffmpeg,
+                    "-v",
+                    "error",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "sine=frequency=440:duration=120",
+                    "-c:a",
+                    "aac",
+                    "-b:a",
+                    "128k",
+                    os.path.join(self.directory, "audio.m4a"),
+                ],
+                check=True,
+                capture_output=True,
+            )
+            return True
+        except Exception as e:
+            print(f"Erro ao criar o áudio do benchmark: {e}")
+            return False
+
+    # endregion
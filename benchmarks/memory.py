@@ -0,0 +1,176 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import tracemalloc
+
+from benchmarks.formats import format_ladder
+from benchmarks.suite import peak_rss
+from modules.format_index import FormatIndex
+from modules.records import Entry
+
+# Cabeçalhos iguais aos que o yt-dlp coloca em cada formato
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-us,en;q=0.5",
+    "Sec-Fetch-Mode": "navigate",
+}
+
+
+def raw_info(index: int, formats: int) -> dict:
+    """
+    Info dict of one video as yt-dlp returns it: every format with its
+    signed URL, headers and the other fields the application never reads.
+    """
+    ladder = format_ladder(formats, seed=index)
+    for fmt in ladder:
+        fmt.update(
+            url=f"https://rr{index % 8}---sn-example.googlevideo.com/videoplayback?"
+            f"id={index}&itag={fmt['format_id']}&expire=1700000000&sig={'A' * 600}",
+            protocol="https",
+            http_headers=dict(HTTP_HEADERS),
+            format=f"{fmt['format_id']} - {fmt.get('resolution')}",
+            filesize_approx=1024 * 1024 * (index % 50 + 1),
+            downloader_options={"http_chunk_size": 10485760},
+            quality=fmt.get("height") or 0,
+            has_drm=False,
+            source_preference=-1,
+            dynamic_range="SDR",
+            container=f"{fmt['ext']}_dash",
+        )
+    return {
+        "id": f"video{index:05d}",
+        "title": f"Video {index}",
+        "webpage_url": f"https://www.youtube.com/watch?v=video{index:05d}",
+        "formats": ladder,
+    }
+
+
+def flat_entry(index: int) -> dict:
+    return {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": f"video{index:05d}",
+        "url": f"https://www.youtube.com/watch?v=video{index:05d}",
+        "title": f"Video {index}",
+        "description": "Description " * 20,
+        "duration": 600,
+        "channel_id": "UC" + "x" * 22,
+        "channel": "Channel",
+        "view_count": 1000,
+        "thumbnails": [
+            {"url": f"https://i.ytimg.com/vi/video{index:05d}/{name}.jpg", "height": h}
+            for name, h in (("default", 90), ("mqdefault", 180), ("hqdefault", 360))
+        ],
+    }
+
+
+def hold_raw(entries: int, formats: int) -> list:
+    """What was kept per entry before the records: raw formats and preset dicts."""
+    kept = []
+    for index in range(entries):
+        info = raw_info(index, formats)
+        presets = [
+            {
+                "id": fmt["format_id"],
+                "resolucao": int(fmt["height"]),
+                "ext": fmt["video_ext"],
+                "vcodec": "H.264",
+                "FPS": int(fmt["fps"]),
+                "desc": f"{fmt['height']}p H.264 {fmt['fps']}FPS.{fmt['ext']}",
+            }
+            for fmt in info["formats"]
+            if fmt.get("height")
+        ]
+        kept.append((flat_entry(index), info["formats"], presets))
+    return kept
+
+
+def hold_records(entries: int, formats: int) -> list:
+    """What is kept per entry with the records: the raw info dict is dropped."""
+    kept = []
+    for index in range(entries):
+        format_index = FormatIndex(raw_info(index, formats)["formats"])
+        kept.append(
+            (
+                Entry.from_info(flat_entry(index)),
+                format_index.formats,
+                format_index.presets(),
+            )
+        )
+    return kept
+
+
+MODES = {"raw": hold_raw, "records": hold_records}
+
+
+def measure(mode: str, entries: int, formats: int) -> dict:
+    """Runs one mode (in a fresh process) and returns its memory use."""
+    tracemalloc.start()
+    kept = MODES[mode](entries, formats)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "entries": len(kept),
+        "retained_bytes": current,
+        "traced_peak_bytes": peak,
+        "peak_rss": peak_rss(),
+    }
+
+
+def _child(mode, entries, formats, results):
+    results.put(measure(mode, entries, formats))
+
+
+def run_isolated(mode: str, entries: int, formats: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(mode, entries, formats, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.memory",
+        description="Memory held for the formats and entries of a synthetic "
+        "playlist, raw yt-dlp dicts against the compact records. Each mode runs "
+        "in its own process; results are written as JSON.",
+    )
+    parser.add_argument(
+        "-e",
+        "--entries",
+        type=int,
+        default=1000,
+        help="playlist entries (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-f",
+        "--formats",
+        type=int,
+        default=200,
+        help="formats of each entry (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        action="append",
+        choices=sorted(MODES),
+        help="mode to run; can be repeated (default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    results = [
+        run_isolated(mode, args.entries, args.formats)
+        for mode in args.mode or list(MODES)
+    ]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.media_server import MediaServer
+from benchmarks.suite import BenchmarkEngine, peak_rss
+from modules.language_manager import TranslationManager
+
+# Pontos da playlist em que a memória é comparada
+CHECKPOINTS = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+
+def current_rss():
+    """Resident memory of this process now, in bytes (None outside Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class MemorySampler(threading.Thread):
+    """
+    Samples the traced and resident memory while the playlist downloads,
+    keeping the first sample taken after each checkpoint of ``total`` items.
+    """
+
+    def __init__(self, job, total: int, interval: float, traced: bool):
+        super().__init__(daemon=True)
+        self.job = job
+        self.total = total
+        self.interval = interval
+        self.traced = traced
+        self.samples = {}
+        self.traced_peak = 0
+        self.stopped = threading.Event()
+
+    def sample(self):
+        done = len(self.job.done_items)
+        if self.traced:
+            self.traced_peak = max(self.traced_peak, tracemalloc.get_traced_memory()[0])
+        for checkpoint in CHECKPOINTS:
+            key = f"{checkpoint:.0%}"
+            if key not in self.samples and done >= checkpoint * self.total:
+                # Só o que continua vivo: o YoutubeDL de cada item forma ciclos
+                # que esperam o coletor
+                gc.collect()
+                traced = tracemalloc.get_traced_memory()[0] if self.traced else None
+                self.samples[key] = {
+                    "items": done,
+                    "traced_bytes": traced,
+                    "rss": current_rss(),
+                }
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+def run_playlist(url: str, entries: int, settings: dict) -> dict:
+    """Downloads the whole playlist once and returns its memory use (in a fresh process)."""
+    if settings["tracemalloc"]:
+        tracemalloc.start()
+
+    translator = TranslationManager(None)
+    translator.current_language = "en_US"
+    engine = BenchmarkEngine(translator, "best")
+    engine.set_playlist_workers(settings["playlist_workers"])
+    engine.range_connections = 1
+
+    download_path = tempfile.mkdtemp(prefix="easytuber-bench-out-")
+    options = {
+        "url": url,
+        "download_path": download_path,
+        "ffmpeg_path": "",
+        "media": translator.get_text("video"),
+        "format": "mp4",
+        "quality": "1080",
+        "playlist": True,
+        "playlist_items": "",
+        "playlist_reverse": False,
+        "playlist_random": False,
+    }
+
+    start = time.perf_counter()
+    try:
+        job = engine.submit("basic", options)
+        sampler = MemorySampler(
+            job, entries, settings["interval"], settings["tracemalloc"]
+        )
+        sampler.start()
+        engine.finished.wait()
+        wall_time = time.perf_counter() - start
+        sampler.stop()
+    finally:
+        engine.close_process_pool()
+        shutil.rmtree(download_path, ignore_errors=True)
+
+    first, last = sampler.samples.get("10%"), sampler.samples.get("100%")
+    growth = {}
+    if first and last:
+        # Memória a mais entre 10% e o fim da playlist, por item
+        items = max(last["items"] - first["items"], 1)
+        for field in ("traced_bytes", "rss"):
+            if first[field] is not None and last[field] is not None:
+                growth[field] = round((last[field] - first[field]) / items, 1)
+
+    status, error = job.status, job.error
+    downloaded = len(job.done_items)
+    if status == "finished" and downloaded != entries:
+        status, error = "error", f"{downloaded} of {entries} items downloaded"
+
+    return {
+        "status": status,
+        "error": error,
+        "entries": entries,
+        "downloaded": downloaded,
+        "wall_time": round(wall_time, 2),
+        "traced_peak_bytes": sampler.traced_peak if settings["tracemalloc"] else None,
+        "peak_rss": peak_rss(),
+        "growth_per_item": growth,
+        "checkpoints": sampler.samples,
+    }
+
+
+def _child(url, entries, settings, results):
+    try:
+        results.put(run_playlist(url, entries, settings))
+    except Exception as e:
+        results.put({"status": "error", "error": str(e)})
+
+
+def run_isolated(url: str, entries: int, settings: dict) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(url, entries, settings, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.playlist",
+        description="Memory of a long playlist download: a synthetic playlist of "
+        "small files is served locally and downloaded end to end, sampling the "
+        "traced memory and the RSS as the items finish. A bounded pipeline keeps "
+        "both flat after the first items. Results are written as JSON.",
+    )
+    parser.add_argument(
+        "-e",
+        "--entries",
+        type=int,
+        default=10000,
+        help="playlist entries (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=4,
+        metavar="KIB",
+        help="size of each file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--playlist-workers",
+        type=int,
+        default=4,
+        help="playlist items downloaded at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="seconds between memory samples (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        action="store_true",
+        help="only measure the RSS (tracemalloc slows the run down)",
+    )
+    args = parser.parse_args(argv)
+
+    settings = {
+        "playlist_workers": args.playlist_workers,
+        "interval": args.interval,
+        "tracemalloc": not args.no_tracemalloc,
+    }
+    with MediaServer(
+        progressive_size=args.size * 1024,
+        progressive_count=args.entries,
+        fragment_count=1,
+        fragment_size=1024,
+    ) as server:
+        result = run_isolated(server.url("playlist.rss"), args.entries, settings)
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("status") == "finished" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import yt_dlp
+
+from benchmarks.media_server import MediaServer
+from modules.download_engine import DownloadEngine
+from modules.language_manager import TranslationManager
+from modules.utils import get_ffmpeg_path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# region Cenários
+SCENARIOS = {
+    "single_progressive": {
+        "path": "progressive/1.mp4",
+        "media": "video",
+        # Arquivo direto, sem altura: o filtro de qualidade não se aplica
+        "format": "best",
+    },
+    "single_dash": {"path": "dash/manifest.mpd", "media": "video"},
+    "single_hls": {"path": "hls/master.m3u8", "media": "video"},
+    "playlist": {
+        "path": "playlist.rss",
+        "media": "video",
+        "playlist": True,
+        "format": "best",
+    },
+    "audio_extraction": {"path": "audio.m4a", "media": "audio", "ffmpeg": True},
+}
+
+
+class BenchmarkEngine(DownloadEngine):
+    """
+    Headless engine that runs one job through the same download paths as the
+    interface and measures it.
+    """
+
+    def __init__(self, translator, format=None):
+        super().__init__(translator)
+        self.format = format
+        self.first_byte = None
+        self.finished = threading.Event()
+
+    def enqueue(self, job):
+        # Aplicadas por cima das opções do job, também nos processos de trabalho
+        # A mídia sintética não é um vídeo de verdade, o ffmpeg não a corrige
+        job.resume_opts = {"noprogress": True, "fixup": "never"}
+        if self.format:
+            job.resume_opts["format"] = self.format
+        return super().enqueue(job)
+
+    def progress_hooks(self, job, d):
+        # Primeiro hook com bytes recebidos; downloads rápidos só chegam no "finished"
+        if self.first_byte is None and d.get("downloaded_bytes"):
+            self.first_byte = time.perf_counter()
+        super().progress_hooks(job, d)
+
+    def on_job_update(self, job):
+        # Nos processos de trabalho os hooks rodam no outro processo
+        if self.first_byte is None and job.progress > 0.01:
+            self.first_byte = time.perf_counter()
+
+    def on_job_done(self, job):
+        self.finished.set()
+
+
+def cpu_time() -> float:
+    """CPU time of this process and of its finished children (ffmpeg)."""
+    if resource is None:
+        return time.process_time()
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def peak_rss():
+    """Peak resident memory of this process, in bytes (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def output_files(folder: str) -> list:
+    """Files downloaded into the folder, without the partial ones."""
+    return [
+        os.path.join(root, name)
+        for root, _, files in os.walk(folder)
+        for name in files
+        if not name.endswith((".part", ".ytdl"))
+    ]
+
+
+def run_scenario(name: str, url: str, settings: dict) -> dict:
+    """Runs one scenario and returns its measurements (in a fresh process)."""
+    scenario = SCENARIOS[name]
+    translator = TranslationManager(None)
+    translator.current_language = "en_US"
+
+    engine = BenchmarkEngine(translator, scenario.get("format"))
+    engine.set_playlist_workers(settings["playlist_workers"])
+    engine.range_connections = settings["range_connections"]
+    engine.set_worker_mode(settings["worker_mode"])
+
+    download_path = tempfile.mkdtemp(prefix="easytuber-bench-out-")
+    if scenario["media"] == "audio":
+        media, media_format = translator.get_text("audio"), "mp3"
+    else:
+        media, media_format = translator.get_text("video"), "mp4"
+    options = {
+        "url": url,
+        "download_path": download_path,
+        "ffmpeg_path": settings["ffmpeg"] or "",
+        "media": media,
+        "format": media_format,
+        "quality": "1080",
+        "playlist": scenario.get("playlist", False),
+        "playlist_items": "",
+        "playlist_reverse": False,
+        "playlist_random": False,
+    }
+
+    cpu_start = cpu_time()
+    start = time.perf_counter()
+    try:
+        job = engine.submit("basic", options)
+        engine.finished.wait()
+        wall_time = time.perf_counter() - start
+        cpu = cpu_time() - cpu_start
+        outputs = output_files(download_path)
+    finally:
+        engine.close_process_pool()
+        shutil.rmtree(download_path, ignore_errors=True)
+
+    status, error = job.status, job.error
+    if status == "finished" and not outputs:
+        # Um download que não gerou arquivo não vale como medida
+        status, error = "error", "no file was downloaded"
+
+    metrics = job.metrics.to_dict()
+    downloaded = metrics["counters"]["bytes"]
+    return {
+        "status": status,
+        "error": error,
+        "files": len(outputs),
+        "wall_time": round(wall_time, 4),
+        "bytes": downloaded,
+        "throughput": round(downloaded / wall_time, 1) if wall_time else None,
+        "ttfb": (
+            round(engine.first_byte - start, 4)
+            if engine.first_byte is not None
+            else None
+        ),
+        "cpu_time": round(cpu, 4),
+        "peak_rss": peak_rss(),
+        "phases": metrics["phases"],
+    }
+
+
+def _child(name, url, settings, results):
+    try:
+        results.put(run_scenario(name, url, settings))
+    except Exception as e:
+        results.put({"status": "error", "error": str(e)})
+
+
+def run_isolated(name: str, url: str, settings: dict) -> dict:
+    """
+    Runs the scenario in a new process, so the peak RSS and the CPU time are
+    only of that run.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(name, url, settings, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+# endregion
+
+
+# region Resultados
+SUMMARY_FIELDS = ("wall_time", "throughput", "ttfb", "cpu_time", "peak_rss")
+
+
+def summarize(runs: list) -> dict:
+    """Median of each measurement over the successful runs."""
+    ok = [run for run in runs if run.get("status") == "finished"]
+    summary = {"runs": len(runs), "failed": len(runs) - len(ok)}
+    for field in SUMMARY_FIELDS:
+        values = [run[field] for run in ok if run.get(field) is not None]
+        summary[field] = statistics.median(values) if values else None
+    return summary
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Lines comparing the medians of two result files."""
+    lines = []
+    for name, scenario in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or "median" not in scenario or "median" not in old:
+            continue
+        for field in SUMMARY_FIELDS:
+            new_value = scenario["median"].get(field)
+            old_value = old["median"].get(field)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            lines.append(
+                f"{name:20} {field:11} {old_value:>14.4f} -> {new_value:>14.4f} "
+                f"({change:+.1%})"
+            )
+    return lines
+
+
+# endregion
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Offline end-to-end download benchmarks against a local media "
+        "server. Results are written as JSON.",
+    )
+    parser.add_argument(
+        "-s",
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run; can be repeated (default: all)",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs of each scenario (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        metavar="MS",
+        help="latency of each response, in milliseconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=int,
+        default=0,
+        metavar="KIB",
+        help="bandwidth of each connection in KiB/s, 0 for unlimited "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=32,
+        metavar="MIB",
+        help="size of each progressive file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--range-connections",
+        type=int,
+        default=4,
+        help="connections per progressive file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--playlist-workers",
+        type=int,
+        default=3,
+        help="playlist items downloaded at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="run the jobs in a worker process (the CPU time and peak RSS then "
+        "cover only the coordinating process)",
+    )
+    parser.add_argument("--ffmpeg", default=get_ffmpeg_path(), help="path of ffmpeg")
+    parser.add_argument(
+        "-o", "--output", help="JSON file of the results (default: stdout)"
+    )
+    parser.add_argument(
+        "--compare", metavar="FILE", help="results of a previous run to compare with"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    names = args.scenario or list(SCENARIOS)
+    settings = {
+        "ffmpeg": args.ffmpeg,
+        "range_connections": args.range_connections,
+        "playlist_workers": args.playlist_workers,
+        "worker_mode": "process" if args.processes else "thread",
+    }
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "yt_dlp": yt_dlp.version.__version__,
+        "config": {
+            "repeat": args.repeat,
+            "latency_ms": args.latency,
+            "bandwidth_kib": args.bandwidth,
+            "size_mib": args.size,
+            **settings,
+        },
+        "scenarios": {},
+    }
+
+    with MediaServer(
+        latency=args.latency / 1000,
+        bandwidth=args.bandwidth * 1024,
+        progressive_size=args.size * 1024 * 1024,
+        ffmpeg=args.ffmpeg,
+    ) as server:
+        for name in names:
+            scenario = SCENARIOS[name]
+            if scenario.get("ffmpeg") and not server.has_audio:
+                results["scenarios"][name] = {"skipped": "ffmpeg not found"}
+                print(f"{name}: skipped (ffmpeg not found)", file=sys.stderr)
+                continue
+
+            runs = []
+            for run in range(args.repeat):
+                result = run_isolated(name, server.url(scenario["path"]), settings)
+                runs.append(result)
+                print(
+                    f"{name} #{run + 1}: {result['status']} "
+                    f"{result.get('wall_time')}s {result.get('error') or ''}",
+                    file=sys.stderr,
+                )
+            results["scenarios"][name] = {"median": summarize(runs), "runs": runs}
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in compare(results, baseline):
+            print(line, file=sys.stderr)
+
+    failed = any(
+        scenario.get("median", {}).get("failed")
+        for scenario in results["scenarios"].values()
+    )
+    return 1 if failed else 0
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aplicativo: EasyTuber
+Descrição: Downloads sem a janela, pela linha de comando (progresso em JSONL)
+Uso: python cli.py URL [URL...] ou python cli.py -i urls.txt
+"""
+
+import multiprocessing
+import sys
+from modules.cli import main
+
+
+if __name__ == "__main__":
+    # Necessário para os processos de download no executável (PyInstaller)
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import sys
+import time
 import webbrowser
 import customtkinter as ctk
 from PIL import Image, ImageTk
@@ -310,6 +311,9 @@ class MainApplication(ctk.CTk):
         # Quando a janela é fechada, ele executa a função
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        # Downloads que ficaram pela metade na última execução
+        self.after(500, self.show_resume_jobs)
+
     # region Sincronização de URL
     # Função para atualizar var2 quando var1 mudar (sem causar loop infinito)
     def sync_var1_to_var2(self, *args):
@@ -393,12 +397,29 @@ class MainApplication(ctk.CTk):
         self.user_prefer.set(
             "notify_completed", self.settings_tab.notify_completed_var.get()
         )
+        self.user_prefer.set(
+            "max_concurrent_downloads", int(self.settings_tab.max_downloads_var.get())
+        )
+        self.user_prefer.set(
+            "playlist_workers", int(self.settings_tab.playlist_workers_var.get())
+        )
+        self.user_prefer.set(
+            "use_download_archive", self.settings_tab.use_archive_var.get()
+        )
+        self.user_prefer.set("bandwidth_limit", self.settings_tab.bandwidth_value())
+        self.user_prefer.set(
+            "worker_mode",
+            "process" if self.settings_tab.process_workers_var.get() else "thread",
+        )
 
     # region Ao fehar a janela
     def on_closing(self):
         """Chamado quando a janela é fechada"""
         self.save_current_settings()
         self.user_prefer.save_preferences()
+        self.yt_dlp.close_process_pool()
+        self.yt_dlp.thumbnails.close()
+        self.yt_dlp.save_trace()
         self.quit()
 
     # region Exibição de mensagens
@@ -437,6 +458,39 @@ class MainApplication(ctk.CTk):
         if response == option[0]:
             self.open_link(update_info["release_url"])
 
+    # region Retomar downloads da última execução
+    def show_resume_jobs(self):
+        journal = self.yt_dlp.journal
+        if journal is None:
+            return
+
+        unfinished = journal.unfinished_jobs()
+        if not unfinished:
+            return
+
+        title = self.translator.get_text("popup_resume_title")
+        message = self.translator.get_text("popup_resume_msg").format(
+            count=len(unfinished)
+        )
+        option = list(self.translator.get_text("popup_resume_options").keys())
+
+        msg = CTkMessagebox(
+            width=450,
+            title=title,
+            message=message,
+            icon="question",
+            option_1=option[0],
+            option_2=option[1],
+            wraplength=400,
+        )
+        response = msg.get()
+
+        for record in unfinished:
+            if response == option[0]:
+                self.yt_dlp.resume_job(record)
+            else:
+                journal.set_job_status(record["id"], "cancelled")
+
     # region Exibir mensagem do FFmpeg
     def ffmpeg_popup(self):
         title = self.translator.get_text("popup_ffmpeg_title")
@@ -501,6 +555,8 @@ class MainApplication(ctk.CTk):
                 tab.restore_button()
                 return False
 
+        # Tempo do teste de conexão, entra nas métricas do próximo download
+        start = time.monotonic()
         internet_status = internet_connection(url, tab.translator)
         if internet_status:
             if self.settings_tab.sound_notification_var.get():
@@ -510,6 +566,8 @@ class MainApplication(ctk.CTk):
                 tab.restore_button()
             return False
         else:
+            if type != "search":
+                self.yt_dlp.connectivity_time = time.monotonic() - start
             return True
 
     def restore_button(self):
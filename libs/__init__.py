@@ -25,5 +25,6 @@ from .ctk_components.ctk_components import (
     CTkAlert,
     CTkNotification,
     CTkProgressPopup,
+    CTkDownloadsPanel,
     CTkLoader,
 )
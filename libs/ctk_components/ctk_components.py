@@ -12,6 +12,7 @@ Classes:
 - CTkNotification
 - CTkCard
 - CTkCarousel
+- CTkDownloadsPanel
 - CTkInput
 - CTkLoader
 - CTkPopupMenu
@@ -914,10 +915,16 @@ class CTkProgressPopup(ctk.CTkFrame):
         label: str = "Label...",
         message: str = "Do something...",
         side: str = "right_bottom",
+        cancel_command=None,
+        pause_command=None,
+        offset: int = 0,
     ):
         self.root = master
         self.width = 420
         self.height = 120
+        self.cancel_command = cancel_command
+        self.pause_command = pause_command
+        self.offset = offset
         super().__init__(
             self.root,
             width=self.width,
@@ -931,7 +938,7 @@ class CTkProgressPopup(ctk.CTkFrame):
         self.cancelled = False
 
         self.title = ctk.CTkLabel(self, text=title, font=("", 16))
-        self.title.grid(row=0, column=0, sticky="ew", padx=20, pady=10, columnspan=2)
+        self.title.grid(row=0, column=0, sticky="ew", padx=20, pady=10, columnspan=3)
 
         self.label = ctk.CTkLabel(self, text=label, height=0)
         self.label.grid(row=1, column=0, sticky="sw", padx=20, pady=0)
@@ -955,17 +962,36 @@ class CTkProgressPopup(ctk.CTkFrame):
             command=self.cancel_task,
             image=self.close_icon,
         )
-        self.cancel_btn.grid(row=2, column=1, sticky="e", padx=10, pady=0)
+        self.cancel_btn.grid(row=2, column=2, sticky="e", padx=(0, 10), pady=0)
+
+        self.paused = False
+        if self.pause_command is not None:
+            self.pause_btn = ctk.CTkButton(
+                self,
+                text="⏸",
+                width=16,
+                height=16,
+                fg_color="transparent",
+                text_color=("black", "white"),
+                command=self.pause_task,
+            )
+            self.pause_btn.grid(row=2, column=1, sticky="e", padx=(10, 0), pady=0)
 
         self.message = ctk.CTkLabel(self, text=message, height=0)
         self.message.grid(row=3, column=0, sticky="ew", padx=20, pady=(0, 10))
 
         self.horizontal, self.vertical = side.split("_")
-        place_frame(self.root, self, self.horizontal, self.vertical)
-        self.root.bind("<Configure>", self.update_position, add="+")
+        place_frame(
+            self.root, self, self.horizontal, self.vertical, pady=20 + self.offset
+        )
+        self.configure_bind = self.root.bind(
+            "<Configure>", self.update_position, add="+"
+        )
 
     def update_position(self, event):
-        place_frame(self.root, self, self.horizontal, self.vertical)
+        place_frame(
+            self.root, self, self.horizontal, self.vertical, pady=20 + self.offset
+        )
         self.update_idletasks()
         self.root.update_idletasks()
 
@@ -980,17 +1006,302 @@ class CTkProgressPopup(ctk.CTkFrame):
     def update_label(self, label):
         self.label.configure(text=label)
 
+    def set_paused(self, paused: bool):
+        self.paused = paused
+        if self.pause_command is not None:
+            self.pause_btn.configure(text="▶" if paused else "⏸")
+
+    def pause_task(self):
+        self.pause_command()
+
     def cancel_task(self):
-        self.root.yt_dlp.cancel_download.set()
+        if self.cancel_command is not None:
+            self.cancel_command()
         self.root.restore_button()
         self.cancelled = True
         self.close_progress_popup()
 
     def close_progress_popup(self):
-        self.root.unbind("<Configure>")
+        # Remove only this popup's handler, other popups may still be bound
+        script = self.root.bind("<Configure>")
+        kept = [line for line in script.split("\n") if self.configure_bind not in line]
+        self.root.bind("<Configure>", "\n".join(kept))
+        self.root.deletecommand(self.configure_bind)
         self.destroy()
 
 
+class CTkDownloadsPanel(ctk.CTkFrame):
+    """
+    Floating panel listing several background tasks, one row per task with a
+    label, a progress bar, a message and pause/cancel buttons.
+
+    Only ``visible_rows`` rows are created; scrolling binds them to other
+    tasks, so a list of hundreds of tasks costs the same as a short one. Only
+    visible rows whose values changed are redrawn.
+    """
+
+    ROW_HEIGHT = 62
+    HEADER_HEIGHT = 40
+
+    def __init__(
+        self,
+        master,
+        title: str = "Background Tasks",
+        side: str = "right_bottom",
+        visible_rows: int = 4,
+        cancel_command=None,
+        pause_command=None,
+    ):
+        self.root = master
+        self.width = 420
+        self.title_text = title
+        self.visible_rows = visible_rows
+        self.cancel_command = cancel_command
+        self.pause_command = pause_command
+        super().__init__(
+            self.root,
+            width=self.width,
+            height=self.HEADER_HEIGHT,
+            corner_radius=5,
+            border_width=1,
+        )
+        self.grid_propagate(False)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tasks = {}
+        self.order = []
+        self.first = 0
+        self.collapsed = False
+        self.shown = False
+
+        self.title = ctk.CTkLabel(self, text=title, font=("", 16))
+        self.title.grid(row=0, column=0, sticky="w", padx=20, pady=(8, 4))
+
+        self.collapse_btn = ctk.CTkButton(
+            self,
+            text="▾",
+            width=16,
+            height=16,
+            fg_color="transparent",
+            text_color=("black", "white"),
+            command=self.toggle_collapse,
+        )
+        self.collapse_btn.grid(row=0, column=1, sticky="e", padx=(0, 10), pady=(8, 4))
+
+        self.close_icon = ctk.CTkImage(
+            Image.open(ICON_PATH["close"][0]),
+            Image.open(ICON_PATH["close"][1]),
+            (16, 16),
+        )
+
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.grid(row=1, column=0, sticky="nsew", padx=(10, 0))
+        self.rows_frame.grid_columnconfigure(0, weight=1)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+
+        self.rows = [self.create_row(index) for index in range(visible_rows)]
+
+        self.horizontal, self.vertical = side.split("_")
+        self.configure_bind = self.root.bind(
+            "<Configure>", self.update_position, add="+"
+        )
+
+    def create_row(self, index):
+        frame = ctk.CTkFrame(
+            self.rows_frame, fg_color="transparent", height=self.ROW_HEIGHT
+        )
+        frame.grid_propagate(False)
+        frame.grid_columnconfigure(0, weight=1)
+
+        row = {"frame": frame, "task": None, "values": None, "shown": False}
+
+        row["label"] = ctk.CTkLabel(frame, text="", height=0, anchor="w")
+        row["label"].grid(row=0, column=0, sticky="ew", padx=(10, 0), pady=(4, 0))
+
+        row["pause"] = ctk.CTkButton(
+            frame,
+            text="⏸",
+            width=16,
+            height=16,
+            fg_color="transparent",
+            text_color=("black", "white"),
+            command=lambda: self.pause_task(row["task"]),
+        )
+        if self.pause_command is not None:
+            row["pause"].grid(row=0, column=1, rowspan=2, sticky="e")
+
+        row["cancel"] = ctk.CTkButton(
+            frame,
+            text="",
+            width=16,
+            height=16,
+            fg_color="transparent",
+            image=self.close_icon,
+            command=lambda: self.cancel_task(row["task"]),
+        )
+        row["cancel"].grid(row=0, column=2, rowspan=2, sticky="e", padx=(0, 5))
+
+        row["progressbar"] = ctk.CTkProgressBar(frame)
+        row["progressbar"].set(0)
+        row["progressbar"].grid(row=1, column=0, sticky="ew", padx=(10, 0))
+
+        row["message"] = ctk.CTkLabel(frame, text="", height=0, anchor="w")
+        row["message"].grid(row=2, column=0, columnspan=3, sticky="ew", padx=(10, 0))
+
+        for widget in (frame, row["label"], row["message"], row["progressbar"]):
+            widget.bind("<MouseWheel>", self.on_mouse_wheel, add="+")
+            widget.bind("<Button-4>", self.on_mouse_wheel, add="+")
+            widget.bind("<Button-5>", self.on_mouse_wheel, add="+")
+
+        frame.grid(row=index, column=0, sticky="ew")
+        frame.grid_remove()
+        return row
+
+    # Tarefas
+    def set_task(self, task_id, label=None, message=None, progress=None, paused=None):
+        """Adds a task or updates the values given (the others are kept)."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            task = self.tasks[task_id] = {
+                "label": "",
+                "message": "",
+                "progress": 0.0,
+                "paused": False,
+            }
+            self.order.append(task_id)
+            new = True
+        else:
+            new = False
+
+        if label is not None:
+            task["label"] = label
+        if message is not None:
+            task["message"] = message
+        if progress is not None:
+            task["progress"] = progress
+        if paused is not None:
+            task["paused"] = paused
+
+        if new:
+            self.render()
+        else:
+            # Redesenha só a linha da tarefa, se estiver visível
+            index = self.order.index(task_id) - self.first
+            if 0 <= index < self.visible_rows and not self.collapsed:
+                self.draw_row(self.rows[index], task_id)
+
+    def remove_task(self, task_id):
+        if task_id not in self.tasks:
+            return
+        del self.tasks[task_id]
+        self.order.remove(task_id)
+        self.render()
+
+    def has_task(self, task_id) -> bool:
+        return task_id in self.tasks
+
+    # Desenho
+    def render(self):
+        count = len(self.order)
+        self.first = max(0, min(self.first, count - self.visible_rows))
+
+        for index, row in enumerate(self.rows):
+            position = self.first + index
+            if position < count and not self.collapsed:
+                self.draw_row(row, self.order[position])
+                if not row["shown"]:
+                    row["frame"].grid()
+                    row["shown"] = True
+            elif row["shown"]:
+                row["frame"].grid_remove()
+                row["shown"] = False
+                row["task"] = None
+                row["values"] = None
+
+        if count > self.visible_rows and not self.collapsed:
+            self.scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 5), pady=(0, 5))
+            self.scrollbar.set(
+                self.first / count, (self.first + self.visible_rows) / count
+            )
+        else:
+            self.scrollbar.grid_remove()
+
+        self.title.configure(text=f"{self.title_text} ({count})")
+        rows = 0 if self.collapsed else min(count, self.visible_rows)
+        self.configure(height=self.HEADER_HEIGHT + rows * self.ROW_HEIGHT + 10)
+
+        if count and not self.shown:
+            self.shown = True
+        elif not count and self.shown:
+            self.shown = False
+            self.place_forget()
+        if self.shown:
+            self.update_position()
+
+    def draw_row(self, row, task_id):
+        task = self.tasks[task_id]
+        values = (task["label"], task["message"], round(task["progress"], 3), task["paused"])
+        if row["task"] == task_id and row["values"] == values:
+            return
+        old = row["values"] if row["task"] == task_id else (None, None, None, None)
+        row["task"] = task_id
+        row["values"] = values
+
+        if values[0] != old[0]:
+            row["label"].configure(text=values[0])
+        if values[1] != old[1]:
+            row["message"].configure(text=values[1])
+        if values[2] != old[2]:
+            row["progressbar"].set(values[2])
+        if values[3] != old[3]:
+            row["pause"].configure(text="▶" if values[3] else "⏸")
+
+    def update_position(self, event=None):
+        # O <Configure> da janela também chega para cada widget filho
+        if event is not None and event.widget is not self.root:
+            return
+        if self.shown:
+            place_frame(self.root, self, self.horizontal, self.vertical)
+
+    # Rolagem
+    def yview(self, *args):
+        count = len(self.order)
+        if args and args[0] == "moveto":
+            self.first = int(float(args[1]) * count + 0.5)
+        elif args and args[0] == "scroll":
+            # Uma linha por passo, qualquer que seja o delta do sistema
+            self.first += 1 if float(args[1]) > 0 else -1
+        self.render()
+
+    def on_mouse_wheel(self, event):
+        if event.num == 5 or getattr(event, "delta", 0) < 0:
+            self.yview("scroll", 1)
+        else:
+            self.yview("scroll", -1)
+
+    def toggle_collapse(self):
+        self.collapsed = not self.collapsed
+        self.collapse_btn.configure(text="▴" if self.collapsed else "▾")
+        self.render()
+
+    # Ações
+    def pause_task(self, task_id):
+        if task_id is not None and self.pause_command is not None:
+            self.pause_command(task_id)
+
+    def cancel_task(self, task_id):
+        if task_id is not None and self.cancel_command is not None:
+            self.cancel_command(task_id)
+
+    def close_panel(self):
+        # Remove only this panel's handler
+        script = self.root.bind("<Configure>")
+        kept = [line for line in script.split("\n") if self.configure_bind not in line]
+        self.root.bind("<Configure>", "\n".join(kept))
+        self.root.deletecommand(self.configure_bind)
+        self.destroy()
+
 class CTkTreeview(ctk.CTkFrame):
     def __init__(self, master: any, items):
         self.root = master
@@ -8,6 +8,7 @@ Autor: Gabriel Frais
 Versão: 3.0.0
 """
 
+import multiprocessing
 from interface import MainApplication
 import customtkinter as ctk
 from modules import get_theme_path
@@ -31,4 +32,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necessário para os processos de download no executável (PyInstaller)
+    multiprocessing.freeze_support()
     main()
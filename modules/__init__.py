@@ -1,4 +1,20 @@
-from .downloader_manager import YoutubeDownloader
+from .download_engine import DownloadEngine
+from .download_queue import DownloadJob, DownloadQueue
+from .job_journal import JobJournal
+from .cancellation import CancelToken, DownloadCancelled
+from .bandwidth import BandwidthLimiter
+from .fragment_tuner import FragmentTuner
+from .range_downloader import RangeSplitDownloader
+from .pipeline import DeferredPostProcessing, PostProcessPool
+from .process_worker import ProcessWorkerPool
+from .metrics import JobMetrics, MetricsRecorder
+from .tracing import Tracer, tracer, traced
+from .download_archive import DownloadArchive
+from .info_cache import InfoCache
+from .format_index import FormatIndex
+from .records import Format, Entry
+from .thumbnails import ThumbnailCache, ThumbnailFetcher
+from .ui_bridge import UiEventBridge
 from .config import UserPreferences, DefaultConfig
 from .language_manager import TranslationManager
 from .utils import (
@@ -10,5 +26,16 @@ from .utils import (
     get_thumbnail_img,
     create_rounded_image,
     internet_connection,
+    split_urls,
 )
 from .update_checker import UpdateChecker
+
+
+def __getattr__(name):
+    # A interface (customtkinter) só é importada quando usada: a linha de
+    # comando e os processos de download não precisam do Tk
+    if name == "YoutubeDownloader":
+        from .downloader_manager import YoutubeDownloader
+
+        return YoutubeDownloader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
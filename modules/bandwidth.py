@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class BandwidthLimiter:
+    """
+    Process-wide token bucket shared by all the running downloads.
+
+    Every job draws the bytes it receives from its own bucket, refilled with
+    its share of the global rate: ``rate * weight / total weight`` of the jobs
+    that downloaded something in the last ``IDLE_TIMEOUT`` seconds. The shares
+    always add up to the global rate, whatever the number of jobs, and a job
+    that stops (or is between two videos) gives its share back to the others.
+
+    The waits are done in short slices, so a new rate set in the settings is
+    applied to the jobs that are already running.
+
+    Args:
+        rate (float): Limit in bytes per second. 0 means unlimited.
+        burst (float): Seconds of transfer a bucket can accumulate.
+    """
+
+    IDLE_TIMEOUT = 1.0
+    MAX_SLEEP = 0.25
+
+    def __init__(self, rate: float = 0, burst: float = 0.5):
+        self.rate = max(0, rate)
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def set_rate(self, rate: float):
+        """Changes the global limit (bytes per second, 0 for unlimited)."""
+        with self._lock:
+            self.rate = max(0, rate)
+
+    def release(self, key):
+        """Removes a consumer that finished, giving its share to the others."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def _share(self, bucket: dict, now: float) -> float:
+        total_weight = sum(
+            other["weight"]
+            for other in self._buckets.values()
+            if now - other["last_use"] < self.IDLE_TIMEOUT or other is bucket
+        )
+        if total_weight <= 0:
+            # O balde foi removido por release() durante a espera
+            return self.rate
+        return self.rate * bucket["weight"] / total_weight
+
+    def consume(self, key, nbytes: int, weight: float = 1.0, cancel_token=None):
+        """
+        Takes ``nbytes`` from the bucket of ``key`` and waits while the bucket
+        is in debt. Returns early if the cancel token is cancelled.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(
+                key, {"tokens": 0.0, "last": now, "last_use": now, "weight": weight}
+            )
+            bucket["weight"] = max(0.01, weight)
+            bucket["tokens"] -= nbytes
+
+        while True:
+            with self._lock:
+                if not self.rate:
+                    bucket["tokens"] = 0.0
+                    return
+
+                now = time.monotonic()
+                # Esperando também conta como uso, a parte dele continua reservada
+                bucket["last_use"] = now
+                share = self._share(bucket, now)
+                bucket["tokens"] = min(
+                    share * self.burst,
+                    bucket["tokens"] + (now - bucket["last"]) * share,
+                )
+                bucket["last"] = now
+
+                if bucket["tokens"] >= 0:
+                    return
+                delay = min(-bucket["tokens"] / share, self.MAX_SLEEP)
+
+            if cancel_token is not None:
+                if cancel_token.wait(delay):
+                    return
+            else:
+                time.sleep(delay)
@@ -0,0 +1,127 @@
+import threading
+from contextlib import contextmanager
+from yt_dlp import utils as ytdlp_utils
+
+# Token do job que está rodando em cada thread
+_current = threading.local()
+_tracking_installed = False
+_tracking_lock = threading.Lock()
+
+
+class DownloadCancelled(ytdlp_utils.DownloadCancelled):
+    """Raised inside yt-dlp when a job is cancelled or paused."""
+
+    msg = "download cancelled"
+
+
+class CancelToken:
+    """
+    Cooperative cancellation token of a download job.
+
+    The token is checked by yt-dlp before every extraction, HTTP request,
+    progress update and post-processing step. Child processes (ffmpeg merges
+    and conversions) started by a thread bound to the token are killed as
+    soon as it is cancelled, so a long transcode does not keep running until
+    its next progress update. Helper threads of the job wait on events
+    added with ``add_event``, which are set on cancellation.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._events = set()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+            self._processes.clear()
+            events = list(self._events)
+
+        for event in events:
+            event.set()
+        for process in processes:
+            kill_process(process)
+
+    def reset(self):
+        """Allows the job to run again (resume after a pause)."""
+        self._event.clear()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise DownloadCancelled()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Sleeps until the timeout or the cancellation. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def add_process(self, process):
+        with self._lock:
+            # Descarta os processos que já terminaram
+            self._processes = {p for p in self._processes if p.poll() is None}
+            self._processes.add(process)
+
+        # Cancelado enquanto o processo era criado
+        if self._event.is_set():
+            kill_process(process)
+
+    def add_event(self, event: threading.Event):
+        """Sets ``event`` when the token is cancelled, waking its waiting threads."""
+        with self._lock:
+            self._events.add(event)
+        if self._event.is_set():
+            event.set()
+
+    def remove_event(self, event: threading.Event):
+        with self._lock:
+            self._events.discard(event)
+
+    @contextmanager
+    def bind(self):
+        """Binds the token to the current thread while the block runs."""
+        install_process_tracking()
+        previous = getattr(_current, "token", None)
+        _current.token = self
+        try:
+            yield self
+        finally:
+            _current.token = previous
+
+
+def current_token():
+    return getattr(_current, "token", None)
+
+
+def kill_process(process):
+    if process.poll() is not None:
+        return
+    try:
+        process.kill()
+    except OSError as e:
+        print(f"Erro ao encerrar o processo {process.pid}: {e}")
+
+
+def install_process_tracking():
+    """
+    Makes every process started through yt-dlp's Popen (ffmpeg, ffprobe,
+    external downloaders) register itself in the token of its thread.
+    """
+    global _tracking_installed
+    with _tracking_lock:
+        if _tracking_installed:
+            return
+
+        original_init = ytdlp_utils.Popen.__init__
+
+        def tracked_init(self, *args, **kwargs):
+            original_init(self, *args, **kwargs)
+            token = current_token()
+            if token is not None:
+                token.add_process(self)
+
+        ytdlp_utils.Popen.__init__ = tracked_init
+        _tracking_installed = True
@@ -0,0 +1,402 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from .config import UserPreferences
+from .download_archive import DownloadArchive
+from .download_engine import DownloadEngine
+from .download_queue import DownloadJob
+from .fragment_tuner import FragmentTuner
+from .info_cache import InfoCache
+from .language_manager import TranslationManager
+from .tracing import tracer
+from .utils import split_urls
+
+
+class CliDownloader(DownloadEngine):
+    """
+    Download engine without a window, for scripts and cron jobs.
+
+    Every change of a job is written to ``output`` as one JSON object per line
+    (JSONL): "queued", "start", "progress" (at most one per job every
+    ``progress_interval`` seconds), "entries" (the items of a playlist, as
+    they are read) and "done", with the final status and the metrics of
+    the job.
+    """
+
+    def __init__(
+        self,
+        translator,
+        user_prefer,
+        archive=None,
+        output=None,
+        progress_interval=0.5,
+        info_cache=None,
+    ):
+        super().__init__(
+            translator, user_prefer, None, archive, FragmentTuner(), info_cache
+        )
+        self.output = output or sys.stdout
+        self.progress_interval = progress_interval
+        self._output_lock = threading.Lock()
+        self._last_progress = {}
+        self._pending = 0
+        self._all_done = threading.Event()
+        # Quantos jobs terminaram com cada status
+        self.results = Counter()
+
+    def emit(self, event: str, job: DownloadJob, **fields):
+        line = json.dumps(
+            {"event": event, "job": job.id, "url": job.url, "time": time.time(), **fields},
+            ensure_ascii=False,
+        )
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def enqueue(self, job: DownloadJob):
+        with self._output_lock:
+            self._pending += 1
+            self._all_done.clear()
+        self.emit("queued", job)
+        return super().enqueue(job)
+
+    def config_options(self, job: DownloadJob) -> dict:
+        super().config_options(job)
+        # A barra de progresso do yt-dlp misturaria texto com o JSONL
+        job.ydl_opts["noprogress"] = True
+        return job.ydl_opts
+
+    def on_job_start(self, job: DownloadJob):
+        self.emit("start", job)
+
+    def on_job_update(self, job: DownloadJob):
+        now = time.monotonic()
+        if now - self._last_progress.get(job.id, 0) < self.progress_interval:
+            return
+        self._last_progress[job.id] = now
+        self.emit(
+            "progress",
+            job,
+            label=job.label,
+            progress=round(job.progress, 4),
+            message=job.message,
+        )
+
+    def on_playlist_entries(self, job: DownloadJob, entries: list):
+        self.emit(
+            "entries",
+            job,
+            entries=[
+                {
+                    "index": playlist_index,
+                    "id": entry.id,
+                    "title": entry.title,
+                    "url": entry.url,
+                }
+                for playlist_index, entry in entries
+            ],
+            found=job.total_videos,
+        )
+
+    def on_job_done(self, job: DownloadJob):
+        self._last_progress.pop(job.id, None)
+        if job.status == "paused":
+            # Continua pendente, volta para a fila com resume()
+            self.emit("paused", job, label=job.label)
+            return
+
+        self.emit(
+            "done",
+            job,
+            status=job.status,
+            error=job.error,
+            skipped=job.skipped,
+            metrics=job.metrics.to_dict(),
+        )
+        with self._output_lock:
+            self.results[job.status] += 1
+            self._pending -= 1
+            if self._pending <= 0:
+                self._all_done.set()
+
+    def cancel(self, job_id: int):
+        super().cancel(job_id)
+        job = self.queue.get(job_id)
+        if job is not None and job.status == "cancelled":
+            # Estava parado (na fila ou pausado), não passa pelo download_process
+            self.on_job_done(job)
+
+    def resume(self, job_id: int):
+        resumed = super().resume(job_id)
+        if resumed:
+            self.emit("queued", self.queue.get(job_id))
+        return resumed
+
+    def wait(self):
+        """Waits until every queued job ends. Ctrl+C cancels the running jobs."""
+        try:
+            while not self._all_done.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            for job in list(self.queue.jobs.values()):
+                if job.status in ("queued", "running", "paused"):
+                    self.cancel(job.id)
+            self._all_done.wait()
+
+
+def read_urls(sources: list) -> list:
+    """Reads the URLs of the arguments, files or stdin ("-"), one or more per line."""
+    urls = []
+    for source in sources:
+        if source == "-":
+            text = sys.stdin.read()
+        else:
+            with open(source, encoding="utf-8") as f:
+                text = f.read()
+
+        # Linhas começando com # são comentários
+        lines = [line for line in text.splitlines() if not line.lstrip().startswith("#")]
+        urls.extend(split_urls("\n".join(lines)))
+    return urls
+
+
+def build_parser(user_prefer: UserPreferences) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="easytuber",
+        description="Downloads videos and audios without opening the window. "
+        "Progress is written to stdout as JSON lines.",
+    )
+    parser.add_argument("urls", nargs="*", help="URLs to download")
+    parser.add_argument(
+        "-i",
+        "--input",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="file with URLs, one per line ('-' reads stdin); can be repeated",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=user_prefer.get("default_download_path"),
+        help="download folder (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-m",
+        "--media",
+        choices=("video", "audio"),
+        default=user_prefer.get("media").lower(),
+        help="download the video or only the audio (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="container or audio format, e.g. mp4, mkv, mp3 "
+        "(default: the last one used for the media)",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        default=user_prefer.get("quality"),
+        help="maximum video height, e.g. 720p (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--playlist", action="store_true", help="download the whole playlist"
+    )
+    parser.add_argument(
+        "--playlist-items", default="", help="playlist items to download, e.g. 1-5,8"
+    )
+    parser.add_argument(
+        "--playlist-reverse", action="store_true", help="download in reverse order"
+    )
+    parser.add_argument(
+        "--playlist-random", action="store_true", help="download in random order"
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=user_prefer.get("max_concurrent_downloads"),
+        help="downloads running at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--playlist-workers",
+        type=int,
+        default=user_prefer.get("playlist_workers"),
+        help="playlist items downloaded at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--limit-rate",
+        type=int,
+        default=user_prefer.get("bandwidth_limit"),
+        metavar="KIB",
+        help="total download speed limit in KiB/s, 0 for unlimited "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="download again the videos already in the download archive",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always extract the video information again, without the cache of "
+        "previous searches and downloads",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="run each download in a worker process",
+    )
+    parser.add_argument(
+        "--ffmpeg",
+        default=user_prefer.get("ffmpeg_path", ""),
+        help="path of the ffmpeg executable",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="minimum time between two progress lines of a job (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=user_prefer.get("metrics_dir", ""),
+        metavar="DIR",
+        help="save the metrics of each job (phase timings, bytes, speed, retries, "
+        "ffmpeg CPU time) as a JSON file in this folder",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=user_prefer.get("metrics_file", ""),
+        metavar="FILE",
+        help="keep this file updated with the metrics of all the jobs in the "
+        "Prometheus text format",
+    )
+    parser.add_argument(
+        "--trace",
+        default=user_prefer.get("trace_file", ""),
+        metavar="FILE",
+        help="record spans of the searches, downloads and ffmpeg runs and write "
+        "them to this file at the end (Chrome Trace Event JSON, opens in "
+        "chrome://tracing or ui.perfetto.dev)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="keep running as a local job API (HTTP with server-sent events) on "
+        "HOST:PORT, PORT or unix:PATH; the other options are the defaults of "
+        "the submitted jobs",
+    )
+    parser.add_argument(
+        "--api-token",
+        default=user_prefer.get("api_token", ""),
+        metavar="TOKEN",
+        help="with --serve, require \"Authorization: Bearer TOKEN\" in every request",
+    )
+    return parser
+
+
+def build_options(translator, user_prefer: UserPreferences, values: dict) -> dict:
+    """
+    Builds the same download options that the download tab builds, from the
+    values of the command line (or of a request to the job API).
+    """
+    if values.get("media") == "audio":
+        media = translator.get_text("audio")
+        default_format = user_prefer.get("last_format_audio")
+    else:
+        media = translator.get_text("video")
+        default_format = user_prefer.get("last_format_video")
+
+    playlist = bool(values.get("playlist"))
+    return {
+        "download_path": values["output"],
+        "ffmpeg_path": values.get("ffmpeg") or "",
+        "media": media,
+        "format": values.get("format") or default_format,
+        "quality": str(values["quality"]).replace("p", ""),
+        "playlist": playlist,
+        "playlist_items": (values.get("playlist_items") or "") if playlist else "",
+        "playlist_reverse": bool(values.get("playlist_reverse")),
+        "playlist_random": bool(values.get("playlist_random")),
+    }
+
+
+def main(argv=None) -> int:
+    user_prefer = UserPreferences()
+    args = build_parser(user_prefer).parse_args(argv)
+
+    urls = args.urls + read_urls(args.input)
+    if not urls and not args.serve:
+        print("easytuber: no URL given", file=sys.stderr)
+        return 2
+
+    translator = TranslationManager(None)
+    translator.current_language = user_prefer.get("language")
+
+    # Mensagens do yt-dlp e dos módulos vão para o stderr, o stdout é só JSONL
+    output = sys.stdout
+    sys.stdout = sys.stderr
+
+    archive = None
+    if not args.no_archive:
+        try:
+            archive = DownloadArchive()
+        except Exception as e:
+            print(f"Erro ao abrir o arquivo de downloads: {e}")
+
+    info_cache = None
+    if not args.no_cache:
+        try:
+            info_cache = InfoCache()
+        except Exception as e:
+            print(f"Erro ao abrir o cache de informações: {e}")
+
+    if args.serve:
+        # Importado aqui: o servidor depende deste módulo
+        from .daemon import DaemonDownloader, serve
+
+        engine_class = DaemonDownloader
+    else:
+        engine_class = CliDownloader
+
+    engine = engine_class(
+        translator, user_prefer, archive, output, args.progress_interval, info_cache
+    )
+    engine.set_max_workers(args.concurrency)
+    engine.set_playlist_workers(args.playlist_workers)
+    engine.set_bandwidth_limit(args.limit_rate)
+    engine.set_use_archive(not args.no_archive)
+    engine.set_use_info_cache(not args.no_cache)
+    engine.set_worker_mode("process" if args.processes else "thread")
+    engine.set_metrics_output(args.metrics_dir, args.metrics_file)
+    if args.trace:
+        engine.trace_file = args.trace
+        tracer.enable()
+
+    options = build_options(translator, user_prefer, vars(args))
+
+    try:
+        for url in urls:
+            engine.submit("basic", dict(options, url=url))
+        if args.serve:
+            try:
+                serve(engine, args.serve, vars(args))
+            except OSError as e:
+                # Endereço em uso ou caminho que não é um socket
+                print(f"easytuber: error: {e}", file=sys.stderr)
+                return 1
+            return 0
+        engine.wait()
+    finally:
+        engine.close_process_pool()
+        engine.save_trace()
+        sys.stdout = output
+
+    return 0 if all(status == "finished" for status in engine.results) else 1
@@ -59,6 +59,16 @@ class UserPreferences:
             "notify_completed": True,  # Default notify completed
             "last_format_audio": "mp3",  # Default last format audio
             "last_format_video": "mp4",  # Default last format video
+            "max_concurrent_downloads": 2,  # Default simultaneous downloads
+            "playlist_workers": 3,  # Default playlist items downloaded in parallel
+            "use_download_archive": True,  # Skip videos already downloaded
+            "use_info_cache": True,  # Reuse the extracted information of the videos
+            "bandwidth_limit": 0,  # Total download speed limit in KiB/s (0 = unlimited)
+            "range_connections": 4,  # Connections per progressive file (1 = disabled)
+            "worker_mode": "thread",  # Run yt-dlp in "thread"s or worker "process"es
+            "metrics_dir": "",  # Folder of the per-job metrics JSON files ("" = off)
+            "metrics_file": "",  # Prometheus text file with the job metrics ("" = off)
+            "trace_file": "",  # Chrome trace written when the app closes ("" = off)
         }
 
         # Attempt to get the FFmpeg executable path and add it to the config if available
@@ -0,0 +1,448 @@
+import hmac
+import json
+import math
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from .cli import CliDownloader, build_options
+from .download_queue import DownloadJob
+from .tracing import tracer
+from .utils import split_urls
+
+
+class DaemonDownloader(CliDownloader):
+    """
+    Download engine of the job API. Besides the JSONL log, every event is
+    published to the clients listening on ``/events``.
+
+    Each client has its own bounded queue; a client that does not read its
+    events loses the oldest ones instead of holding the downloads. Only the
+    last ``FINISHED_HISTORY`` ended jobs are kept, so a daemon that runs for
+    weeks does not grow with every download.
+    """
+
+    SUBSCRIBER_BACKLOG = 1000
+    FINISHED_HISTORY = 200
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._subscribers = set()
+        self._subscribers_lock = threading.Lock()
+        self._finished = deque()
+        self._finished_lock = threading.Lock()
+
+    def emit(self, event: str, job: DownloadJob, **fields):
+        super().emit(event, job, **fields)
+        self.publish(dict(self.job_state(job), event=event, **fields))
+
+    def on_job_done(self, job: DownloadJob):
+        super().on_job_done(job)
+        if job.status == "paused":
+            return
+
+        # Os mais antigos saem da fila; o evento "done" já foi publicado
+        with self._finished_lock:
+            self._finished.append(job.id)
+            while len(self._finished) > self.FINISHED_HISTORY:
+                self.queue.remove(self._finished.popleft())
+
+    def publish(self, data: dict):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+
+        for events in subscribers:
+            while True:
+                try:
+                    events.put_nowait(data)
+                    break
+                except queue.Full:
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def subscribe(self) -> queue.Queue:
+        events = queue.Queue(maxsize=self.SUBSCRIBER_BACKLOG)
+        with self._subscribers_lock:
+            self._subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue):
+        with self._subscribers_lock:
+            self._subscribers.discard(events)
+
+    @staticmethod
+    def job_state(job: DownloadJob) -> dict:
+        return {
+            "job": job.id,
+            "url": job.url,
+            "type": job.type_download,
+            "status": job.status,
+            "label": job.label,
+            "message": job.message,
+            "progress": round(job.progress, 4),
+            "total_videos": job.total_videos,
+            "current_video": job.current_video,
+            "skipped": job.skipped,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+
+    def jobs_state(self) -> list:
+        return [self.job_state(job) for job in list(self.queue.jobs.values())]
+
+
+# Opções que um pedido pode mudar; as outras (pasta, ffmpeg...) são do daemon
+JOB_KEYS = (
+    "media",
+    "format",
+    "quality",
+    "playlist",
+    "playlist_items",
+    "playlist_reverse",
+    "playlist_random",
+)
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def host_name(host: str) -> str:
+    """Name in a Host header, without the port ("[::1]:8080" -> "::1")."""
+    try:
+        return (urlparse(f"//{host}").hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Requests of the job API:
+
+    - GET  /jobs                 list of the jobs
+    - POST /jobs                 {"url" or "urls", options} queues new jobs
+    - GET  /jobs/ID              state of a job
+    - POST /jobs/ID/cancel       cancels a job (also /pause and /resume)
+    - GET  /events[?job=ID]      progress as server-sent events
+    - GET  /metrics              metrics of the finished jobs (Prometheus)
+    - GET  /trace                spans recorded with --trace (Chrome trace JSON)
+
+    Requests from web pages (an Origin other than the API itself) and, on
+    TCP, Host headers that are not the address of the server are refused,
+    so a site open in the browser cannot queue downloads. With --api-token
+    every request needs "Authorization: Bearer TOKEN". The bodies of POST
+    requests must be ``application/json``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    KEEPALIVE_INTERVAL = 15
+
+    @property
+    def engine(self) -> DaemonDownloader:
+        return self.server.engine
+
+    def log_message(self, format, *args):
+        # Os eventos já vão para o log JSONL
+        pass
+
+    def send_json(self, data, status: int = 200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, text: str, status: int = 200):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, message: str):
+        self.send_json({"error": message}, status)
+
+    def check_request(self) -> bool:
+        """Refuses the request (returning False) when it may come from another site."""
+        token = self.server.token
+        if token:
+            authorization = self.headers.get("Authorization", "")
+            if not hmac.compare_digest(
+                authorization.encode("utf-8"), f"Bearer {token}".encode("utf-8")
+            ):
+                self.send_error_json(401, "invalid or missing token")
+                return False
+
+        host = self.headers.get("Host", "")
+        allowed_hosts = self.server.allowed_hosts
+        if allowed_hosts is not None and host_name(host) not in allowed_hosts:
+            self.send_error_json(403, "host not allowed")
+            return False
+
+        # Navegadores mandam Origin; só aceita a própria API
+        origin = self.headers.get("Origin")
+        if origin is not None and urlparse(origin).netloc.lower() != host.lower():
+            self.send_error_json(403, "cross-origin requests are not allowed")
+            return False
+        return True
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        content_type = self.headers.get("Content-Type")
+        if (length or content_type) and (
+            (content_type or "").split(";")[0].strip().lower() != "application/json"
+        ):
+            raise TypeError("the body must be application/json")
+        if not length:
+            return {}
+        data = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("the body must be a JSON object")
+        return data
+
+    def route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        return parts, parse_qs(url.query)
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        parts, query = self.route()
+
+        if parts == ["jobs"]:
+            self.send_json(self.engine.jobs_state())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.find_job(parts[1])
+            if job is not None:
+                self.send_json(self.engine.job_state(job))
+        elif parts == ["metrics"]:
+            self.send_text(self.engine.metrics.prometheus_text())
+        elif parts == ["trace"]:
+            self.send_json(tracer.to_json())
+        elif parts == ["events"]:
+            job_id = query.get("job", [None])[0]
+            self.stream_events(int(job_id) if job_id and job_id.isdigit() else None)
+        else:
+            self.send_error_json(404, "not found")
+
+    def do_POST(self):
+        if not self.check_request():
+            return
+        parts, _ = self.route()
+        try:
+            body = self.read_json()
+        except TypeError as e:
+            self.send_error_json(415, str(e))
+            return
+        except ValueError as e:
+            self.send_error_json(400, f"invalid JSON: {e}")
+            return
+
+        if parts == ["jobs"]:
+            self.submit_jobs(body)
+        elif len(parts) == 3 and parts[0] == "jobs":
+            self.job_action(parts[1], parts[2])
+        else:
+            self.send_error_json(404, "not found")
+
+    def find_job(self, job_id: str):
+        job = self.engine.queue.get(int(job_id)) if job_id.isdigit() else None
+        if job is None:
+            self.send_error_json(404, "job not found")
+        return job
+
+    def submit_jobs(self, body: dict):
+        urls = body.get("urls") or body.get("url") or ""
+        if isinstance(urls, str):
+            urls = split_urls(urls)
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            self.send_error_json(400, "the URLs must be strings")
+            return
+        if not urls:
+            self.send_error_json(400, "no URL given")
+            return
+
+        # Valida antes de criar os jobs: um erro depois deixaria o cliente sem resposta
+        weight = body.get("weight")
+        if weight is not None:
+            try:
+                weight = float(weight)
+            except (TypeError, ValueError):
+                weight = math.nan
+            if not (math.isfinite(weight) and weight > 0):
+                self.send_error_json(400, "the weight must be a positive number")
+                return
+
+        # As opções do pedido substituem as da linha de comando do daemon
+        values = dict(self.server.defaults)
+        values.update(
+            (key, body[key]) for key in JOB_KEYS if body.get(key) is not None
+        )
+        options = build_options(
+            self.engine.translator, self.engine.user_prefer, values
+        )
+
+        jobs = []
+        for url in urls:
+            job = self.engine.submit("basic", dict(options, url=url))
+            if weight is not None:
+                self.engine.set_job_weight(job.id, weight)
+            jobs.append(self.engine.job_state(job))
+        self.send_json(jobs, 201)
+
+    def job_action(self, job_id: str, action: str):
+        job = self.find_job(job_id)
+        if job is None:
+            return
+
+        if action == "cancel":
+            self.engine.cancel(job.id)
+        elif action == "pause":
+            self.engine.pause(job.id)
+        elif action == "resume":
+            if not self.engine.resume(job.id):
+                self.send_error_json(409, "the job is not paused")
+                return
+        else:
+            self.send_error_json(404, "unknown action")
+            return
+        self.send_json(self.engine.job_state(job))
+
+    def stream_events(self, job_id=None):
+        events = self.engine.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            # Estado atual primeiro, depois só as mudanças
+            snapshot = self.engine.jobs_state()
+            if job_id is not None:
+                snapshot = [job for job in snapshot if job["job"] == job_id]
+            self.write_event("snapshot", snapshot)
+
+            while not self.server.stopping.is_set():
+                try:
+                    data = events.get(timeout=self.KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+
+                if job_id is None or data["job"] == job_id:
+                    self.write_event(data["event"], data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.engine.unsubscribe(events)
+
+    def write_event(self, event: str, data):
+        payload = json.dumps(data, ensure_ascii=False)
+        self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def remove_stale_socket(path: str):
+    """
+    Removes the socket left at ``path`` by a previous run. Raises
+    FileExistsError when the path is not a socket or another server is still
+    listening on it.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+
+    # Socket de outro processo ainda ativo: não é apagado
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise FileExistsError(f"{path} is in use by another server")
+
+
+def create_server(engine: DaemonDownloader, address: str, defaults: dict):
+    """
+    Creates the API server on "HOST:PORT", "PORT" or "unix:PATH".
+    TCP servers listen only on 127.0.0.1 unless another host is given, and
+    only accept the Host headers of the local machine and of that host.
+    """
+    allowed_hosts = None
+    if address.startswith("unix:"):
+        path = address[5:]
+        remove_stale_socket(path)
+        server = UnixHTTPServer(path, ApiHandler)
+    else:
+        host, _, port = address.rpartition(":")
+        host = host or "127.0.0.1"
+        server = ThreadingHTTPServer((host, int(port)), ApiHandler)
+        server.daemon_threads = True
+        if host not in ("0.0.0.0", "::"):
+            allowed_hosts = LOCAL_HOSTS | {host.lower()}
+
+    server.engine = engine
+    server.defaults = defaults
+    server.allowed_hosts = allowed_hosts
+    server.token = defaults.get("api_token") or ""
+    server.stopping = threading.Event()
+    return server
+
+
+def serve(engine: DaemonDownloader, address: str, defaults: dict):
+    """Runs the API until Ctrl+C or SIGTERM, then cancels the running jobs."""
+    server = create_server(engine, address, defaults)
+
+    def stop(*_):
+        server.stopping.set()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+
+    print(f"easytuber: listening on {address}", file=sys.stderr)
+    exposed = not address.startswith("unix:") and server.allowed_hosts is None
+    if exposed and not server.token:
+        print(
+            "easytuber: warning: the API accepts jobs from any host, use --api-token",
+            file=sys.stderr,
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopping.set()
+        server.server_close()
+        if address.startswith("unix:"):
+            try:
+                os.remove(address[5:])
+            except OSError:
+                pass
+
+        for job in list(engine.queue.jobs.values()):
+            if job.status in ("queued", "running", "paused"):
+                engine.cancel(job.id)
+        if engine.queue.active_jobs():
+            engine.wait()
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import threading
+import time
+from .utils import get_config_dir
+
+
+class DownloadArchive:
+    """
+    Archive of the videos already downloaded, stored in SQLite.
+
+    Works like the text file of yt-dlp's ``download_archive`` option (one
+    "extractor id" key per video) and can be given directly in its place,
+    since yt-dlp only needs ``in`` and ``add``. The keys are the primary key
+    of the table, so every check is an index lookup and the archive does not
+    need to be loaded in memory, even with hundreds of thousands of videos.
+
+    Args:
+        path (str, optional): Database file. Defaults to 'archive.db' in the
+            configuration directory.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(get_config_dir(), "archive.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archive (
+                    key TEXT PRIMARY KEY,
+                    added_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+
+    def __contains__(self, key) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM archive WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def __bool__(self) -> bool:
+        # O yt-dlp ignora o arquivo se ele for "vazio", evita um COUNT(*)
+        return True
+
+    def add(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO archive (key, added_at) VALUES (?, ?)",
+                (key, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,1592 @@
+import glob
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import (
+    ExistingVideoReached,
+    LazyList,
+    PagedList,
+    PlaylistEntries,
+    RejectedVideoReached,
+    make_archive_id,
+)
+from modules.download_queue import DownloadJob, DownloadQueue
+from modules.cancellation import DownloadCancelled
+from modules.bandwidth import BandwidthLimiter
+from modules.range_downloader import install_range_downloader
+from modules.pipeline import DeferredPostProcessing, PostProcessPool
+from modules.metrics import MetricsRecorder
+from modules.info_cache import extract_info, streams_expire_at
+from modules.format_index import FormatIndex, format_string
+from modules.records import Entry
+from modules.tracing import tracer, traced, now_us
+
+
+class DownloadEngine:
+    """
+    Download engine without any interface dependency.
+
+    It holds the job queue and runs each job with its own yt-dlp instance.
+    Interfaces subclass it and override the ``on_job_*`` callbacks to show the
+    progress of the jobs.
+    """
+
+    def __init__(
+        self,
+        translator,
+        user_prefer=None,
+        journal=None,
+        archive=None,
+        tuner=None,
+        info_cache=None,
+    ):
+        """
+        Initializes the download engine
+
+        Parameters
+        ----------
+        translator : TranslationManager
+            Translator used for the status messages
+        user_prefer : UserPreferences, optional
+            User preferences (number of simultaneous downloads...)
+        journal : JobJournal, optional
+            Persistent journal used to resume the jobs after a restart
+        archive : DownloadArchive, optional
+            Archive of downloaded videos, used to skip them in later downloads
+        tuner : FragmentTuner, optional
+            Chooses the fragment concurrency and chunk size of each site
+        info_cache : InfoCache, optional
+            Cache of the extracted video information, reused by the searches
+            and downloads of the same video
+        """
+        self.translator = translator
+        self.user_prefer = user_prefer
+        self.journal = journal
+        if self.journal is not None:
+            self.journal.prune()
+        self.archive = archive
+        self.use_archive = True
+        self.tuner = tuner
+        self.info_cache = info_cache
+        self.use_info_cache = True
+        self.resolutions_available = set()
+        self.resolutions_list = []
+        self.url = ""
+
+        # Constantes para o avançado
+        self.info_preview = []
+        self.info_presets = []
+        self.info_formats = []
+        self.format_index = FormatIndex([])
+        self.audio_id = None
+        self.search_concluded = False
+        # Info dict da última busca, reusado pelo download avançado
+        self.search_info = None
+        self.search_info_expires_at = 0.0
+
+        # Textos traduzidos já resolvidos, por idioma
+        self._texts = {}
+
+        # Fila de downloads
+        max_workers = 2
+        self.playlist_workers = 3
+        self.range_connections = 4
+        self.worker_mode = "thread"
+        bandwidth_limit = 0
+        metrics_dir = ""
+        metrics_file = ""
+        self.trace_file = ""
+        if user_prefer is not None:
+            max_workers = user_prefer.get("max_concurrent_downloads", 2)
+            self.playlist_workers = user_prefer.get("playlist_workers", 3)
+            self.use_archive = user_prefer.get("use_download_archive", True)
+            self.use_info_cache = user_prefer.get("use_info_cache", True)
+            bandwidth_limit = user_prefer.get("bandwidth_limit", 0)
+            self.range_connections = user_prefer.get("range_connections", 4)
+            self.worker_mode = user_prefer.get("worker_mode", "thread")
+            metrics_dir = user_prefer.get("metrics_dir", "")
+            metrics_file = user_prefer.get("metrics_file", "")
+            self.trace_file = user_prefer.get("trace_file", "")
+        self.queue = DownloadQueue(self.download_process, max_workers)
+
+        # Conversões (ffmpeg) de todos os jobs, separadas das threads de download
+        self.postprocess_pool = PostProcessPool()
+
+        # Limite de banda dividido entre todos os downloads (KiB/s, 0 = sem limite)
+        self.limiter = BandwidthLimiter(bandwidth_limit * 1024)
+
+        # Processos de trabalho ("process"), criados só quando usados
+        self.process_pool = None
+        self._process_pool_lock = threading.Lock()
+
+        # Métricas dos jobs: JSON por job e arquivo do Prometheus (vazio = não salva)
+        self.metrics = MetricsRecorder(metrics_dir or None, metrics_file or None)
+        # Tempo do teste de conexão feito pela interface antes do próximo submit
+        self.connectivity_time = None
+        # Início da fase atual de cada thread (extração, seleção de formato...)
+        self._phase_marks = threading.local()
+
+        # Trace (Chrome Trace Event) salvo ao fechar, desligado sem arquivo
+        if self.trace_file:
+            tracer.enable()
+
+    # region Fila de downloads
+    def submit(self, type: str, download_options: dict, info_formats=None, info=None):
+        """
+        Creates a job and adds it to the download queue.
+
+        Args:
+            type (str): "basic" or "advanced"
+            download_options (dict): Options built by the interface
+            info_formats (list, optional): Formats found by the search (advanced)
+            info (dict, optional): Info dict of the search of the same URL, used
+                instead of a new extraction while its stream URLs are valid
+
+        Returns:
+            DownloadJob: The queued job
+        """
+        job = DownloadJob(type, download_options, info_formats)
+        if info_formats is not None and info_formats is self.format_index.formats:
+            # Formatos da última busca: o índice dela já está pronto
+            job.format_index = self.format_index
+        if info is not None:
+            job.info = info
+            job.info_expires_at = (
+                self.search_info_expires_at
+                if info is self.search_info
+                else streams_expire_at(info)
+            )
+        if self.connectivity_time is not None:
+            job.metrics.add_phase("connectivity", self.connectivity_time)
+            self.connectivity_time = None
+        if self.journal is not None:
+            job.journal_id = self.journal.add_job(job.url, type, job.options)
+        return self.enqueue(job)
+
+    def resume_job(self, record: dict):
+        """
+        Queues again a job read from the journal.
+
+        Items already finished in the previous run are skipped and the yt-dlp
+        options resolved at that time (format string...) are reused.
+
+        Args:
+            record (dict): A job returned by JobJournal.unfinished_jobs()
+
+        Returns:
+            DownloadJob: The queued job
+        """
+        job = DownloadJob(record["type"], record["options"])
+        job.journal_id = record["id"]
+        job.resume_opts = record.get("ydl_opts") or {}
+        if self.journal is not None:
+            job.done_items = self.journal.finished_items(record["id"])
+        return self.enqueue(job)
+
+    def enqueue(self, job: DownloadJob):
+        job.label = self.translator.get_text("status")[1]
+        return self.queue.submit(job)
+
+    def set_max_workers(self, max_workers: int):
+        """Changes how many downloads can run at the same time."""
+        self.queue.set_max_workers(max_workers)
+
+    def set_playlist_workers(self, playlist_workers: int):
+        """Changes how many items of a playlist are downloaded at the same time."""
+        self.playlist_workers = max(1, int(playlist_workers))
+
+    def set_bandwidth_limit(self, kib_per_second: int):
+        """Changes the total download speed limit, also for the running jobs."""
+        rate = max(0, int(kib_per_second)) * 1024
+        self.limiter.set_rate(rate)
+        if self.process_pool is not None:
+            self.process_pool.limiter.set_rate(rate)
+
+    def set_job_weight(self, job_id: int, weight: float):
+        """Changes the share of the bandwidth limit given to a job (default 1)."""
+        job = self.queue.get(job_id)
+        if job is not None:
+            job.weight = max(0.01, float(weight))
+
+    def set_use_archive(self, use_archive: bool):
+        """Turns on/off skipping the videos that are in the download archive."""
+        self.use_archive = bool(use_archive)
+
+    def set_use_info_cache(self, use_info_cache: bool):
+        """Turns on/off reusing the cached information of the videos."""
+        self.use_info_cache = bool(use_info_cache)
+
+    def active_info_cache(self):
+        """Returns the information cache, or None when it is off."""
+        if self.info_cache is not None and self.use_info_cache:
+            return self.info_cache
+        return None
+
+    def set_metrics_output(self, directory: str = None, prometheus_file: str = None):
+        """Chooses where the metrics of the finished jobs are saved (None = nowhere)."""
+        self.metrics.directory = directory or None
+        self.metrics.prometheus_file = prometheus_file or None
+
+    def save_trace(self):
+        """Writes the spans recorded so far to the trace file, if tracing is on."""
+        if self.trace_file and tracer.enabled:
+            tracer.export(self.trace_file)
+
+    def set_worker_mode(self, worker_mode: str):
+        """
+        Chooses where the searches and downloads run: "thread" (threads of
+        this process) or "process" (a pool of worker processes). Jobs already
+        running keep their mode.
+        """
+        self.worker_mode = "process" if worker_mode == "process" else "thread"
+
+    def get_process_pool(self):
+        """Returns the pool of worker processes, or None to use threads."""
+        if self.worker_mode != "process":
+            return None
+
+        with self._process_pool_lock:
+            if self.process_pool is None:
+                # Importado aqui: o módulo dos processos depende deste
+                from modules.process_worker import ProcessWorkerPool
+
+                try:
+                    self.process_pool = ProcessWorkerPool(rate=self.limiter.rate)
+                except Exception as e:
+                    # Sem processos os downloads continuam nas threads
+                    print(f"Erro ao iniciar os processos de download: {e}")
+                    self.worker_mode = "thread"
+                    return None
+            return self.process_pool
+
+    def close_process_pool(self):
+        """Stops the worker processes (when the application is closed)."""
+        with self._process_pool_lock:
+            if self.process_pool is not None:
+                self.process_pool.shutdown()
+
+    def worker_spec(self, job: DownloadJob) -> dict:
+        """State needed to run the job in a worker process."""
+        return {
+            "id": job.id,
+            "type": job.type_download,
+            "options": job.options,
+            "info_formats": job.info_formats,
+            "info": YoutubeDL.sanitize_info(job.info) if job.info else None,
+            "info_expires_at": job.info_expires_at,
+            "journal_id": job.journal_id,
+            "resume_opts": job.resume_opts,
+            "done_items": list(job.done_items),
+            "weight": job.weight,
+            "settings": {
+                "language": self.translator.current_language,
+                "journal_path": getattr(self.journal, "path", None),
+                "archive_path": getattr(self.archive, "path", None),
+                "info_cache_path": getattr(self.active_info_cache(), "path", None),
+                "tune": self.tuner is not None,
+                "playlist_workers": self.playlist_workers,
+                "use_archive": self.use_archive,
+                "range_connections": self.range_connections,
+                "trace": tracer.enabled,
+            },
+        }
+
+    def skipped_download(self, info) -> bool:
+        """Checks if yt-dlp skipped the video because it is in the download archive."""
+        # Sem downloads: pulado antes da extração ou logo depois dela
+        downloads = (info or {}).get("requested_downloads")
+        if not downloads:
+            return True
+        return all(
+            download.get("__write_download_archive") == "ignore"
+            for download in downloads
+        )
+
+    def in_archive(self, job: DownloadJob, entry: Entry) -> bool:
+        """
+        Checks a flat playlist entry against the download archive, before
+        creating a YoutubeDL for it. Entries without an extractor key are
+        checked later by yt-dlp itself, still before the extraction.
+        """
+        archive = job.ydl_opts.get("download_archive")
+        if archive is None or not entry.ie_key or not entry.id:
+            return False
+        return make_archive_id(entry.ie_key, entry.id) in archive
+
+    def cancel(self, job_id: int):
+        self.queue.cancel(job_id)
+
+        job = self.queue.get(job_id)
+        if job is not None and job.status == "cancelled":
+            # Cancelado parado (na fila ou pausado), não passa pelo download_process
+            self.cleanup_partial_downloads(job)
+            self.record_status(job)
+
+    def pause(self, job_id: int):
+        """Pauses a job keeping its partial files."""
+        self.queue.pause(job_id)
+
+        job = self.queue.get(job_id)
+        if job is not None and job.status == "paused":
+            self.record_status(job)
+
+    def resume(self, job_id: int):
+        """
+        Resumes a paused job. yt-dlp continues the .part files (and the
+        fragments listed in the .ytdl files) from where they stopped.
+        """
+        job = self.queue.get(job_id)
+        if job is None or job.status != "paused":
+            return False
+
+        job.label = self.translator.get_text("status")[1]
+        job.error = None
+        return self.queue.resume(job_id)
+
+    def record_status(self, job: DownloadJob):
+        """Writes the current status of the job in the journal."""
+        if self.journal is not None and job.journal_id is not None:
+            self.journal.set_job_status(job.journal_id, job.status, job.error)
+
+    def record_item(self, job: DownloadJob, item_key, status, playlist_index=None, info=None):
+        """Writes the status of one item (video or playlist entry) in the journal."""
+        if self.journal is None or job.journal_id is None:
+            return
+
+        output_path = None
+        downloads = (info or {}).get("requested_downloads") or []
+        if downloads:
+            output_path = downloads[0].get("filepath")
+
+        self.journal.set_item(
+            job.journal_id, item_key, status, playlist_index, output_path
+        )
+
+    def text(self, key: str):
+        """
+        Translated text, resolved once per language. Used by the progress
+        hooks, which run many times per second.
+        """
+        language = self.translator.current_language
+        texts = self._texts.get(language)
+        if texts is None:
+            texts = self._texts[language] = {}
+        if key not in texts:
+            texts[key] = self.translator.get_text(key)
+        return texts[key]
+
+    def update_job(self, job: DownloadJob, label=None, progress=None, message=None):
+        """Updates the progress state of a job and notifies the interface."""
+        if label is not None:
+            job.label = label
+        if progress is not None:
+            job.progress = progress
+        if message is not None:
+            job.message = message
+        self.on_job_update(job)
+
+    # Callbacks para a interface
+    def on_job_start(self, job: DownloadJob):
+        """Called from the worker thread when a job starts."""
+        pass
+
+    def on_job_update(self, job: DownloadJob):
+        """Called from the worker thread when the progress of a job changes."""
+        pass
+
+    def on_job_done(self, job: DownloadJob):
+        """Called from the worker thread when a job ends (any final status)."""
+        pass
+
+    # endregion
+
+    # region Procurar vídeo
+    @traced("search_process", "engine")
+    def search_process(self, url=None):
+        if url is not None:
+            self.url = url
+
+        ydl_opts = {"skip_download": True, "quiet": True, "no_warnings": True}
+
+        process_pool = self.get_process_pool()
+        with tracer.span("extract_info", "yt-dlp", url=self.url):
+            if process_pool is not None:
+                data = process_pool.extract_info(
+                    self.url, ydl_opts, getattr(self.active_info_cache(), "path", None)
+                )
+            else:
+                with YoutubeDL(ydl_opts) as ydl:
+                    # Só as informações: as URLs dos streams podem estar vencidas
+                    data = extract_info(ydl, self.url, self.active_info_cache())
+
+        # Guarda a busca inteira: o download avançado parte dela
+        self.search_info = data
+        self.search_info_expires_at = streams_expire_at(data)
+
+        # Criar um dicionário com as informações para preview
+        preview_data = {
+            "title": data.get("title", "Sem título"),
+            "duration": data.get("duration", 0),
+            "uploader": data.get("uploader", "Desconhecido"),
+            "thumbnail_url": data.get("thumbnail", None),
+            "view_count": data.get("view_count", 0),
+        }
+        self.info_preview = preview_data
+        self.extract_video_formats(data)
+        self.search_concluded = True
+
+    # region Extrair informações do vídeo
+    @traced("extract_video_formats", "engine")
+    def extract_video_formats(self, data):
+        # Os formatos são lidos uma vez só, a aba avançada consulta o índice
+        self.format_index = FormatIndex(data.get("formats"))
+        self.info_formats = self.format_index.formats
+        self.info_presets = self.format_index.presets()
+        self.audio_id = self.format_index.default_audio_id
+
+    # region Download do vídeo
+    def download_process(self, job: DownloadJob):
+        with tracer.span("job", "engine", job=job.id, url=job.url) as span:
+            process_pool = self.get_process_pool()
+            if process_pool is not None:
+                self.download_in_process(process_pool, job)
+            else:
+                self.download_in_thread(job)
+            span.set(status=job.status)
+
+    def download_in_thread(self, job: DownloadJob):
+        """Runs the job in the current thread (the thread of the queue)."""
+        self.on_job_start(job)
+        self.record_status(job)
+        self.start_metrics(job)
+        try:
+            self.config_options(job)
+
+            # Processos do ffmpeg criados nesta thread são encerrados ao cancelar
+            with job.cancel_token.bind(), job.metrics.bind():
+                if job.type_download == "basic" and job.options["playlist"]:
+                    self.download_playlist(job)
+                else:
+                    self.download_single(job)
+
+            # Se chegou aqui, o download foi concluído
+            if not job.is_cancelled():
+                job.status = "finished"
+            elif job.pause_requested:
+                job.status = "paused"
+            else:
+                job.status = "cancelled"
+        except Exception as e:
+            # Verificar se foi um cancelamento intencional (o ffmpeg encerrado
+            # pelo cancelamento termina com um erro próprio)
+            cancelled = isinstance(e, DownloadCancelled) or job.is_cancelled()
+            if cancelled and job.pause_requested:
+                # Mantém os arquivos parciais para continuar depois
+                job.status = "paused"
+                job.label = self.translator.get_text("download_paused")
+            elif cancelled:
+                job.status = "cancelled"
+                with job.metrics.phase("cleanup"):
+                    self.cleanup_partial_downloads(job)
+            else:
+                job.status = "error"
+                job.error = str(e)
+
+        self.limiter.release(job.id)
+        self.record_status(job)
+        self.record_metrics(job)
+        self.on_job_done(job)
+
+    def download_in_process(self, process_pool, job: DownloadJob):
+        """Runs the job in a worker process, relaying its progress to the callbacks."""
+        self.on_job_start(job)
+        self.record_status(job)
+        self.start_metrics(job)
+        try:
+            result = process_pool.run_job(
+                job,
+                self.worker_spec(job),
+                lambda label, progress, message: self.update_job(
+                    job, label, progress, message
+                ),
+            )
+            job.status = result["status"]
+            job.error = result["error"]
+            job.label = result["label"]
+            job.message = result["message"]
+            job.progress = result["progress"]
+            job.skipped = result["skipped"]
+            job.done_items = set(result["done_items"])
+            job.partial_files.update(result["partial_files"])
+            job.metrics.load(result["metrics"])
+            tracer.extend(result["trace"])
+        except Exception as e:
+            job.status = "error"
+            job.error = str(e)
+
+        # Os jobs dos processos dividem o limite do gerenciador, os das threads o local
+        process_pool.limiter.release(job.id)
+        self.record_status(job)
+        self.record_metrics(job)
+        self.on_job_done(job)
+
+    def download_single(self, job: DownloadJob):
+        if job.url in job.done_items:
+            return
+
+        self.record_item(job, job.url, "running")
+        with YoutubeDL(job.ydl_opts) as ydl:
+            self.patch_cancellation(job, ydl)
+            self.instrument(job, ydl)
+            install_range_downloader(ydl)
+            if job.info is not None and time.time() < job.info_expires_at:
+                # Informações da busca: só a seleção de formato e o download
+                info = ydl.process_ie_result(dict(job.info), download=True)
+            else:
+                # Do cache, enquanto as URLs dos streams ainda valem
+                info = extract_info(
+                    ydl, job.url, self.active_info_cache(), download=True
+                )
+        if self.skipped_download(info):
+            job.skipped = 1
+        job.info = None
+        job.done_items.add(job.url)
+        self.record_item(job, job.url, "finished", info=info)
+
+    # region Download da playlist
+    # Itens lidos da extração plana à frente dos downloads, por thread da playlist
+    PLAYLIST_READ_AHEAD = 2
+    # Itens encontrados avisados de uma vez (on_playlist_entries)
+    PLAYLIST_PAGE_SIZE = 50
+
+    def download_playlist(self, job: DownloadJob):
+        """
+        Downloads the entries of a playlist in parallel.
+
+        The playlist is read with a lazy flat extraction (ids and titles only):
+        the pages of the playlist are only requested as the download threads
+        need more entries, a few entries ahead of them, so the first video
+        starts right after the first page. Reverse and random order need the
+        whole list and read it first. Each entry is then fully extracted and
+        downloaded by a pool of threads, each one with its own YoutubeDL,
+        keeping the same playlist fields that yt-dlp would give them so the
+        output template does not change.
+        """
+        flat_opts = dict(job.ydl_opts, extract_flat="in_playlist")
+        # Aberto até o fim: as próximas páginas são pedidas durante os downloads
+        with YoutubeDL(flat_opts) as ydl:
+            self.patch_cancellation(job, ydl)
+            with job.metrics.phase("extraction"):
+                with tracer.span("playlist_extraction", "yt-dlp", job=job.id):
+                    info = ydl.extract_info(job.url, download=False, process=False)
+                    # Redirecionamentos para outra URL (outro extrator)
+                    for _ in range(5):
+                        if info is None or info.get("_type") != "url":
+                            break
+                        info = ydl.extract_info(
+                            info["url"],
+                            download=False,
+                            process=False,
+                            ie_key=info.get("ie_key"),
+                        )
+
+            if info is None:
+                raise Exception("playlist extraction failed")
+
+            if info.get("_type", "video") not in ("playlist", "multi_video"):
+                # A URL não é uma playlist, baixa normalmente
+                if info.get("_type", "video") == "video":
+                    # Já extraído: o download parte destas informações
+                    job.info = info
+                    job.info_expires_at = streams_expire_at(info)
+                self.download_single(job)
+                return
+
+            self.download_entries(job, ydl, info)
+
+    def playlist_entries(self, job: DownloadJob, ydl: YoutubeDL, info: dict):
+        """
+        Returns the requested entries of a playlist, as (playlist_index, entry),
+        their count and the last requested playlist_index.
+
+        The entries are read lazily, page by page, except for reverse and
+        random order, which need the whole list. The count and the last index
+        give the zero padding of playlist_autonumber and playlist_index in the
+        output template, as in yt-dlp; they are None only for a generator of
+        unknown size.
+        """
+        entries = self.requested_entries(ydl, info)
+        if job.ydl_opts.get("playlistreverse") or job.ydl_opts.get("playlistrandom"):
+            entries = list(entries)
+            if job.ydl_opts.get("playlistreverse"):
+                entries.reverse()
+            else:
+                random.shuffle(entries)
+            last = max((index for index, _ in entries), default=0)
+            return entries, len(entries), last
+
+        return (entries, *self.requested_count(ydl, info))
+
+    @staticmethod
+    def playlist_size(info: dict):
+        """Number of entries of a playlist, or None for a generator."""
+        entries = info.get("entries")
+        if isinstance(entries, (list, tuple)):
+            return len(entries)
+        if info.get("playlist_count") is not None:
+            return info["playlist_count"]
+        if isinstance(entries, PagedList):
+            # Páginas sob demanda só são lidas quando o total não é informado
+            return len(entries)
+        return None
+
+    def requested_count(self, ydl: YoutubeDL, info: dict):
+        """
+        Count and last playlist_index of the requested entries of a playlist,
+        or (None, None) when its size is unknown.
+        """
+        size = self.playlist_size(info)
+        # Com lazy_playlist o yt-dlp também não conta os itens
+        if size is None or ydl.params.get("lazy_playlist"):
+            return None, None
+        # Mesma seleção do yt-dlp (playlist_items, playliststart...), sem ler os itens
+        placeholder = dict(info, entries=[None] * size, requested_entries=None)
+        indexes = {
+            index for index, _ in PlaylistEntries(ydl, placeholder).get_requested_items()
+        }
+        return len(indexes), max(indexes, default=0)
+
+    def requested_entries(self, ydl: YoutubeDL, info: dict):
+        """
+        Yields each requested entry of a playlist once, as (playlist_index, entry).
+
+        yt-dlp's PlaylistEntries keeps every entry it reads from a generator
+        (YouTube channels and playlists...), so any selection can go back to
+        them. When the selection only goes forward the generator is read
+        directly instead, and an entry is released as soon as its download
+        is done with it.
+        """
+        params = ydl.params
+        spec = params.get("playlist_items")
+        if not spec:
+            end = params.get("playlistend")
+            spec = f"{params.get('playliststart', 1)}:{'' if end in (-1, None) else end}"
+
+        entries = info.get("entries")
+        ranges = self.forward_ranges(spec)
+        if ranges is None or entries is None or isinstance(
+            entries, (list, PagedList, LazyList)
+        ):
+            # Listas já estão na memória; as páginas são lidas sob demanda
+            items = PlaylistEntries(ydl, info).get_requested_items()
+        else:
+            # Intervalos em ordem, sem repetições
+            yield from self.stream_entries(ydl, entries, ranges)
+            return
+
+        # Seleções como "1-3,2-5" repetem itens; só os índices são guardados
+        seen = set()
+        for playlist_index, entry in items:
+            if playlist_index not in seen:
+                seen.add(playlist_index)
+                yield playlist_index, entry
+
+    def stream_entries(self, ydl: YoutubeDL, entries, ranges: list):
+        """Reads the entries of a generator in the (start, stop, step) ranges."""
+        last = ranges[-1][1]
+        for playlist_index, entry in enumerate(entries, 1):
+            if any(
+                start <= playlist_index <= stop and (playlist_index - start) % step == 0
+                for start, stop, step in ranges
+            ):
+                yield playlist_index, entry
+                if entry and not ydl.params.get("lazy_playlist"):
+                    try:
+                        # Mesmo filtro do yt-dlp (--break-on-existing, --match-filter)
+                        ydl._match_entry(entry, incomplete=True, silent=True)
+                    except (ExistingVideoReached, RejectedVideoReached):
+                        return
+
+            # Não pede a página seguinte depois do último item
+            if playlist_index >= last:
+                return
+
+    @staticmethod
+    def forward_ranges(spec: str):
+        """
+        Ranges (start, stop, step) of a playlist_items selection, or None when
+        it counts items from the end, steps backwards or returns to earlier
+        items.
+        """
+        ranges = []
+        try:
+            for item in PlaylistEntries.parse_playlist_items(spec):
+                if isinstance(item, int):
+                    item = slice(item, item)
+                start = 1 if item.start is None else item.start
+                stop = float("inf") if item.stop is None else item.stop
+                step = item.step or 1
+                if start < 1 or stop < 1 or step < 1:
+                    return None
+                if ranges and start <= ranges[-1][1]:
+                    return None
+                ranges.append((start, stop, step))
+        except ValueError:
+            return None
+        return ranges or None
+
+    def on_playlist_entries(self, job: DownloadJob, entries: list):
+        """
+        Called with each batch of entries read from the playlist, before they
+        are downloaded: a list of (playlist_index, Entry), with the id, title
+        and URL of each entry. Interfaces can override it to list them.
+        """
+        if job.progress <= 0.01:
+            # Nada baixado ainda: mostra quantos itens já foram encontrados
+            self.update_job(
+                job,
+                label=self.text("playlist_entries_found").format(
+                    count=job.total_videos
+                ),
+            )
+
+    def download_entries(self, job: DownloadJob, flat_ydl: YoutubeDL, info: dict):
+        """
+        Downloads the entries of a playlist read by ``download_playlist``.
+
+        Each entry goes through the stages of a pipeline: it is read from the
+        playlist, extracted and downloaded by the playlist threads, converted
+        by the post-processing pool and recorded in the journal. At most
+        ``playlist_workers * PLAYLIST_READ_AHEAD`` entries are in the pipeline
+        at once, the next one is only read when an entry leaves it, and
+        nothing of an entry (info dict, YoutubeDL, futures, progress) is kept
+        after its last stage, so a playlist of thousands of items runs in the
+        same memory as a short one.
+        """
+        entries, n_entries, last_index = self.playlist_entries(job, flat_ydl, info)
+        # Mesmos campos que o yt-dlp adiciona a cada item da playlist
+        extra = YoutubeDL._playlist_infodict(
+            dict(
+                info,
+                playlist_count=self.playlist_size(info),
+                requested_entries=[last_index or 0],
+            ),
+            n_entries=n_entries,
+        )
+
+        job.total_videos = n_entries or 0
+        job.entry_progress = {}
+        job.entries_finished = 0
+        errors = []
+        skipped = []
+
+        # Cada item é baixado sozinho, então os erros são contados aqui
+        entry_opts = dict(job.ydl_opts, ignoreerrors=False)
+        info_cache = self.active_info_cache()
+
+        # Itens no pipeline (lidos, baixando ou convertendo): as páginas seguintes esperam
+        window = threading.Semaphore(self.playlist_workers * self.PLAYLIST_READ_AHEAD)
+        # Conversões em andamento; cada uma sai do conjunto ao terminar
+        postprocessing = set()
+        postprocessing_lock = threading.Lock()
+
+        def run_entry(position, playlist_index, entry):
+            # A vaga só é devolvida aqui se o item não seguiu para a conversão
+            handed_off = False
+            try:
+                handed_off = download_entry(position, playlist_index, entry)
+            finally:
+                if not handed_off:
+                    window.release()
+
+        @traced("playlist_entry", "engine")
+        def download_entry(position, playlist_index, entry):
+            if job.is_cancelled():
+                return False
+
+            item_key = entry.key
+            if item_key in job.done_items:
+                # Já baixado em uma execução anterior
+                self.finish_entry(job, position)
+                return False
+
+            if self.in_archive(job, entry):
+                skipped.append(item_key)
+                self.finish_entry(job, position)
+                self.record_item(job, item_key, "finished", playlist_index)
+                return False
+
+            entry_extra = dict(
+                extra, playlist_index=playlist_index, playlist_autonumber=position
+            )
+            self.record_item(job, item_key, "running", playlist_index)
+            ydl = YoutubeDL(entry_opts)
+            try:
+                with job.cancel_token.bind(), job.metrics.bind():
+                    self.patch_cancellation(job, ydl)
+                    self.instrument(job, ydl)
+                    install_range_downloader(ydl)
+                    # A conversão roda depois, no pool de pós-processamento
+                    deferred = DeferredPostProcessing(ydl)
+                    if entry.is_link and info_cache is not None:
+                        # Item que ainda precisa ser extraído: passa pelo cache
+                        info = extract_info(
+                            ydl,
+                            entry.url,
+                            info_cache,
+                            download=True,
+                            ie_key=entry.ie_key,
+                            extra_info=entry_extra,
+                        )
+                    else:
+                        info = ydl.process_ie_result(
+                            entry.to_info(), download=True, extra_info=entry_extra
+                        )
+            except Exception as e:
+                ydl.close()
+                self.finish_entry(job, position)
+                entry_failed(e, position, item_key, playlist_index)
+                return False
+
+            if self.skipped_download(info):
+                skipped.append(item_key)
+
+            # Entrega o arquivo baixado e já segue para o próximo item
+            future = self.postprocess_pool.submit(
+                post_process_entry,
+                ydl,
+                deferred,
+                info,
+                position,
+                item_key,
+                playlist_index,
+            )
+            with postprocessing_lock:
+                postprocessing.add(future)
+            future.add_done_callback(post_processed)
+            return True
+
+        @traced("post_process_entry", "engine")
+        def post_process_entry(ydl, deferred, info, position, item_key, playlist_index):
+            try:
+                with job.cancel_token.bind(), job.metrics.bind():
+                    job.cancel_token.raise_if_cancelled()
+                    deferred.run()
+                job.done_items.add(item_key)
+                self.record_item(job, item_key, "finished", playlist_index, info)
+            except Exception as e:
+                entry_failed(e, position, item_key, playlist_index)
+            finally:
+                # Último estágio: o item sai do pipeline e o próximo pode ser lido
+                ydl.close()
+                self.finish_entry(job, position)
+                window.release()
+
+        def post_processed(future):
+            with postprocessing_lock:
+                postprocessing.discard(future)
+
+        def entry_failed(e, position, item_key, playlist_index):
+            if isinstance(e, DownloadCancelled) or job.is_cancelled():
+                raise e
+            print(f"Erro no item {position} da playlist: {e}")
+            self.record_item(job, item_key, "error", playlist_index)
+            errors.append(str(e))
+
+        def next_entry(iterator):
+            # Ler um item pode pedir a próxima página da playlist
+            start = now_us()
+            try:
+                return next(iterator, None)
+            finally:
+                end = now_us()
+                job.metrics.add_phase("extraction", (end - start) / 1e6)
+                if end - start > 1000:
+                    tracer.add("playlist_page", start, end, "yt-dlp", {"job": job.id})
+
+        def finished(futures):
+            # Propaga o cancelamento dos itens que já terminaram
+            for future in [future for future in futures if future.done()]:
+                futures.discard(future)
+                future.result()
+
+        running = set()
+        found = []
+        submitted = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.playlist_workers) as executor:
+                iterator = iter(entries)
+                position = 0
+                while True:
+                    job.cancel_token.raise_if_cancelled()
+                    item = next_entry(iterator)
+                    if item is None:
+                        break
+                    position += 1
+                    playlist_index, entry = item
+                    if not entry:
+                        continue
+
+                    # Só o que o download usa; o dict do item é liberado
+                    entry = Entry.from_info(entry)
+                    job.total_videos = max(job.total_videos, position)
+                    found.append((playlist_index, entry))
+                    if len(found) >= self.PLAYLIST_PAGE_SIZE:
+                        self.on_playlist_entries(job, found)
+                        found = []
+
+                    if not window.acquire(blocking=False):
+                        # Os downloads vão demorar: mostra o que já foi lido
+                        if found:
+                            self.on_playlist_entries(job, found)
+                            found = []
+                        window.acquire()
+                    finished(running)
+
+                    running.add(
+                        executor.submit(run_entry, position, playlist_index, entry)
+                    )
+                    submitted += 1
+
+                if found:
+                    self.on_playlist_entries(job, found)
+                # Total final, já sem os itens vazios do fim
+                job.total_videos = position
+                for future in as_completed(running):
+                    future.result()
+        finally:
+            # Espera as conversões que já começaram, mesmo se cancelado
+            with postprocessing_lock:
+                pending = list(postprocessing)
+            for future in pending:
+                future.exception()
+
+        for future in pending:
+            future.result()
+
+        job.skipped = len(skipped)
+        if submitted and len(errors) == submitted:
+            raise Exception(errors[0])
+
+    # region Verificação de cancelamento
+    def patch_cancellation(self, job: DownloadJob, ydl: YoutubeDL):
+        """Injects the cancel check and the status updates in a YoutubeDL instance."""
+        original_sanitize_info = ydl.sanitize_info
+        original_extract_info = ydl.extract_info
+        original_urlopen = ydl.urlopen
+
+        def patched_sanitize_info(info_dict, remove_private=True):
+            job.cancel_token.raise_if_cancelled()
+            return original_sanitize_info(info_dict, remove_private)
+
+        def patched_urlopen(req):
+            # Antes de cada requisição (páginas, fragmentos, partes do arquivo)
+            job.cancel_token.raise_if_cancelled()
+            return original_urlopen(req)
+
+        def patched_extract_info(url, download=True, *args, **kwargs):
+            job.cancel_token.raise_if_cancelled()
+
+            # Atualiza a interface para mostrar que está baixando informações
+            if job.options.get("playlist") and job.total_videos > 1:
+                label = self.text("status")[9].format(
+                    index=job.current_video, count=job.total_videos
+                )
+            else:
+                label = self.text("status")[8]
+            self.update_job(job, label=label, progress=0.01, message="")
+
+            return original_extract_info(url, download, *args, **kwargs)
+
+        ydl.sanitize_info = patched_sanitize_info
+        ydl.extract_info = patched_extract_info
+        ydl.urlopen = patched_urlopen
+
+    # region Métricas
+    def start_metrics(self, job: DownloadJob):
+        if job.metrics.started_at is None:
+            job.metrics.started_at = time.time()
+
+    def record_metrics(self, job: DownloadJob):
+        """Adds the job to the metrics when it ends (paused jobs are added when they end)."""
+        if job.status == "paused":
+            return
+        try:
+            self.metrics.record(job)
+        except Exception as e:
+            print(f"Erro ao registrar as métricas do job: {e}")
+
+    def instrument(self, job: DownloadJob, ydl: YoutubeDL):
+        """
+        Measures the phases of each item downloaded by a YoutubeDL instance.
+
+        From the start of ``extract_info``/``process_ie_result`` to
+        ``process_video_result`` is the extraction, from there to
+        ``process_info`` is the format selection, and ``process_info`` itself
+        is the download, without the post-processing that runs inside it
+        (measured by the postprocessor hook). The phases also become spans
+        of the trace, when tracing is on.
+        """
+        metrics = job.metrics
+        marks = self._phase_marks
+        # Os downloaders contam as novas tentativas no job deste YoutubeDL
+        ydl.job_metrics = metrics
+
+        def phase(name, start, end, duration=None):
+            # Tempos em microssegundos (now_us), como no trace
+            if duration is None:
+                duration = end - start
+            metrics.add_phase(name, duration / 1e6)
+            tracer.add(name, start, end, "yt-dlp", {"job": job.id})
+
+        def entry_point(original):
+            def wrapper(*args, **kwargs):
+                depth = getattr(marks, "depth", 0)
+                if depth == 0 and not getattr(marks, "extracted", False):
+                    marks.mark = now_us()
+                    marks.postprocess = 0
+                marks.extracted = False
+                marks.depth = depth + 1
+                try:
+                    result = original(*args, **kwargs)
+                finally:
+                    marks.depth = depth
+                # extract_info(process=False): a extração continua no
+                # process_ie_result seguinte (informações que vão para o cache)
+                if depth == 0 and kwargs.get("process") is False:
+                    marks.extracted = result is not None
+                return result
+
+            return wrapper
+
+        original_process_video_result = ydl.process_video_result
+        original_process_info = ydl.process_info
+
+        def process_video_result(*args, **kwargs):
+            now = now_us()
+            phase("extraction", getattr(marks, "mark", now), now)
+            marks.mark = now
+            return original_process_video_result(*args, **kwargs)
+
+        def process_info(*args, **kwargs):
+            start = now_us()
+            phase("format_selection", getattr(marks, "mark", start), start)
+            postprocess = getattr(marks, "postprocess", 0)
+            try:
+                return original_process_info(*args, **kwargs)
+            finally:
+                marks.mark = now_us()
+                postprocess = getattr(marks, "postprocess", 0) - postprocess
+                phase("download", start, marks.mark, marks.mark - start - postprocess)
+
+        ydl.extract_info = entry_point(ydl.extract_info)
+        ydl.process_ie_result = entry_point(ydl.process_ie_result)
+        ydl.process_video_result = process_video_result
+        ydl.process_info = process_info
+
+    def measure_postprocessor(self, job: DownloadJob, d):
+        """Adds the time of a postprocessor to the merge or postprocess phase."""
+        marks = self._phase_marks
+        if d["status"] == "started":
+            marks.postprocessor_start = now_us()
+            return
+        if d["status"] != "finished":
+            return
+
+        start = getattr(marks, "postprocessor_start", None)
+        if start is None:
+            return
+        marks.postprocessor_start = None
+        end = now_us()
+        # Descontado do download quando roda dentro do process_info
+        marks.postprocess = getattr(marks, "postprocess", 0) + end - start
+        phase = "merge" if d.get("postprocessor") == "Merger" else "postprocess"
+        job.metrics.add_phase(phase, (end - start) / 1e6)
+        tracer.add(
+            d.get("postprocessor") or phase, start, end, "postprocess", {"job": job.id}
+        )
+
+    # region Configurações do ydl
+    @traced("config_options", "engine")
+    def config_options(self, job: DownloadJob) -> dict:
+        options = job.options
+
+        # Configurações base comuns
+        job.ydl_opts = {
+            "progress_hooks": [lambda d: self.progress_hooks(job, d)],
+            "postprocessor_hooks": [lambda d: self.postprocessor_hook(job, d)],
+            "ffmpeg_location": options["ffmpeg_path"],
+            "quiet": True,  # Desabilita o modo quieto para receber as mensagens
+            "no_warnings": True,  # Permite receber avisos
+        }
+
+        # Pula os vídeos que já foram baixados antes
+        if self.archive is not None and self.use_archive:
+            job.ydl_opts["download_archive"] = self.archive
+
+        # Conexões por arquivo para formatos progressivos (um único arquivo HTTP)
+        job.ydl_opts["range_split_connections"] = self.range_connections
+
+        # Fragmentos em paralelo (DASH/HLS) e tamanho dos pedaços (HTTP) do site
+        if self.tuner is not None:
+            job.ydl_opts.update(self.tuner.options_for(job.url))
+
+        if job.type_download == "basic":
+            # Configurações específicas para playlist
+            if options["playlist"]:
+                job.ydl_opts.update(
+                    {
+                        "outtmpl": os.path.join(
+                            options["download_path"],
+                            "%(playlist)s/%(playlist_autonumber)s - %(title)s.%(ext)s",
+                        ),  # Cria pasta com nome da playlist # TODO colocar como opcional
+                        "ignoreerrors": True,  # Continua mesmo se um vídeo falhar
+                        "playlist": True,
+                        "yes_playlist": True,
+                    }
+                )
+                # Se especificado os itens da playlist
+                if options["playlist_items"]:
+                    job.ydl_opts["playlist_items"] = options["playlist_items"]
+                # Se especificado o reverso da playlist
+                if options["playlist_reverse"]:
+                    job.ydl_opts["playlistreverse"] = options["playlist_reverse"]
+                # Se especificado o aleatório da playlist
+                if options["playlist_random"]:
+                    job.ydl_opts["playlistrandom"] = options["playlist_random"]
+
+            else:
+                job.ydl_opts["outtmpl"] = os.path.join(
+                    options["download_path"], "%(title)s.%(ext)s"
+                )
+
+            # Se é audio
+            if options["media"] in self.translator.get_text("audio"):
+                job.ydl_opts.update(
+                    {
+                        "format": "bestaudio/best",
+                        "postprocessors": [
+                            {
+                                "key": "FFmpegExtractAudio",
+                                "preferredcodec": options["format"],
+                                "preferredquality": "192",
+                            }
+                        ],
+                    }
+                )
+            else:  # Se é video
+                job.ydl_opts.update(
+                    {
+                        "format": f'bestvideo[height<={options["quality"]}]+bestaudio/best[height<={options["quality"]}]',
+                        "merge_output_format": options["format"],
+                    }
+                )
+        elif job.type_download == "advanced":
+            # Configurações avançadas
+
+            job.ydl_opts["outtmpl"] = os.path.join(
+                options["download_path"], "%(title)s.%(ext)s"
+            )
+
+            if not options.get("custom_format"):
+                job.ydl_opts["format"] = f"{options['format_id']}+bestaudio"
+            else:
+                custom_format = options["custom_format"]
+
+                # Encontrar melhores formatos (índice criado uma vez por job)
+                if job.format_index is None:
+                    job.format_index = FormatIndex(job.info_formats)
+                formatos = self.find_best_video_format(
+                    job.format_index,
+                    int(custom_format["video_quality"]),
+                    custom_format["video_codec"],
+                    custom_format["container"],
+                )
+
+                # Construir format string
+                format_string = self.construir_format_string(formatos)
+
+                job.ydl_opts.update(
+                    {
+                        "format": format_string,
+                        "postprocessors": [
+                            {
+                                "key": "FFmpegVideoConvertor",
+                                "preferedformat": custom_format["container"],
+                            }
+                        ],
+                        "postprocessor_args": {
+                            "FFmpegVideoConvertor": self.postprocessor_args(
+                                custom_format
+                            ),
+                        },
+                    }
+                )
+
+        # Retomada: reaproveita as opções resolvidas na primeira execução
+        job.ydl_opts.update(job.resume_opts)
+
+        if self.journal is not None and job.journal_id is not None:
+            self.journal.set_job_opts(job.journal_id, job.ydl_opts)
+
+        return job.ydl_opts
+
+    def postprocessor_args(self, custom_format):
+        """
+        Gera os argumentos do postprocessador com base nas configurações avançadas do usuário.
+
+        Args:
+            custom_format (dict): Dicionário contendo as configurações personalizadas do usuário.
+
+        Returns:
+            list: Lista de argumentos para o postprocessador.
+        """
+        args = []
+
+        # Codec de vídeo
+        codec_map = {
+            "h264": "libx264",
+            "h265": "libx265",
+            "vp9": "libvpx-vp9",
+            "av1": "libaom-av1",
+        }
+
+        codec = codec_map.get(custom_format["video_codec"], "libx264")
+        args.extend(["-codec:v", codec])
+
+        # Codec de áudio
+        args.extend(["-codec:a", custom_format["audio_codec"]])
+
+        # Qualidade de compressão
+        crf_map = {
+            "libx264": {"1": "18", "2": "23", "3": "28"},  # H.264
+            "libx265": {"1": "22", "2": "28", "3": "32"},  # H.265
+            "libvpx-vp9": {"1": "24", "2": "30", "3": "36"},  # VP9
+            "libaom-av1": {"1": "23", "2": "30", "3": "37"},  # AV1
+        }
+
+        if codec and custom_format["compression_quality"] in crf_map[codec]:
+            crf_value = crf_map[codec][custom_format["compression_quality"]]
+            args.extend(["-crf", crf_value])
+
+        # Velocidade de codificação
+        encoding_map = {
+            "libx264": {
+                "0": "ultrafast",
+                "1": "fast",
+                "2": "medium",
+                "3": "slow",
+                "4": "veryslow",
+            },
+            "libx265": {
+                "0": "ultrafast",
+                "1": "fast",
+                "2": "medium",
+                "3": "slow",
+                "4": "veryslow",
+            },
+            "libvpx-vp9": {"0": "realtime", "1": "good", "2": "best"},
+            "libaom-av1": {"0": "2", "1": "3", "2": "4", "3": "6", "4": "8"},
+        }
+        encoding_type = {
+            "libx264": "preset",
+            "libx265": "preset",
+            "libvpx-vp9": "deadline",
+            "libaom-av1": "cpu-used",
+        }
+
+        enconding_speed = encoding_map.get(codec, {}).get(
+            str(custom_format["encoding_speed"]), "medium"
+        )
+
+        args.extend(["-" + encoding_type[codec], enconding_speed])
+
+        print("Postprocessor args:", args)
+        return args
+
+    # region Pós-processamento do download
+    def postprocessor_hook(self, job: DownloadJob, d):
+        self.measure_postprocessor(job, d)
+        job.cancel_token.raise_if_cancelled()
+
+        if d["status"] == "finished":
+            if job.options.get("playlist"):
+                message = self.text("status")[11].format(
+                    index=job.current_video, count=job.total_videos
+                )
+            else:
+                message = self.text("status")[12]
+
+            self.update_job(job, progress=1, message=message)
+
+    # region Progress do download
+    def throttle(self, job: DownloadJob, d):
+        """Draws the bytes received since the last update from the bandwidth limiter."""
+        filename = d.get("filename")
+        downloaded = d.get("downloaded_bytes") or 0
+
+        if filename not in job.bytes_seen:
+            # Primeira atualização: pode incluir a parte já baixada antes (retomada)
+            job.bytes_seen[filename] = downloaded
+            return
+
+        # Com fragmentos em paralelo os totais podem chegar fora de ordem
+        last = job.bytes_seen[filename]
+        if downloaded <= last:
+            return
+        job.bytes_seen[filename] = downloaded
+
+        self.limiter.consume(job.id, downloaded - last, job.weight, job.cancel_token)
+        job.cancel_token.raise_if_cancelled()
+
+    def forget_file(self, job: DownloadJob, filename):
+        """
+        Drops the state kept for a file while it downloads. A finished file
+        is no longer partial, and long playlists would keep one of each.
+        """
+        job.partial_files.discard(filename)
+        job.bytes_seen.pop(filename, None)
+        job.fragmented.discard(filename)
+
+    def record_transfer(self, job: DownloadJob, d):
+        """Reports the throughput of a finished file to the fragment tuner."""
+        if self.tuner is None or self.limiter.rate:
+            # Com limite de banda a velocidade medida não diz nada
+            return
+        if d.get("range_connections"):
+            # Baixado em ranges: o http_chunk_size não foi usado
+            return
+
+        if d.get("filename") in job.fragmented:
+            option = "concurrent_fragment_downloads"
+        else:
+            option = "http_chunk_size"
+
+        self.tuner.record(
+            job.url,
+            option,
+            d.get("total_bytes") or d.get("downloaded_bytes") or 0,
+            d.get("elapsed"),
+            job.ydl_opts.get(option),
+        )
+
+    # Atualiza a barra de progresso e o status de download
+    def progress_hooks(self, job: DownloadJob, d):
+        job.cancel_token.raise_if_cancelled()
+
+        # Guarda os arquivos do job para limpar somente eles se cancelar
+        # (a limpeza também acha os temporários: nome.part, nome.part-Frag...)
+        if d.get("filename"):
+            job.partial_files.add(d["filename"])
+
+        info_dict = d.get("info_dict", {})
+        playlist_index = info_dict.get("playlist_autonumber")
+        # Playlists lidas aos poucos não sabem o total: usa os itens já lidos
+        playlist_count = info_dict.get("n_entries") or job.total_videos or None
+
+        if job.options.get("playlist") and playlist_index is not None:
+            job.total_videos = playlist_count
+            job.current_video = playlist_index + 1
+
+        if d.get("fragment_index") is not None:
+            job.fragmented.add(d.get("filename"))
+
+        if d["status"] == "finished":
+            self.record_transfer(job, d)
+            if d.get("elapsed") is not None:
+                # Sem "elapsed" o arquivo já existia e não foi baixado
+                job.metrics.record_file(
+                    d.get("total_bytes") or d.get("downloaded_bytes") or 0, d["elapsed"]
+                )
+            self.forget_file(job, d.get("filename"))
+
+        if d["status"] == "downloading":
+            self.throttle(job, d)
+            job.metrics.record_speed(d.get("speed"))
+
+            try:
+                if playlist_index is not None and playlist_count is not None:
+                    label = self.text("status")[6].format(
+                        index=playlist_index, count=playlist_count
+                    )
+                else:
+                    label = self.text("status")[5]
+
+                # Obtém o total de bytes
+                total_bytes = d.get("total_bytes")
+
+                # Se total_bytes não estiver disponível, tenta total_bytes_estimate
+                if total_bytes is None:
+                    total_bytes = d.get("total_bytes_estimate", 0)
+
+                # Obtém os bytes baixados
+                downloaded_bytes = d.get("downloaded_bytes", 0)
+
+                # Calcula a porcentagem
+                if total_bytes > 0:
+                    percentage = downloaded_bytes / total_bytes
+
+                    # Calcula velocidade em MB/s
+                    speed = d.get("speed", 0)
+                    if speed:
+                        speed_mb = speed / 1024 / 1024  # Converte para MB/s
+
+                        # Calcula tempo restante
+                        eta = d.get("eta", 0)
+                        if eta:
+                            eta_min = eta // 60
+                            eta_sec = eta % 60
+
+                            # Atualiza o texto de status com todas as informações
+                            status_text = self.text("downloading_progress")[0].format(
+                                percent=f"{percentage:.1%}",
+                                speed=f"{speed_mb:.1f}",
+                                eta_min=f"{eta_min:.0f}",
+                                eta_sec=f"{eta_sec:.0f}",
+                            )
+                        else:
+                            status_text = self.text("downloading_progress")[1].format(
+                                percent=f"{percentage:.1%}", speed=f"{speed_mb:.1f}"
+                            )
+                    else:
+                        status_text = self.text("downloading_progress")[2].format(
+                            percent=f"{percentage:.1%}"
+                        )
+
+                    self.update_job(
+                        job,
+                        label=label,
+                        progress=self.playlist_progress(job, playlist_index, percentage),
+                        message=status_text,
+                    )
+                else:
+                    self.update_job(job, label=label)
+            except Exception as e:
+                # TODO ver isso aqui
+                print(f"Erro ao atualizar progresso: {str(e)}")
+                pass
+
+        elif d["status"] == "finished":
+            if playlist_index is not None and playlist_count is not None:
+                label = self.text("status")[7].format(
+                    index=playlist_index, count=playlist_count
+                )
+            else:
+                label = self.text("status")[2]
+
+            self.update_job(
+                job,
+                label=label,
+                progress=self.playlist_progress(job, playlist_index, 0.98),
+                message="",
+            )
+
+        elif d["status"] == "error":
+            # TODO configurar caso erro
+            self.update_job(job, label=self.text("status")[3], progress=0)
+
+    def playlist_progress(self, job: DownloadJob, playlist_index, percentage):
+        """
+        Returns the overall progress of the job.
+
+        When the items of a playlist run in parallel, the progress bar shows
+        the average of all items instead of jumping between them.
+        """
+        if job.entry_progress is None or playlist_index is None:
+            return percentage
+
+        job.entry_progress[playlist_index] = percentage
+        return (job.entries_finished + sum(job.entry_progress.values())) / max(
+            job.total_videos, 1
+        )
+
+    def finish_entry(self, job: DownloadJob, playlist_index):
+        """
+        Counts a playlist item as done. Only the items still running stay in
+        ``entry_progress``, so each update sums a handful of values.
+        """
+        job.entry_progress.pop(playlist_index, None)
+        job.entries_finished += 1
+        job.progress = (job.entries_finished + sum(job.entry_progress.values())) / max(
+            job.total_videos, 1
+        )
+
+    # region Limpar downloads parciais
+    def cleanup_partial_downloads(self, job: DownloadJob):
+        """
+        Remove os arquivos parciais criados pelo job.
+
+        Somente os arquivos vistos nos hooks de progresso do job são
+        considerados, para não apagar downloads de outros jobs em andamento
+        na mesma pasta. São removidos:
+        - Arquivos .part (downloads parciais) e seus fragmentos
+        - Arquivos .ytdl (arquivos temporários do YouTube-DL)
+        - Arquivos vazios (0 bytes)
+
+        A limpeza ajuda a evitar o acúmulo de downloads incompletos.
+        """
+
+        def try_remove_file(filepath, max_attempts=5):
+            """Tenta remover um arquivo com várias tentativas e delay."""
+            for attempt in range(max_attempts):
+                try:
+                    os.remove(filepath)
+                    print(f"Arquivo parcial removido: {os.path.basename(filepath)}")
+                    return True
+                except PermissionError:
+                    print(
+                        f"Arquivo em uso, tentativa {attempt + 1} de {max_attempts}: {os.path.basename(filepath)}"
+                    )
+                    time.sleep(0.5)  # Reduzido para 0.5 segundos
+                except Exception as e:
+                    print(f"Erro ao tentar remover {os.path.basename(filepath)}: {e}")
+                    time.sleep(0.5)
+            return False
+
+        try:
+            candidates = set()
+            for filename in job.partial_files:
+                candidates.update(glob.glob(glob.escape(filename) + "*"))
+
+            for full_path in candidates:
+                file = os.path.basename(full_path)
+
+                # Verifica se o arquivo é um download parcial
+                is_partial = (
+                    file.endswith(".part")
+                    or file.endswith(".ytdl")
+                    or ".part-Frag" in file
+                    or
+                    # Adiciona outras extensões de arquivo parcial se necessário
+                    (os.path.isfile(full_path) and os.path.getsize(full_path) == 0)
+                )
+
+                if is_partial:
+                    try_remove_file(full_path)
+        except Exception as error:
+            print(f"Erro ao limpar downloads: {error}")
+
+    # region Encontrar o melhor formato de vídeo
+    def find_best_video_format(
+        self, formats, resolucao_desejada, codec_desejado, formato_desejado
+    ):
+        """
+        Encontra o melhor format_id baseado nas preferências do usuário
+
+        Args:
+            formats: list (formatos retornados pelo yt-dlp) ou FormatIndex
+            resolucao_desejada: int (ex: 1080, 720, 480)
+            codec_desejado: str ('h264', 'h265', 'vp9', 'av1')
+            formato_desejado: str ('mp4', 'mkv', 'webm')
+        """
+        if not isinstance(formats, FormatIndex):
+            formats = FormatIndex(formats)
+        return formats.best_video(resolucao_desejada, codec_desejado, formato_desejado)
+
+    # region Construir a string de formato
+    def construir_format_string(self, formatos_ordenados, incluir_audio=True):
+        """Constrói a string de format baseada nos melhores matches"""
+        return format_string(formatos_ordenados, incluir_audio)
@@ -0,0 +1,230 @@
+import itertools
+import threading
+import time
+from collections import deque
+from .cancellation import CancelToken
+from .metrics import JobMetrics
+
+
+class DownloadJob:
+    """
+    Represents a single download request in the queue.
+
+    Every job owns its own options, yt-dlp configuration, cancel flag and
+    progress state, so several jobs can run side by side without sharing
+    mutable state.
+
+    Attributes:
+        id (int): Unique, increasing job identifier
+        type_download (str): "basic" or "advanced"
+        options (dict): Download options built by the UI (url, path, format...)
+        info_formats (list): Format records captured from the search (advanced only)
+        format_index (FormatIndex): Index of ``info_formats``, shared with the
+            search or built on the first custom format query
+        info (dict): Info dict of the search, downloaded without a new extraction
+            until ``info_expires_at`` (advanced only)
+        ydl_opts (dict): yt-dlp options built for this job
+        cancel_token (CancelToken): Cancelled when the job must stop (cancel or pause)
+        status (str): "queued", "running", "paused", "finished", "error" or "cancelled"
+        label (str): Current status line
+        message (str): Current detail line (speed, ETA...)
+        progress (float): Progress from 0 to 1
+        error (str): Error message when the job fails
+        journal_id (int): Id of the job in the JobJournal, if any
+        done_items (set): Items already downloaded, before a pause or in a previous run
+        skipped (int): Items skipped because they are in the download archive
+        weight (float): Share of the bandwidth limit relative to the other jobs
+        metrics (JobMetrics): Phase timings, bytes and retries of the job
+        ui: Handle owned by the interface (progress popup, panel row...)
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, type_download: str, options: dict, info_formats=None):
+        self.id = next(self._ids)
+        self.type_download = type_download
+        self.options = dict(options)
+        self.info_formats = list(info_formats or [])
+        self.format_index = None
+        self.info = None
+        self.info_expires_at = 0.0
+        self.ydl_opts = {}
+        self.cancel_token = CancelToken()
+        self.pause_requested = False
+
+        self.status = "queued"
+        self.label = ""
+        self.message = ""
+        self.progress = 0.0
+        self.total_videos = 0
+        self.current_video = 0
+        self.error = None
+        self.partial_files = set()
+        self.entry_progress = None
+        self.entries_finished = 0
+
+        # Diário de jobs (retomada após fechar o aplicativo)
+        self.journal_id = None
+        self.done_items = set()
+        self.skipped = 0
+
+        # Limite de banda: peso do job e bytes já contados por arquivo
+        self.weight = 1.0
+        self.bytes_seen = {}
+        self.fragmented = set()
+        self.resume_opts = {}
+
+        # Métricas de desempenho (tempo de cada fase, bytes, novas tentativas)
+        self.metrics = JobMetrics()
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.ui = None
+
+    @property
+    def url(self) -> str:
+        return self.options.get("url", "")
+
+    def cancel(self):
+        """Requests the job to stop as soon as possible."""
+        self.pause_requested = False
+        self.cancel_token.cancel()
+
+    def pause(self):
+        """Requests the job to stop keeping its partial files, so it can be resumed."""
+        self.pause_requested = True
+        self.cancel_token.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_token.is_cancelled()
+
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+class DownloadQueue:
+    """
+    FIFO queue of download jobs executed by a bounded pool of threads.
+
+    At most ``max_workers`` jobs run at the same time; the others wait in
+    order. Each running job gets its own daemon thread, started as soon as a
+    slot becomes free.
+
+    Args:
+        runner (callable): Function called with the job to execute it
+        max_workers (int): Number of jobs allowed to run in parallel
+    """
+
+    def __init__(self, runner, max_workers: int = 2):
+        self.runner = runner
+        self.max_workers = max(1, int(max_workers))
+        self.jobs = {}
+        self._pending = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, job: DownloadJob) -> DownloadJob:
+        """Adds a job to the end of the queue and starts it if a slot is free."""
+        with self._lock:
+            self.jobs[job.id] = job
+            self._pending.append(job)
+        self._dispatch()
+        return job
+
+    def set_max_workers(self, max_workers: int):
+        """Changes the number of parallel jobs. Running jobs are not interrupted."""
+        with self._lock:
+            self.max_workers = max(1, int(max_workers))
+        self._dispatch()
+
+    def get(self, job_id: int):
+        return self.jobs.get(job_id)
+
+    def active_jobs(self) -> list:
+        """Returns the queued and running jobs, in submission order."""
+        with self._lock:
+            return [job for job in self.jobs.values() if job.is_active()]
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancels a queued or running job. Returns False if the job is unknown."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+
+        job.cancel()
+        with self._lock:
+            if job in self._pending:
+                # Ainda não começou, basta tirar da fila
+                self._pending.remove(job)
+                job.status = "cancelled"
+            elif job.status == "paused":
+                job.status = "cancelled"
+        return True
+
+    def pause(self, job_id: int) -> bool:
+        """
+        Pauses a queued or running job. A running job stops at the next
+        progress update and keeps its partial files.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or not job.is_active():
+            return False
+
+        job.pause()
+        with self._lock:
+            if job in self._pending:
+                self._pending.remove(job)
+                job.status = "paused"
+        return True
+
+    def resume(self, job_id: int) -> bool:
+        """Puts a paused job back at the end of the queue."""
+        job = self.jobs.get(job_id)
+        if job is None or job.status != "paused":
+            return False
+
+        job.pause_requested = False
+        job.cancel_token.reset()
+        with self._lock:
+            job.status = "queued"
+            self._pending.append(job)
+        self._dispatch()
+        return True
+
+    def remove(self, job_id: int) -> bool:
+        """Forgets a job that has ended. Queued, running and paused jobs are kept."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.is_active() or job.status == "paused":
+                return False
+            del self.jobs[job_id]
+        return True
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            self.cancel(job.id)
+
+    def _dispatch(self):
+        """Starts pending jobs while there are free worker slots."""
+        with self._lock:
+            while self._pending and self._running < self.max_workers:
+                job = self._pending.popleft()
+                self._running += 1
+                job.status = "running"
+                job.started_at = time.time()
+                thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+                thread.start()
+
+    def _run(self, job: DownloadJob):
+        try:
+            self.runner(job)
+        except Exception as e:
+            print(f"Erro inesperado no download {job.id}: {e}")
+            job.status = "error"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from .records import Format
+
+# Contêineres de áudio que combinam com cada contêiner de vídeo sem recodificar
+AUDIO_CONTAINERS = {"mp4": ("m4a", "mp4"), "webm": ("webm",), "mkv": ()}
+
+# Pontuação da busca por formato: resolução exata, codec e contêiner
+SCORE_HEIGHT = 100
+SCORE_CODEC = 50
+SCORE_CONTAINER = 25
+SCORE_PER_PIXEL_ROW = 0.01
+
+
+class FormatIndex:
+    """
+    Index of the formats of one info dict, built once and queried by the
+    presets of the advanced tab, the custom format search and the format
+    string.
+
+    Each format is read a single time: the codec family, height, fps and
+    container are resolved when the index is built, and the video formats
+    are grouped by each of them. The audio-only formats are kept sorted by
+    bitrate, which gives the candidates to pair with each container.
+
+    Args:
+        formats (list): Formats of the info dict, as returned by yt-dlp
+    """
+
+    def __init__(self, formats):
+        # Registros compactos: os dicts do yt-dlp podem ser liberados
+        self.formats = [
+            fmt if isinstance(fmt, Format) else Format.from_info(fmt)
+            for fmt in formats or []
+        ]
+        # Formatos com vídeo, na ordem do yt-dlp (da pior para a melhor qualidade)
+        self.video = []
+        self.audio = []
+        self.by_codec = defaultdict(list)
+        self.by_height = defaultdict(list)
+        self.by_fps = defaultdict(list)
+        self.by_container = defaultdict(list)
+        self.default_audio_id = None
+        self._rankings = {}
+
+        for fmt in self.formats:
+            if not fmt.has_video:
+                if fmt.has_audio:
+                    self.audio.append(fmt)
+                    if self.default_audio_id is None and fmt.default_audio:
+                        self.default_audio_id = fmt.format_id
+                continue
+            if not fmt.height:
+                continue
+
+            self.video.append(fmt)
+            self.by_codec[fmt.codec].append(fmt)
+            self.by_height[fmt.height].append(fmt)
+            self.by_fps[fmt.fps].append(fmt)
+            self.by_container[fmt.ext].append(fmt)
+
+        self.audio.sort(key=lambda fmt: fmt.abr or fmt.tbr or 0, reverse=True)
+
+    def presets(self) -> list:
+        """
+        Video presets of the advanced tab (Format records with a known fps),
+        sorted by resolution and then fps (highest first).
+        """
+        presets = [
+            fmt
+            for fmt in self.video
+            if fmt.format_id is not None and fmt.ext and fmt.fps is not None
+        ]
+        presets.sort(key=lambda fmt: (int(fmt.height), int(fmt.fps)), reverse=True)
+        return presets
+
+    def resolutions(self) -> list:
+        """Heights available, highest first."""
+        return sorted(self.by_height, reverse=True)
+
+    def audio_candidates(self, container: str = None) -> list:
+        """
+        Audio-only formats to pair with a video in ``container``, best first:
+        the ones that fit the container without re-encoding come first.
+        """
+        accepted = AUDIO_CONTAINERS.get((container or "").lower())
+        if not accepted:
+            return list(self.audio)
+        matching = [fmt for fmt in self.audio if fmt.ext in accepted]
+        return matching + [fmt for fmt in self.audio if fmt.ext not in accepted]
+
+    def best_video(self, height: int, codec: str, container: str) -> list:
+        """
+        Video formats ranked by how well they match the wanted resolution,
+        codec and container (same ranking as find_best_video_format). The
+        result of each query is kept, so repeated queries are free.
+        """
+        key = (height, (codec or "").lower(), (container or "").lower())
+        ranking = self._rankings.get(key)
+        if ranking is not None:
+            return ranking
+
+        height, codec, container = key
+        ranking = []
+        for fmt in self.video:
+            resolucao_match = fmt.height == height
+            codec_match = fmt.codec == codec
+            formato_match = fmt.ext == container
+
+            score = fmt.height * SCORE_PER_PIXEL_ROW
+            if resolucao_match:
+                score += SCORE_HEIGHT
+            if codec_match:
+                score += SCORE_CODEC
+            if formato_match:
+                score += SCORE_CONTAINER
+
+            ranking.append(
+                {
+                    "format_id": fmt.format_id,
+                    "height": fmt.height,
+                    "vcodec": fmt.codec,
+                    "ext": fmt.ext,
+                    "score": score,
+                    "resolucao_match": resolucao_match,
+                    "codec_match": codec_match,
+                    "formato_match": formato_match,
+                }
+            )
+
+        # Uma única ordenação (estável: empates mantêm a ordem do yt-dlp)
+        ranking.sort(key=lambda x: x["score"], reverse=True)
+        self._rankings[key] = ranking
+        return ranking
+
+    def format_string(self, height: int, codec: str, container: str, with_audio=True):
+        """yt-dlp format string for the best matches of a custom format."""
+        return format_string(self.best_video(height, codec, container), with_audio)
+
+
+def format_string(ranked: list, with_audio=True) -> str:
+    """
+    Builds the format string from ranked formats: the top 3 with the best
+    audio, then the same formats alone, then "best".
+    """
+    if not ranked:
+        return "best"
+
+    # Os 3 melhores formatos como alternativas
+    top_formats = [f["format_id"] for f in ranked[:3]]
+
+    if with_audio:
+        # Combinar com áudio
+        result = "+bestaudio/".join(top_formats) + "+bestaudio"
+        result += "/" + "/".join(top_formats)  # Alternativa sem áudio
+        result += "/best"  # Alternativa final
+    else:
+        result = "/".join(top_formats) + "/best"
+
+    return result
@@ -0,0 +1,113 @@
+import threading
+import time
+from urllib.parse import urlparse
+from .utils import read_config, save_config
+
+
+class FragmentTuner:
+    """
+    Learns, per site, how many fragments to download in parallel (DASH/HLS)
+    and the ``http_chunk_size`` used for plain HTTP formats.
+
+    yt-dlp fixes both values when a download starts, so the tuning is done
+    between downloads: each finished download reports its throughput and the
+    next download of the same site tries the next step (1, 2, 4, 8... fragments)
+    while the throughput keeps improving. Once a step is not at least
+    ``MIN_GAIN`` faster than the best one, the best value is kept. The values
+    are saved in 'fragment_tuning.json' and tuned again after ``RETUNE_DAYS``.
+    """
+
+    FILENAME = "fragment_tuning.json"
+    STEPS = {
+        "concurrent_fragment_downloads": [1, 2, 4, 8, 16],
+        "http_chunk_size": [1048576, 4194304, 10485760, 20971520],
+    }
+    START_STEP = {"concurrent_fragment_downloads": 1, "http_chunk_size": 2}
+    MIN_GAIN = 1.1
+    MIN_SIZE = 5 * 1048576  # Downloads menores não dão uma medida confiável
+    RETUNE_DAYS = 7
+
+    def __init__(self, persist: bool = True):
+        self.persist = persist
+        self._lock = threading.Lock()
+        self.hosts = {}
+        if persist:
+            try:
+                self.hosts = read_config(self.FILENAME) or {}
+            except Exception as e:
+                print(f"Erro ao carregar o ajuste de fragmentos: {e}")
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        host = urlparse(url).hostname or ""
+        return host[4:] if host.startswith("www.") else host
+
+    def _state(self, host: str, option: str) -> dict:
+        states = self.hosts.setdefault(host, {})
+        state = states.get(option)
+        if state is None or time.time() - state["updated_at"] > self.RETUNE_DAYS * 86400:
+            start = self.START_STEP[option]
+            state = states[option] = {
+                "step": start,
+                "best_step": start,
+                "best_speed": 0,
+                "settled": False,
+                "updated_at": time.time(),
+            }
+        return state
+
+    def options_for(self, url: str) -> dict:
+        """Returns the yt-dlp options to use for the next download of the URL's site."""
+        host = self.host_of(url)
+        with self._lock:
+            return {
+                option: steps[self._state(host, option)["step"]]
+                for option, steps in self.STEPS.items()
+            }
+
+    def record(self, url: str, option: str, size: int, elapsed: float, value):
+        """
+        Records the throughput of a finished download made with ``value``.
+
+        Args:
+            url (str): URL of the job (the site is taken from it)
+            option (str): "concurrent_fragment_downloads" or "http_chunk_size"
+            size (int): Bytes downloaded
+            elapsed (float): Seconds taken
+            value: Value of the option used in that download
+        """
+        if size < self.MIN_SIZE or not elapsed or value not in self.STEPS[option]:
+            return
+
+        speed = size / elapsed
+        host = self.host_of(url)
+        with self._lock:
+            state = self._state(host, option)
+            step = self.STEPS[option].index(value)
+            if state["settled"] or step != state["step"]:
+                # Medida de um valor antigo (download que começou antes do ajuste)
+                return
+
+            if speed > state["best_speed"] * self.MIN_GAIN:
+                state["best_step"] = step
+                state["best_speed"] = speed
+                if step + 1 < len(self.STEPS[option]):
+                    state["step"] = step + 1
+                else:
+                    state["settled"] = True
+            else:
+                # Não melhorou: fica com o melhor valor
+                state["step"] = state["best_step"]
+                state["settled"] = True
+            state["updated_at"] = time.time()
+
+            hosts = {
+                host: {option: dict(state) for option, state in states.items()}
+                for host, states in self.hosts.items()
+            }
+
+        if self.persist:
+            try:
+                save_config(self.FILENAME, hosts)
+            except Exception as e:
+                print(f"Erro ao salvar o ajuste de fragmentos: {e}")
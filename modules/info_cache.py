@@ -0,0 +1,331 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+from yt_dlp.extractor import gen_extractor_classes
+from yt_dlp.utils import make_archive_id
+from .utils import get_config_dir
+
+# Extratores do yt-dlp, na ordem em que o YoutubeDL os testa
+_extractors = None
+_extractors_lock = threading.Lock()
+
+
+def video_key(url: str):
+    """
+    Canonical key of a video URL ("extractor id", as in the download archive),
+    found without any request. Returns None when only the generic extractor
+    matches the URL.
+    """
+    global _extractors
+    with _extractors_lock:
+        if _extractors is None:
+            _extractors = [
+                ie for ie in gen_extractor_classes() if ie.ie_key() != "Generic"
+            ]
+
+    for ie in _extractors:
+        if not ie.suitable(url):
+            continue
+        try:
+            temp_id = ie.get_temp_id(url)
+        except Exception:
+            temp_id = None
+        return make_archive_id(ie, temp_id) if temp_id else None
+    return None
+
+
+def stream_expiry(info: dict):
+    """
+    Earliest expiry time (unix time) written in the stream URLs of an info
+    dict, or None when no URL tells when it expires.
+    """
+    urls = [info.get("url"), info.get("manifest_url")]
+    for fmt in info.get("formats") or []:
+        urls += [fmt.get("url"), fmt.get("manifest_url"), fmt.get("fragment_base_url")]
+
+    expiries = []
+    for url in urls:
+        if not url or not isinstance(url, str):
+            continue
+        parsed = urlparse(url)
+        query = {
+            key.lower(): values[0] for key, values in parse_qs(parsed.query).items()
+        }
+
+        # YouTube (expire=), CloudFront e S3 v2 (Expires=), Akamai e outros (exp=)
+        for name in ("expire", "expires", "exp"):
+            value = query.get(name)
+            if value and value.isdigit():
+                expiries.append(int(value))
+
+        # S3 v4: data da assinatura + segundos de validade
+        if "x-amz-date" in query and query.get("x-amz-expires", "").isdigit():
+            try:
+                signed_at = datetime.strptime(query["x-amz-date"], "%Y%m%dT%H%M%SZ")
+                expiries.append(
+                    signed_at.replace(tzinfo=timezone.utc).timestamp()
+                    + int(query["x-amz-expires"])
+                )
+            except ValueError:
+                pass
+
+        # Manifestos do YouTube e tokens do Akamai (hdnts=exp=...~)
+        text = parsed.path + "~" + parsed.query
+        for match in re.finditer(r"(?:/expire/|\bexp=)(\d{9,})", text):
+            expiries.append(int(match.group(1)))
+
+    return min(expiries) if expiries else None
+
+
+# Margem para o download começar antes de a URL expirar
+EXPIRY_MARGIN = 300
+
+# Validade guardada no cache, adicionada às informações lidas dele
+CACHED_EXPIRY_KEY = "_streams_expire_at"
+
+
+def streams_expire_at(info: dict, stream_ttl: float = 1800, now: float = None) -> float:
+    """
+    Time (unix time) until which the stream URLs of an info dict can still
+    start a download: the expiry written in them minus a margin, or
+    ``stream_ttl`` seconds from now when they do not have one. Info dicts
+    read from the ``InfoCache`` keep the time stored with them.
+    """
+    if info.get(CACHED_EXPIRY_KEY) is not None:
+        return info[CACHED_EXPIRY_KEY]
+    expiry = stream_expiry(info)
+    if expiry is None:
+        return (now or time.time()) + stream_ttl
+    return expiry - EXPIRY_MARGIN
+
+
+class InfoCache:
+    """
+    On-disk cache of the info dicts returned by the extractors, stored
+    compressed in SQLite and keyed by the canonical video id.
+
+    An entry has two ages. The metadata (title, formats, thumbnails...) is
+    reused for ``ttl`` seconds, so a search or a second download of the same
+    video does not extract it again. The stream URLs inside it are only
+    reused until the expiry written in them (``expire=``, ``Expires=``...),
+    or ``stream_ttl`` seconds when they do not have one; a download of an
+    entry with stale URLs extracts the video again and refreshes the entry.
+    The least recently used entries are removed when the cache grows over
+    ``max_size`` bytes.
+
+    Args:
+        path (str, optional): Database file. Defaults to 'info_cache.db' in
+            the configuration directory.
+        ttl (float): Seconds the metadata is reused
+        stream_ttl (float): Seconds the stream URLs without an expiry are reused
+        max_size (int): Maximum size of the compressed entries, in bytes
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = 7 * 24 * 3600,
+        stream_ttl: float = 1800,
+        max_size: int = 64 * 1024 * 1024,
+    ):
+        self.path = path or os.path.join(get_config_dir(), "info_cache.db")
+        self.ttl = ttl
+        self.stream_ttl = stream_ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS info (
+                    key TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    streams_expire_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            # URLs já vistas de cada vídeo (encurtadas, com parâmetros...)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    key TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS info_accessed ON info(accessed_at)"
+            )
+
+    def key_for(self, url: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        if row is not None:
+            return row[0]
+        return video_key(url)
+
+    def get(self, url: str, fresh_streams: bool = False):
+        """
+        Returns the cached info dict of the video, or None. The stored expiry
+        of its stream URLs is kept in the ``CACHED_EXPIRY_KEY`` field.
+
+        Args:
+            url (str): URL of the video
+            fresh_streams (bool): Only return the entry while its stream URLs
+                are valid (for downloads)
+        """
+        key = self.key_for(url)
+        if key is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at, streams_expire_at FROM info WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            data, created_at, expire_at = row
+            if now - created_at > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM info WHERE key = ?", (key,))
+                return None
+            if fresh_streams and now >= expire_at:
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE info SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+        try:
+            info = json.loads(zlib.decompress(data))
+        except Exception as e:
+            print(f"Erro ao ler o cache de informações: {e}")
+            return None
+        # Sem isso as URLs guardadas ganhariam uma nova validade a cada leitura
+        info[CACHED_EXPIRY_KEY] = expire_at
+        return info
+
+    def put(self, url: str, info: dict) -> bool:
+        """
+        Stores the info dict of a video, as returned by the extractor (before
+        the format selection). Playlists and info dicts that are not plain
+        JSON are not stored.
+        """
+        if not info or info.get("_type", "video") != "video":
+            return False
+        extractor = info.get("extractor_key")
+        if not extractor or not info.get("id"):
+            return False
+
+        # A validade vem das URLs, não de uma leitura anterior do cache
+        stored = {k: v for k, v in info.items() if k != CACHED_EXPIRY_KEY}
+        try:
+            data = zlib.compress(json.dumps(stored, ensure_ascii=False).encode("utf-8"))
+        except (TypeError, ValueError):
+            # Formatos com funções (fragmentos gerados sob demanda...)
+            return False
+
+        now = time.time()
+        expire_at = streams_expire_at(stored, self.stream_ttl, now)
+
+        key = make_archive_id(extractor, info["id"])
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO info "
+                "(key, data, size, created_at, streams_expire_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), now, expire_at, now),
+            )
+            for alias in {url, info.get("webpage_url"), info.get("original_url")}:
+                if alias:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO urls (url, key) VALUES (?, ?)",
+                        (alias, key),
+                    )
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Removes the least recently used entries over the size limit (with the lock)."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM info"
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        removed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM info ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            removed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM info WHERE key = ?", removed)
+        self._conn.executemany("DELETE FROM urls WHERE key = ?", removed)
+
+    def prune(self):
+        """Removes the entries whose metadata is older than the TTL."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM urls WHERE key IN "
+                "(SELECT key FROM info WHERE created_at < ?)",
+                (time.time() - self.ttl,),
+            )
+            self._conn.execute(
+                "DELETE FROM info WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM info")
+            self._conn.execute("DELETE FROM urls")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def extract_info(ydl, url: str, cache: InfoCache = None, download=False, **kwargs):
+    """
+    ``ydl.extract_info`` going through the cache: the extraction is skipped
+    when the cache has the video (with valid stream URLs, for downloads), and
+    its result is stored otherwise. The format selection and the download
+    always run.
+    """
+    info = None
+    if cache is not None:
+        info = cache.get(url, fresh_streams=download)
+
+    if info is None:
+        info = ydl.extract_info(
+            url, download=False, process=False, ie_key=kwargs.pop("ie_key", None)
+        )
+        if info is None:
+            # Pulado pelo arquivo de downloads antes da extração
+            return None
+        if cache is not None:
+            try:
+                cache.put(url, info)
+            except Exception as e:
+                print(f"Erro ao salvar no cache de informações: {e}")
+
+    return ydl.process_ie_result(info, download=download, **kwargs)
@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from .utils import get_config_dir
+
+
+class JobJournal:
+    """
+    Persistent journal of the download jobs, stored in SQLite.
+
+    Every job is written when it is queued and updated on each status change,
+    together with the status and output path of each item (a single video or
+    each entry of a playlist). Since every change is committed right away, the
+    journal survives a crash or the window being closed in the middle of a
+    batch, and the unfinished jobs can be resumed on the next start without
+    downloading again the items that were already finished.
+
+    Args:
+        path (str, optional): Database file. Defaults to 'jobs.db' in the
+            configuration directory, next to 'user_preferences.json'.
+    """
+
+    UNFINISHED_STATUS = ("queued", "running", "paused")
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(get_config_dir(), "jobs.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    ydl_opts TEXT,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS items (
+                    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+                    item_key TEXT NOT NULL,
+                    playlist_index INTEGER,
+                    status TEXT NOT NULL,
+                    output_path TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, item_key)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status)"
+            )
+
+    def _execute(self, sql: str, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add_job(self, url: str, type_download: str, options: dict) -> int:
+        """Records a new queued job and returns its journal id."""
+        now = time.time()
+        cursor = self._execute(
+            "INSERT INTO jobs (url, type, options, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?)",
+            (url, type_download, json.dumps(options), now, now),
+        )
+        return cursor.lastrowid
+
+    def set_job_status(self, job_id: int, status: str, error: str = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id),
+        )
+
+    def set_job_opts(self, job_id: int, ydl_opts: dict):
+        """Stores the resolved yt-dlp options, skipping values that are not JSON (hooks)."""
+        serializable = {}
+        for key, value in ydl_opts.items():
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            serializable[key] = value
+
+        self._execute(
+            "UPDATE jobs SET ydl_opts = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(serializable), time.time(), job_id),
+        )
+
+    def set_item(
+        self,
+        job_id: int,
+        item_key: str,
+        status: str,
+        playlist_index: int = None,
+        output_path: str = None,
+    ):
+        """Creates or updates the status of one item of a job."""
+        self._execute(
+            "INSERT INTO items (job_id, item_key, playlist_index, status, output_path, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(job_id, item_key) DO UPDATE SET "
+            "status = excluded.status, "
+            "playlist_index = COALESCE(excluded.playlist_index, items.playlist_index), "
+            "output_path = COALESCE(excluded.output_path, items.output_path), "
+            "updated_at = excluded.updated_at",
+            (job_id, item_key, playlist_index, status, output_path, time.time()),
+        )
+
+    def finished_items(self, job_id: int) -> set:
+        """Returns the keys of the items of a job that were already downloaded."""
+        rows = self._query(
+            "SELECT item_key FROM items WHERE job_id = ? AND status = 'finished'",
+            (job_id,),
+        )
+        return {row["item_key"] for row in rows}
+
+    def unfinished_jobs(self) -> list:
+        """
+        Returns the jobs that did not reach a final status, oldest first.
+
+        Returns:
+            list: Dictionaries with id, url, type, options and ydl_opts.
+        """
+        placeholders = ", ".join("?" for _ in self.UNFINISHED_STATUS)
+        rows = self._query(
+            f"SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY id",
+            self.UNFINISHED_STATUS,
+        )
+        return [
+            {
+                "id": row["id"],
+                "url": row["url"],
+                "type": row["type"],
+                "status": row["status"],
+                "options": json.loads(row["options"]),
+                "ydl_opts": json.loads(row["ydl_opts"] or "{}"),
+            }
+            for row in rows
+        ]
+
+    def prune(self, max_age_days: int = 30):
+        """Removes finished, failed or cancelled jobs older than the given age."""
+        limit = time.time() - max_age_days * 86400
+        placeholders = ", ".join("?" for _ in self.UNFINISHED_STATUS)
+        params = (*self.UNFINISHED_STATUS, limit)
+        self._execute(
+            f"DELETE FROM items WHERE job_id IN (SELECT id FROM jobs "
+            f"WHERE status NOT IN ({placeholders}) AND updated_at < ?)",
+            params,
+        )
+        self._execute(
+            f"DELETE FROM jobs WHERE status NOT IN ({placeholders}) AND updated_at < ?",
+            params,
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,355 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from yt_dlp.downloader.common import FileDownloader
+from yt_dlp import utils as ytdlp_utils
+from .tracing import tracer, now_us
+
+# Métricas do job que está rodando em cada thread
+_current = threading.local()
+_tracking_installed = False
+_tracking_lock = threading.Lock()
+
+
+class JobMetrics:
+    """
+    Performance metrics of one download job.
+
+    The phases are cumulative: when the items of a playlist run in parallel,
+    the time of every item is added, so a phase can take longer than the job.
+    """
+
+    PHASES = (
+        "connectivity",
+        "extraction",
+        "format_selection",
+        "download",
+        "merge",
+        "postprocess",
+        "cleanup",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = dict.fromkeys(self.PHASES, 0.0)
+        self.counters = {
+            "bytes": 0,
+            "files": 0,
+            "fragment_retries": 0,
+            "http_retries": 0,
+            "ffmpeg_processes": 0,
+            "ffmpeg_cpu_seconds": 0.0,
+        }
+        self.transfer_time = 0.0
+        self.peak_speed = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def add_phase(self, phase: str, seconds: float):
+        if seconds is None or seconds < 0:
+            return
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_phase(phase, time.monotonic() - start)
+
+    def count(self, counter: str, value=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def record_speed(self, speed):
+        if speed and speed > self.peak_speed:
+            self.peak_speed = speed
+
+    def record_file(self, nbytes: int, elapsed):
+        """Records a file whose download finished."""
+        with self._lock:
+            self.counters["bytes"] += nbytes or 0
+            self.counters["files"] += 1
+            self.transfer_time += elapsed or 0.0
+
+    @contextmanager
+    def bind(self):
+        """Binds the metrics to the current thread (for the ffmpeg processes)."""
+        install_metrics_tracking()
+        previous = getattr(_current, "metrics", None)
+        _current.metrics = self
+        try:
+            yield self
+        finally:
+            _current.metrics = previous
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            average_speed = (
+                self.counters["bytes"] / self.transfer_time if self.transfer_time else 0.0
+            )
+            return {
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration": (
+                    self.finished_at - self.started_at
+                    if self.started_at and self.finished_at
+                    else None
+                ),
+                "phases": {name: round(value, 4) for name, value in self.phases.items()},
+                "counters": dict(self.counters),
+                "transfer_time": round(self.transfer_time, 4),
+                "average_speed": round(average_speed, 1),
+                "peak_speed": round(self.peak_speed, 1),
+            }
+
+    def load(self, data: dict):
+        """Adds the metrics measured in another process (worker mode)."""
+        for name, value in data["phases"].items():
+            self.add_phase(name, value)
+        for name, value in data["counters"].items():
+            self.count(name, value)
+        with self._lock:
+            self.transfer_time += data["transfer_time"]
+        self.record_speed(data["peak_speed"])
+
+
+def current_metrics():
+    return getattr(_current, "metrics", None)
+
+
+def install_metrics_tracking():
+    """
+    Counts the retries reported by the yt-dlp downloaders and the CPU time of
+    the processes (ffmpeg) started by a thread bound to a JobMetrics. The
+    processes are also spans of the trace, when tracing is on.
+    """
+    global _tracking_installed
+    with _tracking_lock:
+        if _tracking_installed:
+            return
+
+        original_report_retry = FileDownloader.report_retry
+
+        def report_retry(self, err, count, retries, *args, **kwargs):
+            metrics = getattr(self.ydl, "job_metrics", None)
+            if metrics is not None:
+                fragment = bool(args) or "frag_index" in kwargs
+                metrics.count("fragment_retries" if fragment else "http_retries")
+            return original_report_retry(self, err, count, retries, *args, **kwargs)
+
+        FileDownloader.report_retry = report_retry
+
+        original_init = ytdlp_utils.Popen.__init__
+        original_wait = ytdlp_utils.Popen.wait
+        original_try_wait = ytdlp_utils.Popen._try_wait
+
+        def tracked_init(self, *args, **kwargs):
+            self.trace_start = now_us()
+            original_init(self, *args, **kwargs)
+            self.job_metrics = current_metrics()
+            if self.job_metrics is not None:
+                self.job_metrics.count("ffmpeg_processes")
+
+        def try_wait(self, wait_flags):
+            # wait4 em vez de waitpid: devolve o uso de CPU só deste processo
+            try:
+                pid, status, usage = os.wait4(self.pid, wait_flags)
+            except ChildProcessError:
+                return original_try_wait(self, wait_flags)
+            if pid == self.pid:
+                self.rusage = usage
+            return pid, status
+
+        def tracked_wait(self, *args, **kwargs):
+            running = self.returncode is None
+            result = original_wait(self, *args, **kwargs)
+            if not running or self.returncode is None:
+                return result
+
+            metrics = getattr(self, "job_metrics", None)
+            cpu = None
+            if metrics is not None:
+                cpu = process_cpu_time(self)
+                if cpu is not None:
+                    metrics.count("ffmpeg_cpu_seconds", cpu)
+
+            if tracer.enabled:
+                command = self.args
+                if not isinstance(command, (list, tuple)):
+                    command = [command]
+                tracer.add(
+                    os.path.basename(str(command[0])),
+                    self.trace_start,
+                    now_us(),
+                    "process",
+                    {
+                        "args": " ".join(map(str, command)),
+                        "returncode": self.returncode,
+                        "cpu": cpu,
+                    },
+                )
+            return result
+
+        ytdlp_utils.Popen.__init__ = tracked_init
+        ytdlp_utils.Popen.wait = tracked_wait
+        if hasattr(os, "wait4"):
+            ytdlp_utils.Popen._try_wait = try_wait
+        _tracking_installed = True
+
+
+def process_cpu_time(process):
+    """
+    CPU time of a child process that was waited for, or None when it is not
+    known (Windows, or the process was reaped by poll()).
+    """
+    usage = getattr(process, "rusage", None)
+    if usage is None:
+        return None
+    return usage.ru_utime + usage.ru_stime
+
+
+class MetricsRecorder:
+    """
+    Collects the metrics of the finished jobs.
+
+    Each job can be saved as a JSON file in ``directory``, and the counters
+    and histograms of all the jobs are kept in memory, in the Prometheus text
+    format (``prometheus_text``), optionally rewritten in ``prometheus_file``
+    after every job.
+
+    Args:
+        directory (str, optional): Folder of the JSON files, one per job
+        prometheus_file (str, optional): File rewritten with the aggregated metrics
+    """
+
+    JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+    PHASE_BUCKETS = (0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+    SPEED_BUCKETS = tuple(1024 * kib for kib in (128, 512, 1024, 4096, 16384, 65536))
+
+    def __init__(self, directory: str = None, prometheus_file: str = None):
+        self.directory = directory
+        self.prometheus_file = prometheus_file
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def record(self, job) -> dict:
+        """Adds a finished (or stopped) job. Returns its metrics."""
+        metrics = job.metrics
+        metrics.finished_at = time.time()
+        data = dict(
+            metrics.to_dict(),
+            job=job.id,
+            url=job.url,
+            type=job.type_download,
+            status=job.status,
+            error=job.error,
+            items=len(job.done_items),
+            skipped=job.skipped,
+        )
+
+        with self._lock:
+            self._add("easytuber_jobs_total", {"status": job.status})
+            for name, value in data["counters"].items():
+                self._add(f"easytuber_{name}_total", value=value)
+            if data["duration"] is not None:
+                self._observe(
+                    "easytuber_job_duration_seconds", self.JOB_BUCKETS, data["duration"]
+                )
+            for phase, seconds in data["phases"].items():
+                if seconds:
+                    self._observe(
+                        "easytuber_phase_duration_seconds",
+                        self.PHASE_BUCKETS,
+                        seconds,
+                        {"phase": phase},
+                    )
+            if data["average_speed"]:
+                self._observe(
+                    "easytuber_download_speed_bytes",
+                    self.SPEED_BUCKETS,
+                    data["average_speed"],
+                )
+
+        if self.directory:
+            self.save_json(data)
+        if self.prometheus_file:
+            self.save_prometheus()
+        return data
+
+    def _add(self, name: str, labels: dict = None, value=1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _observe(self, name: str, buckets: tuple, value: float, labels: dict = None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {
+                "buckets": buckets,
+                "counts": [0] * len(buckets),
+                "sum": 0.0,
+                "count": 0,
+            }
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram["counts"][index] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+    @staticmethod
+    def _labels(labels, extra=()) -> str:
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{self._labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                    lines.append(
+                        f"{name}_bucket{self._labels(labels, [('le', bound)])} {count}"
+                    )
+                lines.append(
+                    f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} "
+                    f"{histogram['count']}"
+                )
+                lines.append(f"{name}_sum{self._labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{self._labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def save_json(self, data: dict):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = time.strftime("%Y%m%d-%H%M%S") + f"-job{data['job']}.json"
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Erro ao salvar as métricas do job: {e}")
+
+    def save_prometheus(self):
+        try:
+            # Escreve em outro arquivo e troca, quem lê nunca vê o arquivo pela metade
+            temp_file = self.prometheus_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(temp_file, self.prometheus_file)
+        except Exception as e:
+            print(f"Erro ao salvar as métricas: {e}")
@@ -0,0 +1,80 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DeferredPostProcessing:
+    """
+    Captures the post-processing of a YoutubeDL so it can run later, in
+    another thread.
+
+    yt-dlp downloads a video and then, in the same call, merges the formats,
+    extracts the audio, converts... With this object installed, the download
+    returns as soon as the file is on disk and the captured steps (post
+    processors and the download archive record, which must only be written
+    after them) are run by ``run()``.
+    """
+
+    def __init__(self, ydl):
+        self.ydl = ydl
+        self.steps = []
+        self._post_process = ydl.post_process
+        self._record_download_archive = ydl.record_download_archive
+
+        ydl.post_process = self.post_process
+        ydl.record_download_archive = self.record_download_archive
+
+    def post_process(self, filename, info, files_to_move=None):
+        info["filepath"] = filename
+        # Cópia: quando process_info retorna, o yt-dlp tira do info as chaves
+        # copiadas do vídeo (id, title, playlist_*), que os passos ainda usam
+        self.steps.append(
+            (self._run_post_process, (filename, dict(info), info, files_to_move))
+        )
+        return info
+
+    def record_download_archive(self, info):
+        self.steps.append((self._record_download_archive, (dict(info),)))
+
+    def _run_post_process(self, filename, captured, info, files_to_move):
+        new_info = self._post_process(filename, captured, files_to_move)
+        # O yt-dlp espera que o info seja alterado no lugar (requested_downloads)
+        info.clear()
+        info.update(new_info)
+
+    def run(self):
+        for function, args in self.steps:
+            function(*args)
+        self.steps.clear()
+
+
+class PostProcessPool:
+    """
+    Pool of threads for the CPU-bound stage (ffmpeg), separated from the
+    download threads.
+
+    ``submit`` blocks while ``backlog`` files are already waiting or being
+    processed, so the downloads do not run too far ahead of the conversions.
+
+    Args:
+        workers (int, optional): Number of threads. Defaults to the CPU count.
+        backlog (int, optional): Files accepted before ``submit`` blocks.
+            Defaults to twice the number of workers.
+    """
+
+    def __init__(self, workers: int = None, backlog: int = None):
+        self.workers = workers or os.cpu_count() or 2
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="postprocess"
+        )
+        self._slots = threading.Semaphore(backlog or self.workers * 2)
+
+    def submit(self, function, *args):
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
@@ -0,0 +1,323 @@
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import BaseProxy, SyncManager
+from yt_dlp import YoutubeDL
+from .bandwidth import BandwidthLimiter
+from .download_archive import DownloadArchive
+from .download_engine import DownloadEngine
+from .download_queue import DownloadJob
+from .fragment_tuner import FragmentTuner
+from .info_cache import InfoCache, extract_info as cached_extract_info
+from .job_journal import JobJournal
+from .language_manager import TranslationManager
+from .tracing import tracer
+
+# Motor do processo de trabalho, criado no primeiro job que ele recebe
+_engine = None
+# Caches de informações abertos neste processo, por arquivo
+_info_caches = {}
+# Limite de banda atual, na memória compartilhada com o processo da interface
+_rate = None
+
+
+class LimiterProxy(BaseProxy):
+    """Proxy of the BandwidthLimiter that lives in the manager process."""
+
+    _exposed_ = ("set_rate", "release", "consume", "__getattribute__")
+
+    @property
+    def rate(self):
+        return self._callmethod("__getattribute__", ("rate",))
+
+    def set_rate(self, rate: float):
+        return self._callmethod("set_rate", (rate,))
+
+    def release(self, key):
+        return self._callmethod("release", (key,))
+
+    def consume(self, key, nbytes: int, weight: float = 1.0, cancel_token=None):
+        # O CancelToken não passa entre processos: a espera é interrompida pelo
+        # evento de parada do job, que no processo do gerenciador é o Event real
+        return self._callmethod("consume", (key, nbytes, weight, cancel_token))
+
+
+class WorkerManager(SyncManager):
+    """Manager process holding the objects shared by the worker processes."""
+
+
+WorkerManager.register("BandwidthLimiter", BandwidthLimiter, LimiterProxy)
+
+
+class SharedLimiter:
+    """
+    BandwidthLimiter of the worker processes, backed by the shared one.
+
+    The rate is also kept in shared memory, so without a limit the bytes
+    are not sent to the manager process at every progress update.
+    """
+
+    def __init__(self, proxy: LimiterProxy, stop_event=None, rate_value=None):
+        self.proxy = proxy
+        self.stop_event = stop_event
+        self.rate_value = rate_value
+
+    @property
+    def rate(self):
+        if self.rate_value is not None:
+            return self.rate_value.value
+        return self.proxy.rate
+
+    def set_rate(self, rate: float):
+        self.proxy.set_rate(rate)
+        if self.rate_value is not None:
+            self.rate_value.value = max(0, rate)
+
+    def release(self, key):
+        self.proxy.release(key)
+
+    def consume(self, key, nbytes: int, weight: float = 1.0, cancel_token=None):
+        if not self.rate:
+            return
+        if cancel_token is not None and cancel_token.is_cancelled():
+            return
+        # No gerenciador a espera termina com o evento de parada do job, que
+        # o observador do processo de trabalho liga ao cancel_token
+        self.proxy.consume(key, nbytes, weight, self.stop_event)
+
+
+class WorkerEngine(DownloadEngine):
+    """
+    Engine of a worker process. Runs one job at a time and sends its progress
+    to the interface process through the events queue.
+    """
+
+    UPDATE_INTERVAL = 0.05
+
+    def __init__(self, settings: dict):
+        translator = TranslationManager(None)
+        translator.current_language = settings["language"]
+
+        journal = None
+        if settings["journal_path"]:
+            journal = JobJournal(settings["journal_path"])
+        archive = None
+        if settings["archive_path"]:
+            archive = DownloadArchive(settings["archive_path"])
+        tuner = FragmentTuner() if settings["tune"] else None
+        info_cache = open_info_cache(settings["info_cache_path"])
+
+        super().__init__(translator, None, journal, archive, tuner, info_cache)
+        self.events = None
+        self._last_update = 0.0
+
+    def configure(self, settings: dict):
+        self.translator.current_language = settings["language"]
+        self.set_playlist_workers(settings["playlist_workers"])
+        self.set_use_archive(settings["use_archive"])
+        if self.info_cache is None:
+            self.info_cache = open_info_cache(settings["info_cache_path"])
+        self.set_use_info_cache(settings["info_cache_path"] is not None)
+        self.range_connections = settings["range_connections"]
+        tracer.enable(settings["trace"])
+
+    def config_options(self, job: DownloadJob) -> dict:
+        super().config_options(job)
+        # Não há console para a barra de progresso do yt-dlp
+        job.ydl_opts["noprogress"] = True
+        return job.ydl_opts
+
+    def on_job_update(self, job: DownloadJob):
+        # Junta as atualizações muito próximas, o estado final vai no resultado
+        now = time.monotonic()
+        if now - self._last_update < self.UPDATE_INTERVAL:
+            return
+        self._last_update = now
+        self.events.put((job.label, job.progress, job.message))
+
+
+def init_worker(rate=None):
+    global _rate
+    # O stdout é do processo principal (na linha de comando, só JSONL)
+    sys.stdout = sys.stderr
+    _rate = rate
+
+
+def open_info_cache(path: str):
+    """Information cache of the interface process, opened once per worker process."""
+    if not path:
+        return None
+    if path not in _info_caches:
+        try:
+            _info_caches[path] = InfoCache(path)
+        except Exception as e:
+            print(f"Erro ao abrir o cache de informações: {e}")
+            return None
+    return _info_caches[path]
+
+
+def extract_info(url: str, ydl_opts: dict, info_cache_path: str = None) -> dict:
+    """Runs a search in the worker process. Returns the sanitized info dict."""
+    with YoutubeDL(ydl_opts) as ydl:
+        return ydl.sanitize_info(
+            cached_extract_info(ydl, url, open_info_cache(info_cache_path))
+        )
+
+
+def run_job(spec: dict, events, stop, pause, limiter: LimiterProxy) -> dict:
+    """
+    Runs a download job in the worker process.
+
+    The job is rebuilt from ``spec`` with the same id as in the interface
+    process (it is the key of the job in the bandwidth limiter). ``stop`` and
+    ``pause`` are set by the interface process to cancel or pause the job.
+    """
+    global _engine
+    if _engine is None:
+        _engine = WorkerEngine(spec["settings"])
+    engine = _engine
+    engine.configure(spec["settings"])
+    engine.events = events
+    engine.limiter = SharedLimiter(limiter, stop, _rate)
+
+    job = DownloadJob(spec["type"], spec["options"], spec["info_formats"])
+    job.id = spec["id"]
+    job.journal_id = spec["journal_id"]
+    job.resume_opts = spec["resume_opts"]
+    job.info = spec["info"]
+    job.info_expires_at = spec["info_expires_at"]
+    job.done_items = set(spec["done_items"])
+    job.weight = spec["weight"]
+
+    finished = threading.Event()
+
+    def watch():
+        while not finished.is_set():
+            if stop.wait(0.2):
+                if pause.is_set():
+                    job.pause()
+                else:
+                    job.cancel()
+                return
+
+    # Só os spans deste job voltam para o processo da interface
+    tracer.clear()
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        engine.download_process(job)
+    finally:
+        finished.set()
+        watcher.join()
+
+    return {
+        "status": job.status,
+        "error": job.error,
+        "label": job.label,
+        "message": job.message,
+        "progress": job.progress,
+        "skipped": job.skipped,
+        "done_items": list(job.done_items),
+        "partial_files": list(job.partial_files),
+        "metrics": job.metrics.to_dict(),
+        "trace": tracer.events() if tracer.enabled else [],
+    }
+
+
+class ProcessWorkerPool:
+    """
+    Pool of worker processes that run the searches and downloads outside the
+    interface process.
+
+    yt-dlp holds the GIL for long stretches (signature decryption, parsing of
+    big JSON pages), which makes the window stutter when it runs in threads of
+    the same interpreter. Here each job runs in a process of the pool and its
+    progress comes back through a queue, read by the thread of the job in the
+    DownloadQueue, which calls the same ``on_job_*`` callbacks as in thread
+    mode. The bandwidth limiter lives in a manager process, so the global
+    limit still holds across the processes.
+
+    Args:
+        workers (int, optional): Maximum number of processes. Defaults to
+            the CPU count (at least 4).
+        rate (float): Initial bandwidth limit, in bytes per second.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, workers: int = None, rate: float = 0):
+        self.workers = workers or max(4, os.cpu_count() or 1)
+        # spawn em todos os sistemas: não copia o estado do Tk para os filhos
+        self._context = multiprocessing.get_context("spawn")
+        self.manager = WorkerManager(ctx=self._context)
+        self.manager.start()
+        self.rate = self._context.Value("d", max(0, rate))
+        self.limiter = SharedLimiter(self.manager.BandwidthLimiter(rate), None, self.rate)
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=init_worker,
+            initargs=(self.rate,),
+        )
+
+    def submit(self, function, *args):
+        with self._lock:
+            try:
+                return self._executor.submit(function, *args)
+            except BrokenProcessPool:
+                # Um processo morreu (falta de memória, crash do ffmpeg...)
+                self._executor = self._new_executor()
+                return self._executor.submit(function, *args)
+
+    def extract_info(self, url: str, ydl_opts: dict, info_cache_path: str = None) -> dict:
+        return self.submit(extract_info, url, ydl_opts, info_cache_path).result()
+
+    def run_job(self, job: DownloadJob, spec: dict, on_update) -> dict:
+        """
+        Runs the job in a worker process and waits for it, calling
+        ``on_update(label, progress, message)`` for each progress event.
+        Returns the final state of the job.
+        """
+        events = self.manager.Queue()
+        stop = self.manager.Event()
+        pause = self.manager.Event()
+        future = self.submit(run_job, spec, events, stop, pause, self.limiter.proxy)
+
+        stopping = False
+        while True:
+            if job.is_cancelled() and not stopping:
+                stopping = True
+                if job.pause_requested:
+                    pause.set()
+                stop.set()
+
+            try:
+                on_update(*events.get(timeout=self.POLL_INTERVAL))
+                continue
+            except queue.Empty:
+                pass
+
+            if future.done():
+                break
+
+        # O processo coloca os eventos antes de terminar, então estão todos na fila
+        while True:
+            try:
+                on_update(*events.get_nowait())
+            except queue.Empty:
+                break
+
+        return future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.manager.shutdown()
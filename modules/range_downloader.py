@@ -0,0 +1,264 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import RequestError
+from yt_dlp.utils import ContentTooShortError, write_json_file
+from .cancellation import current_token
+
+
+class RangeSplitDownloader(HttpFD):
+    """
+    Downloads a progressive HTTP format (one MP4/WebM URL) over several
+    connections at once, each one fetching its own byte range.
+
+    The .part file is preallocated and each connection writes its range at the
+    right offset. The progress of all the ranges is merged and reported to the
+    progress hooks with the same fields as yt-dlp's HttpFD, plus
+    ``range_connections`` (the number of ranges). The state of the
+    ranges is kept in a .ytdl file next to the .part, so a paused download
+    continues each range from where it stopped.
+
+    Falls back to HttpFD when the server does not support ranges, the file is
+    small or ``range_split_connections`` is lower than 2.
+    """
+
+    FD_NAME = "rangesplit"
+    MIN_SIZE = 8 * 1048576  # Arquivos menores não compensam dividir
+    BLOCK_SIZE = 256 * 1024
+    HOOK_INTERVAL = 0.1
+    STATE_INTERVAL = 1.0
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get("range_split_connections") or 1
+        if connections < 2 or self.params.get("test") or filename == "-":
+            return super().real_download(filename, info_dict)
+
+        url = info_dict["url"]
+        headers = dict(info_dict.get("http_headers") or {})
+        size = self.probe_size(url, headers)
+        if size is None or size < self.MIN_SIZE:
+            return super().real_download(filename, info_dict)
+
+        tmpfilename = self.temp_name(filename)
+        state_file = tmpfilename + ".ytdl"
+        ranges = self.load_state(tmpfilename, state_file, size)
+        if ranges is None:
+            ranges = self.split(size, connections)
+            with open(tmpfilename, "wb") as f:
+                f.truncate(size)
+
+        return self.download_ranges(
+            filename, tmpfilename, state_file, info_dict, url, headers, size, ranges
+        )
+
+    # region Preparação
+    def probe_size(self, url: str, headers: dict):
+        """Returns the file size if the server answers a range request, else None."""
+        try:
+            response = self.ydl.urlopen(
+                Request(url, headers=dict(headers, Range="bytes=0-0"))
+            )
+        except RequestError:
+            return None
+
+        try:
+            content_range = response.headers.get("Content-Range") or ""
+            match = re.match(r"bytes 0-0/(\d+)", content_range)
+            if response.status != 206 or not match:
+                return None
+            return int(match.group(1))
+        finally:
+            response.close()
+
+    @staticmethod
+    def split(size: int, connections: int) -> list:
+        """Splits the file in ranges [start, end, done]."""
+        part_size = -(-size // connections)
+        return [
+            [start, min(start + part_size, size) - 1, 0]
+            for start in range(0, size, part_size)
+        ]
+
+    def load_state(self, tmpfilename: str, state_file: str, size: int):
+        if not self.params.get("continuedl", True):
+            return None
+        if not (os.path.isfile(tmpfilename) and os.path.isfile(state_file)):
+            return None
+        try:
+            with open(state_file, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("size") != size or os.path.getsize(tmpfilename) != size:
+            return None
+        return state["ranges"]
+
+    # region Download
+    def download_ranges(
+        self, filename, tmpfilename, state_file, info_dict, url, headers, size, ranges
+    ):
+        start_time = time.time()
+        resume_len = sum(done for _, _, done in ranges)
+        stop = threading.Event()
+        counter_lock = threading.Lock()
+        hook_lock = threading.Lock()
+        state_lock = threading.Lock()
+        progress = {
+            "downloaded": resume_len,
+            "last_hook": 0.0,
+            "last_state": start_time,
+        }
+
+        def save_state():
+            with state_lock:
+                # Os contadores só sobem depois do flush de cada bloco: copiados
+                # antes do fsync, nunca passam do que está gravado no disco
+                saved = [list(part) for part in ranges]
+                with open(tmpfilename, "r+b") as f:
+                    os.fsync(f.fileno())
+                write_json_file({"size": size, "ranges": saved}, state_file)
+
+        def report(nbytes):
+            with counter_lock:
+                progress["downloaded"] += nbytes
+                downloaded = progress["downloaded"]
+                now = time.time()
+                state_due = now - progress["last_state"] >= self.STATE_INTERVAL
+                if state_due:
+                    progress["last_state"] = now
+                hook_due = now - progress["last_hook"] >= self.HOOK_INTERVAL
+                if hook_due:
+                    progress["last_hook"] = now
+
+            if state_due:
+                save_state()
+            if not hook_due:
+                return
+
+            # Um hook por vez, fora do contador (o hook pode esperar pelo limite de banda)
+            with hook_lock:
+                self._hook_progress(
+                    {
+                        "status": "downloading",
+                        "downloaded_bytes": downloaded,
+                        "total_bytes": size,
+                        "tmpfilename": tmpfilename,
+                        "filename": filename,
+                        "eta": self.calc_eta(
+                            start_time, now, size - resume_len, downloaded - resume_len
+                        ),
+                        "speed": self.calc_speed(start_time, now, downloaded - resume_len),
+                        "elapsed": now - start_time,
+                        "ctx_id": info_dict.get("ctx_id"),
+                        "range_connections": len(ranges),
+                    },
+                    info_dict,
+                )
+
+        def fetch(part):
+            start, end, _ = part
+            retries = self.params.get("retries") or 0
+            attempt = 0
+            while start + part[2] <= end and not stop.is_set():
+                position = start + part[2]
+                try:
+                    response = self.ydl.urlopen(
+                        Request(url, headers=dict(headers, Range=f"bytes={position}-{end}"))
+                    )
+                    try:
+                        if response.status != 206:
+                            raise ContentTooShortError(0, end - position + 1)
+                        with open(tmpfilename, "r+b") as f:
+                            f.seek(position)
+                            while not stop.is_set():
+                                data = response.read(self.BLOCK_SIZE)
+                                if not data:
+                                    break
+                                f.write(data)
+                                f.flush()
+                                part[2] += len(data)
+                                report(len(data))
+                    finally:
+                        response.close()
+
+                    if start + part[2] <= end and not stop.is_set():
+                        raise ContentTooShortError(part[2], end - start + 1)
+                except (RequestError, OSError, ContentTooShortError) as e:
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    self.report_retry(e, attempt, retries)
+                    # Cancelamento ou falha de outro range interrompem a espera
+                    if stop.wait(min(attempt, 5)):
+                        return
+
+        # Primeiro hook já com o .part criado (para a limpeza e o limite de banda)
+        report(0)
+
+        # Os ranges rodam em outras threads: o cancelamento do job chega pelo stop
+        token = current_token()
+        if token is not None:
+            token.add_event(stop)
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(fetch, part) for part in ranges]
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except BaseException:
+                        # Um range falhou (ou foi cancelado): para os outros
+                        stop.set()
+                        raise
+            if token is not None:
+                token.raise_if_cancelled()
+        finally:
+            if token is not None:
+                token.remove_event(stop)
+            save_state()
+
+        self.try_rename(tmpfilename, filename)
+        try:
+            os.remove(state_file)
+        except OSError:
+            pass
+
+        self._hook_progress(
+            {
+                "downloaded_bytes": size,
+                "total_bytes": size,
+                "filename": filename,
+                "status": "finished",
+                "elapsed": time.time() - start_time,
+                "ctx_id": info_dict.get("ctx_id"),
+                "range_connections": len(ranges),
+            },
+            info_dict,
+        )
+        return True
+
+
+def install_range_downloader(ydl):
+    """Makes a YoutubeDL use RangeSplitDownloader where it would use HttpFD."""
+    original_dl = ydl.dl
+
+    def patched_dl(name, info, subtitle=False, test=False):
+        downloader = get_suitable_downloader(info, ydl.params, to_stdout=(name == "-"))
+        if subtitle or test or downloader is not HttpFD or not info.get("url"):
+            return original_dl(name, info, subtitle, test)
+
+        fd = RangeSplitDownloader(ydl, ydl.params)
+        for hook in ydl._progress_hooks:
+            fd.add_progress_hook(hook)
+
+        new_info = ydl._copy_infodict(info)
+        if new_info.get("http_headers") is None:
+            new_info["http_headers"] = ydl._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)
+
+    ydl.dl = patched_dl
@@ -0,0 +1,193 @@
+# Família do codec de vídeo a partir do vcodec do yt-dlp (avc1.64001f, vp09.00...)
+CODEC_PREFIXES = (
+    ("avc", "h264"),
+    ("h264", "h264"),
+    ("hev", "h265"),
+    ("hvc", "h265"),
+    ("h265", "h265"),
+    ("vp09", "vp9"),
+    ("vp9", "vp9"),
+    ("vp8", "vp8"),
+    ("av01", "av1"),
+    ("av1", "av1"),
+)
+
+# Nomes mostrados nos presets da aba avançada
+CODEC_NAMES = {"h264": "H.264", "h265": "H.265", "vp9": "VP9", "vp8": "VP8", "av1": "AV1"}
+
+
+def codec_family(vcodec) -> str:
+    """Codec family ("h264", "h265", "vp9", "vp8", "av1") of a yt-dlp vcodec, or None."""
+    if not vcodec:
+        return None
+    vcodec = vcodec.lower()
+    for prefix, family in CODEC_PREFIXES:
+        if prefix in vcodec:
+            return family
+    return None
+
+
+class Format:
+    """
+    Compact record of a yt-dlp format, with only the fields the application
+    uses. The raw format dicts can be released once the records exist.
+
+    Attributes:
+        format_id (str): yt-dlp format id
+        ext (str): Container (lower case)
+        height (int): Height in pixels, 0 for audio-only formats
+        fps (float): Frames per second, None when unknown
+        codec (str): Video codec family ("h264", "vp9"...), None when unknown
+        filesize (int): Exact or approximate size in bytes, None when unknown
+        tbr (float): Total bitrate in KiB/s, None when unknown
+        abr (float): Audio bitrate in KiB/s, None when unknown
+        has_video (bool): The format has a video stream
+        has_audio (bool): The format has an audio stream
+        default_audio (bool): Default audio track of the video (YouTube)
+    """
+
+    __slots__ = (
+        "format_id",
+        "ext",
+        "height",
+        "fps",
+        "codec",
+        "filesize",
+        "tbr",
+        "abr",
+        "has_video",
+        "has_audio",
+        "default_audio",
+    )
+
+    def __init__(
+        self,
+        format_id,
+        ext="",
+        height=0,
+        fps=None,
+        codec=None,
+        filesize=None,
+        tbr=None,
+        abr=None,
+        has_video=False,
+        has_audio=False,
+        default_audio=False,
+    ):
+        self.format_id = format_id
+        self.ext = ext
+        self.height = height
+        self.fps = fps
+        self.codec = codec
+        self.filesize = filesize
+        self.tbr = tbr
+        self.abr = abr
+        self.has_video = has_video
+        self.has_audio = has_audio
+        self.default_audio = default_audio
+
+    @classmethod
+    def from_info(cls, fmt: dict) -> "Format":
+        vcodec = (fmt.get("vcodec") or "").lower()
+        acodec = (fmt.get("acodec") or "").lower()
+        audio_only = fmt.get("resolution") == "audio only"
+        return cls(
+            format_id=fmt.get("format_id"),
+            ext=(fmt.get("ext") or "").lower(),
+            height=fmt.get("height") or 0,
+            fps=fmt.get("fps"),
+            codec=codec_family(vcodec),
+            filesize=fmt.get("filesize") or fmt.get("filesize_approx"),
+            tbr=fmt.get("tbr"),
+            abr=fmt.get("abr"),
+            has_video=not audio_only and vcodec != "none",
+            has_audio=audio_only or acodec not in ("", "none"),
+            default_audio=audio_only and fmt.get("format_note") == "Default, high",
+        )
+
+    @property
+    def codec_name(self) -> str:
+        return CODEC_NAMES.get(self.codec, "Unknown")
+
+    @property
+    def desc(self) -> str:
+        """Text of the preset in the advanced tab."""
+        return f"{int(self.height)}p {self.codec_name} {int(self.fps)}FPS.{self.ext}"
+
+    def __getstate__(self):
+        # Enviado aos processos de trabalho como tupla
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"Format({self.format_id!r}, {self.height}p, {self.codec}, {self.ext})"
+
+
+class Entry:
+    """
+    Compact record of a flat playlist entry (id, URL and title).
+
+    Entries that are plain links to another page (``_type: url``) keep only
+    those fields, which is all yt-dlp needs to extract them. Other entries
+    (``url_transparent``, or already extracted videos) carry fields that
+    must reach the extraction, so their dict is kept in ``info``.
+
+    Attributes:
+        id (str): Video id, when the extractor gave one
+        url (str): URL of the video page
+        title (str): Title shown while the playlist is read
+        ie_key (str): Extractor of the URL, when known
+        info (dict): Original entry, kept only when it is not a plain link
+    """
+
+    __slots__ = ("id", "url", "title", "ie_key", "info")
+
+    def __init__(self, id=None, url=None, title=None, ie_key=None, info=None):
+        self.id = id
+        self.url = url
+        self.title = title
+        self.ie_key = ie_key
+        self.info = info
+
+    @classmethod
+    def from_info(cls, entry: dict) -> "Entry":
+        return cls(
+            id=entry.get("id"),
+            url=entry.get("url") or entry.get("webpage_url"),
+            title=entry.get("title"),
+            ie_key=entry.get("ie_key") or entry.get("extractor_key"),
+            info=None if entry.get("_type") == "url" else entry,
+        )
+
+    @property
+    def is_link(self) -> bool:
+        """The entry still has to be extracted from its URL."""
+        return self.info is None
+
+    @property
+    def key(self):
+        """Key of the entry in the job journal."""
+        return self.id or self.url
+
+    def to_info(self) -> dict:
+        """Entry as yt-dlp expects it in process_ie_result."""
+        if self.info is not None:
+            return dict(self.info)
+        info = {"_type": "url", "url": self.url, "ie_key": self.ie_key}
+        if self.id:
+            info["id"] = self.id
+        if self.title:
+            info["title"] = self.title
+        return info
+
+    def __getstate__(self):
+        return (self.id, self.url, self.title, self.ie_key, self.info)
+
+    def __setstate__(self, state):
+        self.id, self.url, self.title, self.ie_key, self.info = state
+
+    def __repr__(self):
+        return f"Entry({self.key!r}, {self.title!r})"
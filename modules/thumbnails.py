@@ -0,0 +1,260 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from .utils import get_config_dir, render_thumbnail
+
+
+class ThumbnailCache:
+    """
+    Content-addressed disk cache of the thumbnail images.
+
+    Each image is stored once, in a file named by the SHA-256 of its bytes,
+    and an index in SQLite maps the URLs to them (the same image served by
+    several URLs is kept a single time). The least recently used files are
+    removed when the cache grows over ``max_size`` bytes.
+
+    Args:
+        directory (str, optional): Folder of the cache. Defaults to
+            'thumbnails' in the configuration directory.
+        max_size (int): Maximum size of the stored images, in bytes
+    """
+
+    def __init__(self, directory: str = None, max_size: int = 32 * 1024 * 1024):
+        self.directory = directory or os.path.join(get_config_dir(), "thumbnails")
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self.directory, "index.db"), check_same_thread=False
+        )
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS files_accessed ON files(accessed_at)"
+            )
+
+    def file_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def get(self, url: str):
+        """Returns the bytes of the cached image of ``url``, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest = row[0]
+
+            try:
+                with open(self.file_path(digest), "rb") as f:
+                    data = f.read()
+            except OSError:
+                # Arquivo apagado fora do aplicativo
+                with self._conn:
+                    self._forget(digest)
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE files SET accessed_at = ? WHERE digest = ?",
+                    (time.time(), digest),
+                )
+        return data
+
+    def put(self, url: str, data: bytes) -> str:
+        """Stores the image of ``url`` and returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.file_path(digest)
+
+        with self._lock:
+            if not os.path.isfile(path):
+                # Escreve ao lado e renomeia: um arquivo nunca fica pela metade
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (digest, size, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    (digest, len(data), time.time()),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)",
+                    (url, digest),
+                )
+                self._evict()
+        return digest
+
+    def _forget(self, digest: str):
+        """Removes an image and its URLs (with the lock, inside a transaction)."""
+        self._conn.execute("DELETE FROM files WHERE digest = ?", (digest,))
+        self._conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+        try:
+            os.remove(self.file_path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Removes the least recently used images over the size limit (with the lock)."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM files"
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        for digest, size in self._conn.execute(
+            "SELECT digest, size FROM files ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            self._forget(digest)
+            total -= size
+
+    def clear(self):
+        with self._lock, self._conn:
+            for (digest,) in self._conn.execute("SELECT digest FROM files").fetchall():
+                self._forget(digest)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ThumbnailFetcher:
+    """
+    Downloads and prepares the thumbnails in background threads, so the
+    interface never waits for the network.
+
+    A thumbnail is looked up in the decoded images kept in memory, then in
+    the disk cache, and only then downloaded, through one HTTP session per
+    thread (the connections to the image servers are reused). Requests for
+    a thumbnail that is already being fetched share the same download.
+
+    Args:
+        cache (ThumbnailCache, optional): Disk cache of the images
+        workers (int): Threads fetching thumbnails at the same time
+        timeout (float): Seconds to wait for the image server
+        memory_items (int): Decoded images kept in memory
+    """
+
+    def __init__(
+        self,
+        cache: ThumbnailCache = None,
+        workers: int = 2,
+        timeout: float = 10,
+        memory_items: int = 32,
+    ):
+        self.cache = cache
+        self.timeout = timeout
+        self.memory_items = memory_items
+        self._images = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="thumbnail"
+        )
+
+    def get(self, url: str, duration=None, callback=None) -> Future:
+        """
+        Returns a future with the thumbnail of ``url`` ready to be shown (a
+        PIL image with the duration and rounded corners), or None when it
+        could not be fetched.
+
+        Args:
+            url (str): URL of the image
+            duration (int, optional): Seconds written over the image
+            callback (callable, optional): Called with the image (or None)
+                when it is ready, in the thread that fetched it (right away
+                when the image is in memory)
+        """
+        key = (url, duration)
+        submitted = False
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                future = Future()
+                future.set_result(image)
+            else:
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._executor.submit(self._load, url, duration)
+                    self._pending[key] = future
+                    submitted = True
+
+        if submitted:
+            # Fora do lock: se já terminou, o callback roda nesta thread
+            future.add_done_callback(lambda _: self._done(key))
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(f.result()))
+        return future
+
+    def _done(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def session(self) -> requests.Session:
+        """HTTP session of the current thread (keeps the connections open)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def download(self, url: str) -> bytes:
+        response = self.session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def _load(self, url: str, duration):
+        try:
+            data = self.cache.get(url) if self.cache is not None else None
+            if data is None:
+                data = self.download(url)
+                if self.cache is not None:
+                    try:
+                        self.cache.put(url, data)
+                    except Exception as e:
+                        print(f"Erro ao salvar a miniatura no cache: {e}")
+            image = render_thumbnail(data, duration)
+        except Exception as e:
+            print(f"Erro ao carregar a miniatura: {e}")
+            return None
+
+        with self._lock:
+            self._images[(url, duration)] = image
+            while len(self._images) > self.memory_items:
+                self._images.popitem(last=False)
+        return image
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,185 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Relógio monotônico alinhado ao relógio do sistema, igual em todos os processos
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def now_us() -> int:
+    """Current time in microseconds, the unit of the Chrome trace events."""
+    return (time.perf_counter_ns() + _EPOCH_NS) // 1000
+
+
+class _NullSpan:
+    """Span used while tracing is off: entering and leaving it does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self.name, self.start, now_us(), self.category, self.args)
+        return False
+
+    def set(self, **args):
+        """Adds arguments to the span, shown in the trace viewer."""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Records nested spans (search, extraction, download, ffmpeg, interface
+    callbacks...) and exports them in the Chrome Trace Event format, which
+    opens in chrome://tracing or https://ui.perfetto.dev.
+
+    Spans of the same thread nest by their times, so no stack is kept. While
+    tracing is off, ``span()`` returns a shared object that does nothing.
+
+    Args:
+        max_events (int): Only the most recent events are kept
+    """
+
+    def __init__(self, max_events: int = 200000):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        # Nomes das threads dos outros processos
+        self._metadata = []
+
+    def enable(self, enabled: bool = True):
+        self.enabled = bool(enabled)
+
+    def span(self, name: str, category: str = "app", **args):
+        """Context manager measuring a span: ``with tracer.span("search", url=url):``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def add(self, name: str, start: int, end: int, category: str = "app", args=None):
+        """Adds a span that was measured by the caller (times from ``now_us()``)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        if thread.ident not in self._threads:
+            self._threads[thread.ident] = thread.name
+        # deque.append é atômico, as threads não precisam de lock
+        self._events.append(
+            (name, category, start, end - start, os.getpid(), thread.ident, args)
+        )
+
+    def events(self) -> list:
+        """Recorded events, as Chrome trace event dicts."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        for name, category, start, duration, event_pid, tid, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": duration,
+                "pid": event_pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return events
+
+    def extend(self, events: list):
+        """Adds the events recorded by another process (worker mode)."""
+        for event in events:
+            if event["ph"] == "X":
+                self._events.append(
+                    (
+                        event["name"],
+                        event["cat"],
+                        event["ts"],
+                        event["dur"],
+                        event["pid"],
+                        event["tid"],
+                        event.get("args"),
+                    )
+                )
+            else:
+                self._metadata.append(event)
+
+    def clear(self):
+        self._events.clear()
+        self._threads.clear()
+        self._metadata.clear()
+
+    def to_json(self) -> dict:
+        return {
+            "traceEvents": self._metadata + self.events(),
+            "displayTimeUnit": "ms",
+        }
+
+    def export(self, path: str):
+        """Writes the trace to ``path`` (Chrome Trace Event JSON)."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_json(), f, ensure_ascii=False, default=str)
+        except Exception as e:
+            print(f"Erro ao salvar o trace: {e}")
+
+
+# Tracer do processo, ligado pela preferência "trace_file" ou pelo --trace
+tracer = Tracer()
+
+
+def traced(name: str = None, category: str = "app"):
+    """Decorator that measures each call of a function as a span."""
+
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
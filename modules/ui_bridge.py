@@ -0,0 +1,60 @@
+import threading
+from .tracing import tracer
+
+
+class UiEventBridge:
+    """
+    Carries the interface updates from the worker threads to the Tk main loop.
+
+    Tk is not thread-safe, so the worker threads only register callbacks here
+    and an ``after()`` loop runs them on the main thread, ``fps`` times per
+    second. Callbacks posted with the same key are coalesced: only the latest
+    one runs, so a job whose hooks fire hundreds of times per second redraws
+    its progress at most once per frame.
+
+    Args:
+        root: Tk window whose ``after()`` drives the loop
+        fps (int): Frames per second of the loop
+    """
+
+    def __init__(self, root, fps: int = 20):
+        self.root = root
+        self.interval = max(1, 1000 // fps)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._running = True
+        self._after_id = self.root.after(self.interval, self._drain)
+
+    def post(self, key, callback):
+        """Runs ``callback`` in the next frame, replacing a pending one with the same key."""
+        with self._lock:
+            # Vai para o fim: continua depois das chamadas feitas antes dela
+            self._pending.pop(key, None)
+            self._pending[key] = callback
+
+    def call(self, callback):
+        """Runs ``callback`` in the next frame, in order and without coalescing."""
+        self.post(object(), callback)
+
+    def _drain(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+
+        if pending:
+            with tracer.span("ui_frame", "ui", callbacks=len(pending)):
+                for callback in pending.values():
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"Erro ao atualizar a interface: {e}")
+
+        if self._running:
+            self._after_id = self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        self._running = False
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:
+            pass
@@ -124,6 +124,21 @@ def get_theme_path(filename: str) -> str:
     return resource_path(os.path.join("resources", "theme", filename))
 
 
+def get_config_dir() -> str:
+    """Returns the application's configuration directory, creating it if necessary.
+
+    Returns:
+        str: The full path to the configuration directory.
+    """
+    app_dir = get_executable_dir()
+    config_dir = os.path.join(app_dir, "config")
+
+    # Create the configuration directory if it does not exist
+    os.makedirs(config_dir, exist_ok=True)
+
+    return config_dir
+
+
 def get_config_path(filename: str) -> str:
     """Returns the path to a configuration file, creating it if necessary.
 
@@ -136,11 +151,7 @@ def get_config_path(filename: str) -> str:
     Returns:
         str: The full path to the configuration file.
     """
-    app_dir = get_executable_dir()
-    config_dir = os.path.join(app_dir, "config")
-
-    # Create the configuration directory if it does not exist
-    os.makedirs(config_dir, exist_ok=True)
+    config_dir = get_config_dir()
 
     config_path = os.path.join(config_dir, filename)
 
@@ -315,9 +326,18 @@ def get_ffmpeg_path() -> str:
     return None
 
 
-def get_thumbnail_img(url, duration=None):
-    with urllib.request.urlopen(url) as u:
+def get_thumbnail_img(url, duration=None, timeout: int = 10):
+    """Blocking download of a thumbnail; the interface uses ThumbnailFetcher."""
+    with urllib.request.urlopen(url, timeout=timeout) as u:
         raw_data = u.read()
+    return render_thumbnail(raw_data, duration)
+
+
+def render_thumbnail(raw_data: bytes, duration=None):
+    """
+    Thumbnail shown in the advanced tab, from the bytes of the image: 160x90,
+    with the duration written over it and rounded corners.
+    """
     img = Image.open(BytesIO(raw_data)).convert("RGBA")
     img = img.resize((160, 90), Image.Resampling.LANCZOS)
 
@@ -419,6 +439,22 @@ def format_time(seconds: int):
         return f"{minutes}:{seconds:02}"
 
 
+def split_urls(text: str) -> list:
+    """Splits a text with one or more URLs separated by spaces, commas or line breaks.
+
+    Args:
+        text (str): Text typed by the user.
+
+    Returns:
+        list: The URLs found, without duplicates and in the original order.
+    """
+    urls = []
+    for url in re.split(r"[\s,]+", text or ""):
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
 def internet_connection(url=None, translator=None, timeout: int = 10):
 
     message = ""
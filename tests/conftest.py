@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from benchmarks.media_server import MediaServer
+from modules.download_engine import DownloadEngine
+from modules.language_manager import TranslationManager
+
+
+@pytest.fixture(scope="session")
+def media_server():
+    """Local server of synthetic media (small files, no network access)."""
+    with MediaServer(
+        progressive_size=256 * 1024,
+        progressive_count=3,
+        fragment_size=16 * 1024,
+        fragment_count=4,
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def translator():
+    translator = TranslationManager(None)
+    translator.current_language = "en_US"
+    return translator
+
+
+@pytest.fixture
+def user_prefer(tmp_path):
+    # Um dict basta: o motor só usa get(); nada é salvo em config/
+    return {
+        "default_download_path": str(tmp_path / "downloads"),
+        "media": "Video",
+        "quality": "1080p",
+        "last_format_video": "mp4",
+        "last_format_audio": "mp3",
+        "max_concurrent_downloads": 2,
+        "playlist_workers": 2,
+        "bandwidth_limit": 0,
+        "use_download_archive": False,
+        "use_info_cache": False,
+        "range_connections": 1,
+    }
+
+
+class EngineUnderTest(DownloadEngine):
+    """Engine without interface that downloads the synthetic media."""
+
+    FINAL_STATUS = ("finished", "error", "cancelled", "paused")
+
+    def enqueue(self, job):
+        # A mídia sintética não é um vídeo de verdade: "best" e sem o ffmpeg
+        job.resume_opts = dict(
+            job.resume_opts, format="best", noprogress=True, fixup="never"
+        )
+        return super().enqueue(job)
+
+    def wait_job(self, job, timeout=30):
+        deadline = time.monotonic() + timeout
+        while job.status not in self.FINAL_STATUS or job in self.queue.active_jobs():
+            assert time.monotonic() < deadline, f"job {job.id} is still {job.status}"
+            time.sleep(0.02)
+        return job
+
+
+@pytest.fixture
+def make_engine(translator):
+    engines = []
+
+    def make(**kwargs):
+        engine = EngineUnderTest(translator, **kwargs)
+        engine.range_connections = 1
+        engine.set_use_info_cache(False)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.queue.cancel_all()
+
+
+@pytest.fixture
+def download_options(translator, tmp_path):
+    def options(url, playlist=False, folder="downloads"):
+        return {
+            "url": url,
+            "download_path": str(tmp_path / folder),
+            "ffmpeg_path": "",
+            "media": translator.get_text("video"),
+            "format": "mp4",
+            "quality": "1080",
+            "playlist": playlist,
+            "playlist_items": "",
+            "playlist_reverse": False,
+            "playlist_random": False,
+        }
+
+    return options
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from modules.bandwidth import BandwidthLimiter
+from modules.cancellation import CancelToken
+
+
+def test_release_during_consume():
+    limiter = BandwidthLimiter(rate=1024)
+    errors = []
+
+    def consume():
+        try:
+            limiter.consume("job", 1024)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    time.sleep(0.1)
+    # O job terminou (ou foi cancelado) enquanto esperava
+    limiter.release("job")
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert errors == []
+
+
+def test_weights_share_the_rate():
+    limiter = BandwidthLimiter(rate=100_000, burst=0.01)
+    received = {"light": 0, "heavy": 0}
+    weights = {"light": 1.0, "heavy": 3.0}
+    stop = time.monotonic() + 1.0
+
+    def download(key):
+        while time.monotonic() < stop:
+            limiter.consume(key, 1000, weights[key])
+            received[key] += 1000
+
+    threads = [threading.Thread(target=download, args=(key,)) for key in weights]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 2 <= received["heavy"] / received["light"] <= 4
+    assert sum(received.values()) <= 100_000 * 1.3
+
+
+def test_cancel_token_ends_the_wait():
+    limiter = BandwidthLimiter(rate=1024)
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+
+    start = time.monotonic()
+    limiter.consume("job", 100 * 1024, cancel_token=token)
+    assert time.monotonic() - start < 1
+
+
+def test_unlimited_does_not_wait():
+    limiter = BandwidthLimiter(rate=0)
+    start = time.monotonic()
+    limiter.consume("job", 10 * 1024 * 1024)
+    assert time.monotonic() - start < 0.1
@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks import formats, playlist, suite
+
+SETTINGS = {
+    "ffmpeg": None,
+    "range_connections": 2,
+    "playlist_workers": 2,
+    "worker_mode": "thread",
+}
+
+
+@pytest.mark.parametrize(
+    "name", ["single_progressive", "single_dash", "single_hls", "playlist"]
+)
+def test_scenarios_download_the_media(name, media_server):
+    url = media_server.url(suite.SCENARIOS[name]["path"])
+    result = suite.run_scenario(name, url, SETTINGS)
+
+    assert result["status"] == "finished", result["error"]
+    assert result["files"] >= 1
+    assert result["bytes"] > 0
+    if name == "single_progressive":
+        assert result["bytes"] == media_server.progressive_size
+    if name == "playlist":
+        assert result["files"] == media_server.progressive_count
+
+
+def test_playlist_memory_run(media_server):
+    entries = media_server.progressive_count
+    result = playlist.run_playlist(
+        media_server.url("playlist.rss"),
+        entries,
+        {"playlist_workers": 2, "interval": 0.01, "tracemalloc": False},
+    )
+    assert result["status"] == "finished", result["error"]
+    assert result["downloaded"] == entries
+    assert result["checkpoints"]["100%"]["items"] == entries
+
+
+def test_formats_run_checks_parity():
+    result = formats.run(count=30, repeat=1, number=1)
+    assert "find_best/legacy" in result["results"]
+    assert "find_best/index_cached_query" in result["results"]
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+
+import pytest
+from yt_dlp.utils import Popen
+
+from modules.cancellation import CancelToken, DownloadCancelled
+
+
+def files_in(folder):
+    return [
+        os.path.join(root, name)
+        for root, _, files in os.walk(folder)
+        for name in files
+    ]
+
+
+def start_slow_download(engine, download_options, media_server):
+    # 256 KiB a 32 KiB/s: o download leva uns 8 segundos
+    engine.set_bandwidth_limit(32)
+    options = download_options(media_server.url("progressive/1.mp4"))
+    job = engine.submit("basic", options)
+    deadline = time.monotonic() + 10
+    while not job.partial_files:
+        assert time.monotonic() < deadline, "the download did not start"
+        time.sleep(0.02)
+    return job, options["download_path"]
+
+
+def test_token():
+    token = CancelToken()
+    assert not token.wait(0.01)
+    token.raise_if_cancelled()
+
+    token.cancel()
+    assert token.wait(0)
+    with pytest.raises(DownloadCancelled):
+        token.raise_if_cancelled()
+
+    token.reset()
+    assert not token.is_cancelled()
+
+
+def test_cancel_kills_the_processes_of_the_job():
+    token = CancelToken()
+    with token.bind():
+        process = Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+
+    start = time.monotonic()
+    token.cancel()
+    process.wait(timeout=5)
+    assert time.monotonic() - start < 2
+    assert process.returncode != 0
+
+
+def test_cancel_stops_a_running_download(make_engine, download_options, media_server):
+    engine = make_engine()
+    job, folder = start_slow_download(engine, download_options, media_server)
+
+    start = time.monotonic()
+    engine.cancel(job.id)
+    engine.wait_job(job)
+
+    assert job.status == "cancelled"
+    assert time.monotonic() - start < 1.5
+    # Os arquivos parciais do job são apagados
+    assert not [path for path in files_in(folder) if path.endswith(".part")]
+
+
+def test_pause_keeps_the_partial_file(make_engine, download_options, media_server):
+    engine = make_engine()
+    job, folder = start_slow_download(engine, download_options, media_server)
+
+    engine.pause(job.id)
+    engine.wait_job(job)
+    assert job.status == "paused"
+    [partial] = files_in(folder)
+    assert partial.endswith(".part")
+
+    engine.set_bandwidth_limit(0)
+    assert engine.resume(job.id)
+    engine.wait_job(job)
+
+    assert job.status == "finished"
+    [output] = files_in(folder)
+    assert os.path.getsize(output) == media_server.progressive_size
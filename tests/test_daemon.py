@@ -0,0 +1,202 @@
+import http.client
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from modules.cli import build_parser
+from modules.daemon import DaemonDownloader, create_server
+
+
+@pytest.fixture
+def api(translator, user_prefer):
+    engine = DaemonDownloader(translator, user_prefer, output=io.StringIO())
+    defaults = vars(build_parser(user_prefer).parse_args([]))
+    server = create_server(engine, "127.0.0.1:0", defaults)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.stopping.set()
+    server.shutdown()
+    server.server_close()
+    engine.queue.cancel_all()
+
+
+def request(server, method, path, body=None, headers=None):
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    headers = dict(headers or {})
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode("utf-8")
+        headers.setdefault("Content-Type", "application/json")
+    connection.request(method, path, data, headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read() or b"null")
+    connection.close()
+    return response.status, payload
+
+
+def wait_jobs(engine, timeout=30):
+    deadline = time.monotonic() + timeout
+    while engine.queue.active_jobs() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not engine.queue.active_jobs()
+
+
+def test_submit_uses_only_the_job_options(api, media_server, user_prefer):
+    status, jobs = request(
+        api,
+        "POST",
+        "/jobs",
+        {
+            "url": media_server.url("progressive/1.mp4"),
+            "quality": "720p",
+            "output": "/tmp/elsewhere",
+            "ffmpeg": "/tmp/not-ffmpeg",
+        },
+    )
+    assert status == 201
+    job = api.engine.queue.get(jobs[0]["job"])
+    assert job.options["quality"] == "720"
+    assert job.options["download_path"] == user_prefer["default_download_path"]
+    assert job.options["ffmpeg_path"] == ""
+    wait_jobs(api.engine)
+
+
+def test_rejects_bodies_that_are_not_json(api, media_server):
+    status, _ = request(
+        api,
+        "POST",
+        "/jobs",
+        {"url": media_server.url("progressive/1.mp4")},
+        {"Content-Type": "text/plain"},
+    )
+    assert status == 415
+    assert not api.engine.queue.jobs
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{"Origin": "http://example.com"}, {"Host": "example.com"}],
+)
+def test_rejects_other_sites(api, headers):
+    status, _ = request(api, "GET", "/jobs", headers=headers)
+    assert status == 403
+
+
+def test_same_origin_is_allowed(api):
+    host, port = api.server_address[:2]
+    status, jobs = request(
+        api, "GET", "/jobs", headers={"Origin": f"http://{host}:{port}"}
+    )
+    assert status == 200
+    assert jobs == []
+
+
+def test_token(api):
+    api.token = "secret"
+    assert request(api, "GET", "/jobs")[0] == 401
+    assert request(api, "GET", "/jobs", headers={"Authorization": "Bearer no"})[0] == 401
+    assert (
+        request(api, "GET", "/jobs", headers={"Authorization": "Bearer secret"})[0]
+        == 200
+    )
+
+
+@pytest.mark.parametrize("weight", ["heavy", 0, -1, "nan", [1]])
+def test_invalid_weight_is_rejected_before_queueing(api, media_server, weight):
+    status, payload = request(
+        api,
+        "POST",
+        "/jobs",
+        {"url": media_server.url("progressive/1.mp4"), "weight": weight},
+    )
+    assert status == 400
+    assert "weight" in payload["error"]
+    assert not api.engine.queue.jobs
+
+
+def test_weight(api, media_server):
+    status, jobs = request(
+        api,
+        "POST",
+        "/jobs",
+        {"url": media_server.url("progressive/1.mp4"), "weight": 2.5},
+    )
+    assert status == 201
+    assert api.engine.queue.get(jobs[0]["job"]).weight == 2.5
+    wait_jobs(api.engine)
+
+
+def test_finished_jobs_are_forgotten(api, media_server):
+    api.engine.FINISHED_HISTORY = 1
+    api.engine.set_max_workers(1)
+    status, jobs = request(
+        api,
+        "POST",
+        "/jobs",
+        {
+            "urls": [
+                media_server.url("progressive/1.mp4"),
+                media_server.url("progressive/2.mp4"),
+            ]
+        },
+    )
+    assert status == 201
+    wait_jobs(api.engine)
+
+    assert len(api.engine.queue.jobs) == 1
+    assert sum(api.engine.results.values()) == 2
+    assert request(api, "GET", f"/jobs/{jobs[0]['job']}")[0] == 404
+    assert request(api, "GET", f"/jobs/{jobs[1]['job']}")[0] == 200
+
+
+@pytest.fixture
+def socket_path():
+    # Caminho curto: sockets Unix têm um limite de ~100 caracteres
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "api.sock")
+
+
+def unix_server(translator, user_prefer, path):
+    engine = DaemonDownloader(translator, user_prefer, output=io.StringIO())
+    defaults = vars(build_parser(user_prefer).parse_args([]))
+    return create_server(engine, f"unix:{path}", defaults)
+
+
+def test_unix_socket_does_not_replace_other_files(
+    translator, user_prefer, socket_path
+):
+    with open(socket_path, "w") as file:
+        file.write("data")
+    with pytest.raises(FileExistsError):
+        unix_server(translator, user_prefer, socket_path)
+    with open(socket_path) as file:
+        assert file.read() == "data"
+
+
+def test_unix_socket_in_use_is_kept(translator, user_prefer, socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(socket_path)
+        listener.listen()
+        with pytest.raises(FileExistsError):
+            unix_server(translator, user_prefer, socket_path)
+        assert os.path.exists(socket_path)
+
+
+def test_stale_unix_socket_is_replaced(translator, user_prefer, socket_path):
+    # Socket sem servidor, como depois de um kill -9
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path)
+    server = unix_server(translator, user_prefer, socket_path)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+    finally:
+        server.server_close()
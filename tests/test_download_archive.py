@@ -0,0 +1,71 @@
+import os
+
+from modules.download_archive import DownloadArchive
+
+
+def count_files(folder):
+    return sum(len(files) for _, _, files in os.walk(folder))
+
+
+def test_keys_persist(tmp_path):
+    path = str(tmp_path / "archive.db")
+    archive = DownloadArchive(path)
+    # O yt-dlp ignora o arquivo quando ele é "falso"
+    assert archive
+    assert "youtube abc" not in archive
+    assert "" not in archive and None not in archive
+
+    archive.add("youtube abc")
+    archive.add("youtube abc")
+    assert "youtube abc" in archive
+    archive.close()
+
+    archive = DownloadArchive(path)
+    assert "youtube abc" in archive
+    assert "youtube xyz" not in archive
+    archive.close()
+
+
+def test_archived_videos_are_skipped(
+    make_engine, download_options, media_server, tmp_path
+):
+    archive = DownloadArchive(str(tmp_path / "archive.db"))
+    engine = make_engine(archive=archive)
+    url = media_server.url("progressive/1.mp4")
+
+    first = engine.wait_job(engine.submit("basic", download_options(url)))
+    assert first.status == "finished"
+    assert first.skipped == 0
+
+    again = download_options(url, folder="again")
+    second = engine.wait_job(engine.submit("basic", again))
+    assert second.status == "finished"
+    assert second.skipped == 1
+    assert count_files(again["download_path"]) == 0
+
+    # Com o arquivo desligado baixa de novo
+    engine.set_use_archive(False)
+    third = engine.wait_job(engine.submit("basic", again))
+    assert third.skipped == 0
+    assert count_files(again["download_path"]) == 1
+    archive.close()
+
+
+def test_archived_playlist_entries_are_skipped(
+    make_engine, download_options, media_server, tmp_path
+):
+    archive = DownloadArchive(str(tmp_path / "archive.db"))
+    engine = make_engine(archive=archive)
+    url = media_server.url("playlist.rss")
+    total = media_server.progressive_count
+
+    first = engine.wait_job(engine.submit("basic", download_options(url, True)))
+    assert first.status == "finished"
+    assert first.skipped == 0
+
+    again = download_options(url, True, folder="again")
+    second = engine.wait_job(engine.submit("basic", again))
+    assert second.status == "finished"
+    assert second.skipped == total
+    assert count_files(again["download_path"]) == 0
+    archive.close()
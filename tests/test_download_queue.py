@@ -0,0 +1,130 @@
+import threading
+import time
+
+from modules.download_queue import DownloadJob, DownloadQueue
+
+
+class Runner:
+    """Runs each job until it is cancelled or released, like download_process."""
+
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, job):
+        with self._lock:
+            self.started.append(job.id)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            while not self.release.is_set():
+                if job.cancel_token.wait(0.01):
+                    job.status = "paused" if job.pause_requested else "cancelled"
+                    return
+            job.status = "finished"
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def make_job(index=0):
+    return DownloadJob("basic", {"url": f"https://example.com/{index}"})
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_runs_at_most_max_workers_in_order():
+    runner = Runner()
+    queue = DownloadQueue(runner, max_workers=2)
+    jobs = [queue.submit(make_job(index)) for index in range(5)]
+
+    wait_for(lambda: len(runner.started) == 2)
+    assert [job.status for job in jobs] == ["running"] * 2 + ["queued"] * 3
+
+    runner.release.set()
+    wait_for(lambda: all(job.status == "finished" for job in jobs))
+    assert runner.max_running == 2
+    assert runner.started == [job.id for job in jobs]
+
+
+def test_cancel_queued_and_running_jobs():
+    runner = Runner()
+    queue = DownloadQueue(runner, max_workers=1)
+    running, waiting = queue.submit(make_job(1)), queue.submit(make_job(2))
+    wait_for(lambda: running.status == "running")
+
+    assert queue.cancel(waiting.id)
+    assert waiting.status == "cancelled"
+    assert queue.cancel(running.id)
+    wait_for(lambda: running.status == "cancelled")
+
+    assert runner.started == [running.id]
+    assert queue.active_jobs() == []
+    assert not queue.cancel(12345)
+
+
+def test_pause_and_resume():
+    runner = Runner()
+    queue = DownloadQueue(runner, max_workers=1)
+    running, waiting = queue.submit(make_job(1)), queue.submit(make_job(2))
+    wait_for(lambda: running.status == "running")
+
+    assert queue.pause(waiting.id)
+    assert waiting.status == "paused"
+    assert queue.pause(running.id)
+    wait_for(lambda: running.status == "paused")
+    assert not queue.pause(running.id)
+
+    # Volta para o fim da fila, com um cancel_token novo
+    runner.release.set()
+    assert queue.resume(running.id)
+    assert not running.is_cancelled()
+    assert queue.resume(waiting.id)
+    wait_for(lambda: running.status == waiting.status == "finished")
+    assert runner.started == [running.id, running.id, waiting.id]
+    assert not queue.resume(running.id)
+
+
+def test_more_workers_start_waiting_jobs():
+    runner = Runner()
+    queue = DownloadQueue(runner, max_workers=1)
+    jobs = [queue.submit(make_job(index)) for index in range(3)]
+    wait_for(lambda: len(runner.started) == 1)
+
+    queue.set_max_workers(3)
+    wait_for(lambda: len(runner.started) == 3)
+    runner.release.set()
+    wait_for(lambda: all(job.status == "finished" for job in jobs))
+
+
+def test_remove_keeps_unfinished_jobs():
+    runner = Runner()
+    queue = DownloadQueue(runner, max_workers=1)
+    running, waiting = queue.submit(make_job(1)), queue.submit(make_job(2))
+    wait_for(lambda: running.status == "running")
+
+    assert not queue.remove(running.id)
+    assert not queue.remove(waiting.id)
+    runner.release.set()
+    wait_for(lambda: waiting.status == "finished")
+    assert queue.remove(running.id)
+    assert queue.get(running.id) is None
+    assert list(queue.jobs) == [waiting.id]
+
+
+def test_runner_error_marks_the_job():
+    def runner(job):
+        raise RuntimeError("boom")
+
+    queue = DownloadQueue(runner, max_workers=1)
+    job = queue.submit(make_job())
+    wait_for(lambda: job.status == "error")
+    assert job.error == "boom"
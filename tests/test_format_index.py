@@ -0,0 +1,87 @@
+import pytest
+
+from benchmarks.formats import check, format_ladder, legacy_find_best, legacy_presets
+from modules.format_index import FormatIndex
+
+QUERIES = [
+    (height, codec, container)
+    for height in (360, 720, 1080, 2160, 999)
+    for codec in ("h264", "h265", "vp9", "av1", "H264")
+    for container in ("mp4", "webm", "mkv")
+]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("count", [20, 200])
+def test_ranking_matches_the_old_selection(seed, count):
+    formats = format_ladder(count, seed)
+    index = FormatIndex(formats)
+
+    for query in QUERIES:
+        old = legacy_find_best(formats, *query)
+        new = index.best_video(*query)
+        assert [f["format_id"] for f in new] == [f["format_id"] for f in old], query
+        for old_item, new_item in zip(old, new):
+            for field in ("score", "resolucao_match", "codec_match", "formato_match"):
+                assert new_item[field] == pytest.approx(old_item[field]), (query, field)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_presets_match_the_old_scan(seed):
+    formats = format_ladder(120, seed)
+    check(formats)
+
+    old_presets, old_audio = legacy_presets(formats)
+    index = FormatIndex(formats)
+    presets = index.presets()
+    assert [(p.height, p.fps, p.ext) for p in presets] == [
+        (p["resolucao"], p["FPS"], p["ext"]) for p in old_presets
+    ]
+    assert index.default_audio_id == old_audio
+
+
+def test_repeated_queries_are_cached():
+    index = FormatIndex(format_ladder(50))
+    assert index.best_video(720, "vp9", "webm") is index.best_video(720, "VP9", "WEBM")
+
+
+def test_formats_without_video_or_height():
+    formats = [
+        {"format_id": "a", "vcodec": "none", "acodec": "opus", "ext": "webm"},
+        {"format_id": "b", "vcodec": "avc1", "ext": "mp4"},
+        {"format_id": "c", "vcodec": "avc1", "height": 720, "ext": "mp4", "fps": 30},
+    ]
+    index = FormatIndex(formats)
+    old = legacy_find_best(formats, 720, "h264", "mp4")
+    assert [f["format_id"] for f in index.best_video(720, "h264", "mp4")] == ["c"]
+    assert [f["format_id"] for f in old] == ["c"]
+    assert [fmt.format_id for fmt in index.audio] == ["a"]
+
+
+def test_advanced_jobs_reuse_the_search_index(
+    make_engine, download_options, monkeypatch
+):
+    engine = make_engine()
+    engine.extract_video_formats({"formats": format_ladder(50)})
+    monkeypatch.setattr(engine, "enqueue", lambda job: job)
+
+    options = download_options("https://www.example.com/watch?v=1")
+    options["custom_format"] = {
+        "video_quality": "720",
+        "video_codec": "vp9",
+        "container": "webm",
+        "audio_codec": "libopus",
+        "compression_quality": "",
+        "encoding_speed": "",
+    }
+    job = engine.submit("advanced", options, engine.info_formats)
+    assert job.format_index is engine.format_index
+
+    # A configuração do job consulta o índice da busca, sem criar outro
+    def rebuilt(self, formats):
+        raise AssertionError("FormatIndex rebuilt for the job")
+
+    monkeypatch.setattr(FormatIndex, "__init__", rebuilt)
+    engine.config_options(job)
+    expected = engine.format_index.format_string(720, "vp9", "webm")
+    assert job.ydl_opts["format"] == expected
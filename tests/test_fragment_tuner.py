@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from modules import fragment_tuner
+from modules.fragment_tuner import FragmentTuner
+from modules.range_downloader import RangeSplitDownloader
+
+URL = "https://www.example.com/watch?v=1"
+FRAGMENTS = "concurrent_fragment_downloads"
+CHUNK = "http_chunk_size"
+SIZE = 10 * 1048576
+
+
+def fragments(tuner, url=URL):
+    return tuner.options_for(url)[FRAGMENTS]
+
+
+def test_starting_values():
+    tuner = FragmentTuner(persist=False)
+    assert tuner.options_for(URL) == {FRAGMENTS: 2, CHUNK: 10485760}
+
+
+def test_steps_up_while_faster_and_keeps_the_best():
+    tuner = FragmentTuner(persist=False)
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 2)
+    assert fragments(tuner) == 4
+    tuner.record(URL, FRAGMENTS, SIZE, 5.0, 4)
+    assert fragments(tuner) == 8
+
+    # 8 fragmentos não foram 10% mais rápidos: volta para 4 e para de ajustar
+    tuner.record(URL, FRAGMENTS, SIZE, 4.8, 8)
+    assert fragments(tuner) == 4
+    tuner.record(URL, FRAGMENTS, SIZE, 1.0, 4)
+    assert fragments(tuner) == 4
+
+
+def test_settles_on_the_last_step():
+    tuner = FragmentTuner(persist=False)
+    steps = FragmentTuner.STEPS[FRAGMENTS]
+    elapsed = 10.0
+    for value in steps[FragmentTuner.START_STEP[FRAGMENTS] :]:
+        tuner.record(URL, FRAGMENTS, SIZE, elapsed, value)
+        elapsed /= 2
+    assert fragments(tuner) == steps[-1]
+    assert tuner.hosts["example.com"][FRAGMENTS]["settled"]
+
+
+def test_ignores_unreliable_or_stale_measures():
+    tuner = FragmentTuner(persist=False)
+    # Pequeno demais, sem tempo ou valor que não é um passo
+    tuner.record(URL, FRAGMENTS, FragmentTuner.MIN_SIZE - 1, 1.0, 2)
+    tuner.record(URL, FRAGMENTS, SIZE, 0, 2)
+    tuner.record(URL, FRAGMENTS, SIZE, 1.0, 3)
+    assert fragments(tuner) == 2
+
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 2)
+    # Download que começou antes do ajuste, com o valor anterior
+    tuner.record(URL, FRAGMENTS, SIZE, 100.0, 2)
+    assert fragments(tuner) == 4
+
+
+def test_sites_and_options_are_tuned_separately():
+    tuner = FragmentTuner(persist=False)
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 2)
+    tuner.record(URL, CHUNK, SIZE, 10.0, 10485760)
+
+    assert tuner.options_for("https://example.com/other") == {
+        FRAGMENTS: 4,
+        CHUNK: 20971520,
+    }
+    assert tuner.options_for("https://other.org/") == {FRAGMENTS: 2, CHUNK: 10485760}
+
+
+def test_tunes_again_after_retune_days():
+    tuner = FragmentTuner(persist=False)
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 2)
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 4)
+    state = tuner.hosts["example.com"][FRAGMENTS]
+    assert state["settled"]
+
+    state["updated_at"] = time.time() - (FragmentTuner.RETUNE_DAYS + 1) * 86400
+    assert fragments(tuner) == 2
+    assert not tuner.hosts["example.com"][FRAGMENTS]["settled"]
+
+
+def test_saves_and_loads_the_values(monkeypatch):
+    saved = {}
+    monkeypatch.setattr(fragment_tuner, "read_config", lambda name: saved.get(name))
+    monkeypatch.setattr(
+        fragment_tuner, "save_config", lambda name, data: saved.update({name: data})
+    )
+
+    tuner = FragmentTuner()
+    tuner.record(URL, FRAGMENTS, SIZE, 10.0, 2)
+    assert FragmentTuner.FILENAME in saved
+
+    assert fragments(FragmentTuner()) == 4
+
+
+class RecordingTuner(FragmentTuner):
+    def __init__(self):
+        super().__init__(persist=False)
+        self.records = []
+
+    def record(self, url, option, size, elapsed, value):
+        self.records.append(option)
+
+
+@pytest.mark.parametrize("connections, records", [(1, [CHUNK]), (4, [])])
+def test_range_split_downloads_do_not_tune_the_chunk_size(
+    make_engine, download_options, media_server, monkeypatch, connections, records
+):
+    # Arquivo de 256 KiB dividido em ranges, que não usam o http_chunk_size
+    monkeypatch.setattr(RangeSplitDownloader, "MIN_SIZE", 64 * 1024)
+    tuner = RecordingTuner()
+    engine = make_engine(tuner=tuner)
+    engine.range_connections = connections
+
+    url = media_server.url("progressive/1.mp4")
+    job = engine.wait_job(engine.submit("basic", download_options(url)))
+    assert job.status == "finished"
+    assert tuner.records == records
@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+
+import pytest
+
+from modules import info_cache as module
+from modules.info_cache import (
+    EXPIRY_MARGIN,
+    InfoCache,
+    stream_expiry,
+    streams_expire_at,
+    video_key,
+)
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def video_info(video_id="dQw4w9WgXcQ", stream_url="https://media.example/v.mp4"):
+    return {
+        "id": video_id,
+        "title": f"Video {video_id}",
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "formats": [{"format_id": "18", "url": stream_url, "ext": "mp4"}],
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Relógio do cache controlado pelo teste
+    now = [1_000_000.0]
+    monkeypatch.setattr(module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = InfoCache(str(tmp_path / "info.db"), ttl=3600, stream_ttl=600)
+    yield cache
+    cache.close()
+
+
+def keys(cache):
+    rows = cache._conn.execute("SELECT key FROM info ORDER BY key").fetchall()
+    return [key for key, in rows]
+
+
+def test_video_key_normalizes_the_urls():
+    urls = [
+        URL,
+        "https://youtu.be/dQw4w9WgXcQ?t=10",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    ]
+    assert {video_key(url) for url in urls} == {"youtube dQw4w9WgXcQ"}
+    # Só o extrator genérico aceita a URL: sem chave
+    assert video_key("https://media.example/video.mp4") is None
+
+
+def test_other_urls_of_the_video_find_the_entry(cache):
+    assert cache.put("https://youtu.be/dQw4w9WgXcQ", video_info())
+    shorts = cache.get("https://www.youtube.com/shorts/dQw4w9WgXcQ")
+    assert shorts["id"] == "dQw4w9WgXcQ"
+
+    # Sem chave própria: achada pelo nome guardado na tabela de URLs
+    info = dict(video_info(), original_url="https://short.example/abc")
+    cache.put("https://short.example/abc", info)
+    assert cache.get("https://short.example/abc")["id"] == "dQw4w9WgXcQ"
+    assert cache.get("https://short.example/other") is None
+
+
+def test_metadata_expires_after_the_ttl(cache, clock):
+    cache.put(URL, video_info())
+    clock[0] += 3599
+    assert cache.get(URL) is not None
+
+    clock[0] += 2
+    assert cache.get(URL) is None
+    assert keys(cache) == []
+
+
+def test_prune_removes_the_old_entries(cache, clock):
+    cache.put(URL, video_info())
+    clock[0] += 3000
+    cache.put("https://youtu.be/aaaaaaaaaaa", video_info("aaaaaaaaaaa"))
+    clock[0] += 1000
+
+    cache.prune()
+    assert keys(cache) == ["youtube aaaaaaaaaaa"]
+    rows = cache._conn.execute("SELECT DISTINCT key FROM urls").fetchall()
+    assert rows == [("youtube aaaaaaaaaaa",)]
+
+
+@pytest.mark.parametrize(
+    "url, expiry",
+    [
+        ("https://r1.googlevideo.com/videoplayback?expire=1700000000&id=1", 1700000000),
+        ("https://cdn.example/v.mp4?Expires=1700000001&Signature=x", 1700000001),
+        ("https://cdn.example/v.mp4?exp=1700000002", 1700000002),
+        (
+            "https://manifest.googlevideo.com/api/manifest/dash/expire/1700000003/ei/x",
+            1700000003,
+        ),
+        ("https://cdn.example/v.m3u8?hdnts=exp=1700000004~acl=/*~hmac=x", 1700000004),
+        (
+            "https://bucket.s3.amazonaws.com/v.mp4"
+            "?X-Amz-Date=20231114T221320Z&X-Amz-Expires=600",
+            1700000000 + 600,
+        ),
+        ("https://cdn.example/v.mp4?id=1", None),
+        ("https://cdn.example/v.mp4?expire=soon", None),
+    ],
+)
+def test_stream_expiry_parsing(url, expiry):
+    assert stream_expiry({"formats": [{"url": url}]}) == expiry
+
+
+def test_stream_expiry_is_the_earliest_url():
+    info = {
+        "url": "https://cdn.example/a.mp4?expire=1700000300",
+        "formats": [
+            {"url": "https://cdn.example/b.mp4?expire=1700000200"},
+            {"manifest_url": "https://cdn.example/expire/1700000100/c.mpd"},
+            {"fragment_base_url": "https://cdn.example/d/?id=1"},
+        ],
+    }
+    assert stream_expiry(info) == 1700000100
+    assert streams_expire_at(info) == 1700000100 - EXPIRY_MARGIN
+    # URLs sem validade: stream_ttl a partir de agora
+    assert streams_expire_at({"formats": []}, 600, now=1000) == 1600
+
+
+def test_fresh_streams_cut_off(cache, clock):
+    expire = 1_000_000 + 3000
+    stream_url = f"https://r1.googlevideo.com/videoplayback?expire={expire}"
+    cache.put(URL, video_info(stream_url=stream_url))
+
+    clock[0] = expire - EXPIRY_MARGIN - 1
+    assert cache.get(URL, fresh_streams=True) is not None
+
+    clock[0] = expire - EXPIRY_MARGIN
+    assert cache.get(URL, fresh_streams=True) is None
+    # A busca só precisa dos metadados, que continuam valendo
+    assert cache.get(URL)["id"] == "dQw4w9WgXcQ"
+
+
+def test_evicts_the_least_recently_used(tmp_path, clock):
+    cache = InfoCache(str(tmp_path / "info.db"))
+    cache.put(URL, video_info())
+    [[size]] = cache._conn.execute("SELECT size FROM info").fetchall()
+    # Cabem dois itens
+    cache.max_size = int(size * 2.5)
+
+    clock[0] += 1
+    cache.put("https://youtu.be/aaaaaaaaaaa", video_info("aaaaaaaaaaa"))
+    clock[0] += 1
+    assert cache.get(URL) is not None  # O primeiro volta a ser o mais recente
+    clock[0] += 1
+    cache.put("https://youtu.be/bbbbbbbbbbb", video_info("bbbbbbbbbbb"))
+
+    assert keys(cache) == ["youtube bbbbbbbbbbb", "youtube dQw4w9WgXcQ"]
+    assert cache.get("https://youtu.be/aaaaaaaaaaa") is None
+    rows = cache._conn.execute(
+        "SELECT url FROM urls WHERE key = 'youtube aaaaaaaaaaa'"
+    ).fetchall()
+    assert rows == []
+    cache.close()
+
+
+def test_cached_info_keeps_its_stream_expiry(cache, clock):
+    cache.put(URL, video_info())
+    clock[0] += 500
+
+    info = cache.get(URL)
+    # A validade é a da extração, não uma nova a partir da leitura
+    assert streams_expire_at(info) == 1_000_000.0 + 600
+    assert cache.get(URL, fresh_streams=True) is not None
+
+    clock[0] += 200
+    assert cache.get(URL, fresh_streams=True) is None
+
+
+def test_search_from_cache_does_not_renew_the_streams(make_engine, cache, clock):
+    cache.put(URL, video_info())
+    clock[0] += 500
+
+    engine = make_engine(info_cache=cache)
+    engine.set_use_info_cache(True)
+    engine.search_process(URL)
+
+    assert engine.search_info["title"] == "Video dQw4w9WgXcQ"
+    assert engine.search_info_expires_at == 1_000_000.0 + 600
@@ -0,0 +1,78 @@
+import os
+
+from modules.job_journal import JobJournal
+
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    journal = JobJournal(path)
+    first = journal.add_job("https://example.com/a", "basic", {"url": "a"})
+    second = journal.add_job("https://example.com/b", "basic", {"url": "b"})
+    journal.set_job_opts(first, {"format": "best", "progress_hooks": [print]})
+    journal.set_job_status(first, "running")
+    journal.set_item(first, "video-1", "finished", 1, "/tmp/1.mp4")
+    journal.set_item(first, "video-2", "running", 2)
+    journal.set_job_status(second, "finished")
+    journal.close()
+
+    journal = JobJournal(path)
+    jobs = journal.unfinished_jobs()
+    assert [job["id"] for job in jobs] == [first]
+    assert jobs[0]["options"] == {"url": "a"}
+    # As funções (hooks) não vão para o diário
+    assert jobs[0]["ydl_opts"] == {"format": "best"}
+    assert journal.finished_items(first) == {"video-1"}
+    journal.close()
+
+
+def test_prune_keeps_unfinished_jobs(tmp_path):
+    journal = JobJournal(str(tmp_path / "jobs.db"))
+    old = journal.add_job("a", "basic", {})
+    journal.set_job_status(old, "finished")
+    journal.set_item(old, "a", "finished")
+    paused = journal.add_job("b", "basic", {})
+    journal.set_job_status(paused, "paused")
+
+    journal.prune(max_age_days=-1)
+    assert [job["id"] for job in journal.unfinished_jobs()] == [paused]
+    assert journal.finished_items(old) == set()
+    journal.close()
+
+
+def test_resume_skips_the_finished_items(
+    make_engine, download_options, media_server, tmp_path
+):
+    path = str(tmp_path / "jobs.db")
+    url = media_server.url("playlist.rss")
+
+    # Primeira execução: a playlist inteira, para saber as chaves dos itens
+    journal = JobJournal(path)
+    engine = make_engine(journal=journal)
+    job = engine.wait_job(engine.submit("basic", download_options(url, True)))
+    assert job.status == "finished"
+    keys = journal.finished_items(job.journal_id)
+    assert len(keys) == media_server.progressive_count
+
+    # Um job interrompido com só o primeiro item baixado
+    options = download_options(url, True, folder="resumed")
+    record_id = journal.add_job(url, "basic", options)
+    journal.set_job_status(record_id, "running")
+    done = sorted(keys)[0]
+    journal.set_item(record_id, done, "finished", 1)
+    journal.close()
+
+    # Novo início do aplicativo
+    journal = JobJournal(path)
+    engine = make_engine(journal=journal)
+    [record] = journal.unfinished_jobs()
+    job = engine.wait_job(engine.resume_job(record))
+
+    assert job.status == "finished"
+    assert done in job.done_items
+    downloaded = [
+        name for _, _, files in os.walk(options["download_path"]) for name in files
+    ]
+    assert len(downloaded) == len(keys) - 1
+    assert journal.finished_items(record_id) == keys
+    assert journal.unfinished_jobs() == []
+    journal.close()
@@ -0,0 +1,36 @@
+import os
+import sys
+import threading
+
+import pytest
+from yt_dlp.utils import Popen
+
+from modules.metrics import JobMetrics
+
+BUSY = "import time\nend = time.process_time() + 0.5\nwhile time.process_time() < end: pass"
+IDLE = "import time\ntime.sleep(0.5)"
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+def test_ffmpeg_cpu_is_measured_per_process():
+    busy, idle = JobMetrics(), JobMetrics()
+
+    def run(metrics, code):
+        with metrics.bind():
+            process = Popen([sys.executable, "-c", code])
+            process.wait()
+
+    # Os dois terminam juntos: com RUSAGE_CHILDREN um levava o tempo do outro
+    threads = [
+        threading.Thread(target=run, args=(busy, BUSY)),
+        threading.Thread(target=run, args=(idle, IDLE)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert busy.counters["ffmpeg_processes"] == 1
+    assert idle.counters["ffmpeg_processes"] == 1
+    assert busy.counters["ffmpeg_cpu_seconds"] >= 0.4
+    assert idle.counters["ffmpeg_cpu_seconds"] < 0.3
@@ -0,0 +1,48 @@
+from yt_dlp import YoutubeDL
+from yt_dlp.postprocessor import PostProcessor
+
+from modules.pipeline import DeferredPostProcessing
+
+
+class RecordingPP(PostProcessor):
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def run(self, info):
+        self.seen.append(dict(info))
+        return [], info
+
+
+def test_deferred_steps_get_the_whole_info(media_server, tmp_path):
+    archive = tmp_path / "archive.txt"
+    recorder = RecordingPP()
+    ydl = YoutubeDL(
+        {
+            "quiet": True,
+            "noprogress": True,
+            "format": "best",
+            "outtmpl": str(tmp_path / "%(id)s.%(ext)s"),
+            "download_archive": str(archive),
+        }
+    )
+    ydl.add_post_processor(recorder, when="post_process")
+    deferred = DeferredPostProcessing(ydl)
+    try:
+        info = ydl.extract_info(media_server.url("progressive/1.mp4"))
+        # Nada roda antes de run(), nem o registro no arquivo de downloads
+        assert recorder.seen == []
+        assert not archive.exists() or not archive.read_text()
+
+        deferred.run()
+    finally:
+        ydl.close()
+
+    assert len(recorder.seen) == 1
+    seen = recorder.seen[0]
+    assert seen["id"] == info["id"]
+    assert seen["title"] == info["title"]
+    assert seen["filepath"] == str(tmp_path / f"{info['id']}.mp4")
+    assert info["id"] in archive.read_text()
+    # O info dos downloads é atualizado no lugar, como o yt-dlp espera
+    assert info["requested_downloads"][0]["filepath"] == seen["filepath"]
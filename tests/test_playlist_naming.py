@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from yt_dlp import YoutubeDL
+
+from benchmarks.media_server import MediaServer
+
+TEMPLATE = "%(playlist)s/%(playlist_autonumber)s - %(title)s.%(ext)s"
+
+
+@pytest.fixture(scope="module")
+def long_playlist():
+    # Mais de 9 itens: playlist_autonumber ganha zeros à esquerda ("01")
+    with MediaServer(
+        progressive_size=16 * 1024,
+        progressive_count=12,
+        fragment_size=16 * 1024,
+        fragment_count=1,
+    ) as server:
+        yield server
+
+
+def downloaded(folder):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), folder)
+        for root, _, files in os.walk(folder)
+        for name in files
+    )
+
+
+def plain_ytdlp(url, folder, **params):
+    with YoutubeDL(
+        {
+            "format": "best",
+            "outtmpl": os.path.join(folder, TEMPLATE),
+            "quiet": True,
+            "noprogress": True,
+            "fixup": "never",
+            **params,
+        }
+    ) as ydl:
+        ydl.download([url])
+    return downloaded(folder)
+
+
+# O zero à esquerda depende de quantos itens foram pedidos, não do total
+@pytest.mark.parametrize(
+    "items, first", [("", "01 - "), ("2-11", "01 - "), ("1,3,12", "1 - ")]
+)
+def test_playlist_filenames_match_ytdlp(
+    make_engine, download_options, long_playlist, tmp_path, items, first
+):
+    url = long_playlist.url("playlist.rss")
+    options = download_options(url, True)
+    options["playlist_items"] = items
+
+    engine = make_engine()
+    job = engine.wait_job(engine.submit("basic", options))
+    assert job.status == "finished"
+
+    params = {"playlist_items": items} if items else {}
+    expected = plain_ytdlp(url, str(tmp_path / "plain"), **params)
+    assert downloaded(options["download_path"]) == expected
+    assert any(os.path.basename(name).startswith(first) for name in expected)
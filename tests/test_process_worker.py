@@ -0,0 +1,62 @@
+import multiprocessing
+import threading
+
+from modules.bandwidth import BandwidthLimiter
+from modules.cancellation import CancelToken
+from modules.download_engine import DownloadEngine
+from modules.process_worker import SharedLimiter
+
+
+class RecordingProxy:
+    """Stands for the proxy of the manager process, recording the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def consume(self, *args):
+        self.calls.append(args)
+
+    def set_rate(self, rate):
+        pass
+
+
+def test_shared_limiter_skips_the_manager_without_limit():
+    proxy = RecordingProxy()
+    stop = threading.Event()
+    limiter = SharedLimiter(proxy, stop, multiprocessing.Value("d", 0))
+
+    limiter.consume(1, 1024, 1.0, CancelToken())
+    assert proxy.calls == []
+
+    limiter.set_rate(2048)
+    limiter.consume(1, 1024, 2.0, CancelToken())
+    assert proxy.calls == [(1, 1024, 2.0, stop)]
+
+
+def test_shared_limiter_returns_for_cancelled_jobs():
+    proxy = RecordingProxy()
+    limiter = SharedLimiter(proxy, None, multiprocessing.Value("d", 1024))
+    token = CancelToken()
+    token.cancel()
+
+    limiter.consume(1, 1024, 1.0, token)
+    assert proxy.calls == []
+
+
+def test_process_pool_keeps_the_local_limiter(translator):
+    engine = DownloadEngine(translator)
+    local_limiter = engine.limiter
+    engine.set_worker_mode("process")
+    pool = engine.get_process_pool()
+    try:
+        assert pool is not None
+        # Os jobs das threads continuam no limitador local (com o cancel_token)
+        assert engine.limiter is local_limiter
+        assert isinstance(engine.limiter, BandwidthLimiter)
+
+        engine.set_bandwidth_limit(100)
+        assert engine.limiter.rate == 100 * 1024
+        assert pool.limiter.rate == 100 * 1024
+        assert pool.limiter.proxy.rate == 100 * 1024
+    finally:
+        engine.close_process_pool()
@@ -0,0 +1,182 @@
+import json
+import os
+import time
+
+import pytest
+from yt_dlp import YoutubeDL
+from yt_dlp.networking.exceptions import TransportError
+
+from benchmarks.media_server import MediaServer
+from modules.cancellation import CancelToken, DownloadCancelled
+from modules.range_downloader import RangeSplitDownloader
+
+SIZE = 256 * 1024
+
+
+@pytest.fixture(autouse=True)
+def small_ranges(monkeypatch):
+    # Os arquivos de teste são pequenos: divide a partir de 64 KiB, em blocos de 16
+    monkeypatch.setattr(RangeSplitDownloader, "MIN_SIZE", 64 * 1024)
+    monkeypatch.setattr(RangeSplitDownloader, "BLOCK_SIZE", 16 * 1024)
+    monkeypatch.setattr(RangeSplitDownloader, "HOOK_INTERVAL", 0)
+    monkeypatch.setattr(RangeSplitDownloader, "STATE_INTERVAL", 0)
+
+
+def make_downloader(connections=4, fail_ranges=()):
+    """Downloader with 4 connections that records the Range of every request."""
+    ydl = YoutubeDL(
+        {
+            "quiet": True,
+            "noprogress": True,
+            "range_split_connections": connections,
+            "retries": 2,
+        }
+    )
+    ranges = []
+    failing = set(fail_ranges)
+    urlopen = ydl.urlopen
+
+    def recording_urlopen(request):
+        value = request.headers.get("Range")
+        ranges.append(value)
+        if value in failing:
+            failing.discard(value)
+            raise TransportError("connection reset")
+        return urlopen(request)
+
+    ydl.urlopen = recording_urlopen
+    return RangeSplitDownloader(ydl, ydl.params), ranges
+
+
+def expected_bytes(server, index=1):
+    with open(os.path.join(server.directory, "progressive", f"{index}.mp4"), "rb") as f:
+        return f.read()
+
+
+def download(downloader, server, target, index=1):
+    return downloader.download(
+        str(target), {"url": server.url(f"progressive/{index}.mp4"), "http_headers": {}}
+    )
+
+
+def test_split():
+    assert RangeSplitDownloader.split(10, 3) == [[0, 3, 0], [4, 7, 0], [8, 9, 0]]
+    ranges = RangeSplitDownloader.split(SIZE, 4)
+    assert [end - start + 1 for start, end, _ in ranges] == [SIZE // 4] * 4
+
+
+def test_downloads_each_range(media_server, tmp_path):
+    downloader, ranges = make_downloader()
+    target = tmp_path / "video.mp4"
+    download(downloader, media_server, target)
+
+    assert target.read_bytes() == expected_bytes(media_server)
+    part = SIZE // 4
+    assert ranges[0] == "bytes=0-0"
+    assert sorted(ranges[1:]) == sorted(
+        f"bytes={start}-{start + part - 1}" for start in range(0, SIZE, part)
+    )
+    assert not os.path.exists(f"{target}.part.ytdl")
+
+
+def test_resumes_each_range(media_server, tmp_path):
+    content = expected_bytes(media_server)
+    target = tmp_path / "video.mp4"
+    part = SIZE // 4
+
+    # Metade de cada range já baixada numa execução anterior
+    ranges = RangeSplitDownloader.split(SIZE, 4)
+    data = bytearray(SIZE)
+    for item in ranges:
+        item[2] = part // 2
+        data[item[0] : item[0] + item[2]] = content[item[0] : item[0] + item[2]]
+    (tmp_path / "video.mp4.part").write_bytes(bytes(data))
+    (tmp_path / "video.mp4.part.ytdl").write_text(
+        json.dumps({"size": SIZE, "ranges": ranges})
+    )
+
+    downloader, requested = make_downloader()
+    download(downloader, media_server, target)
+
+    assert target.read_bytes() == content
+    assert sorted(requested[1:]) == sorted(
+        f"bytes={start + part // 2}-{start + part - 1}" for start in range(0, SIZE, part)
+    )
+
+
+def test_saved_state_matches_the_file(media_server, tmp_path):
+    content = expected_bytes(media_server)
+    target = tmp_path / "video.mp4"
+    downloader, _ = make_downloader()
+
+    def interrupt(d):
+        if d["status"] == "downloading" and d["downloaded_bytes"] >= SIZE // 2:
+            raise KeyboardInterrupt
+
+    downloader.add_progress_hook(interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        download(downloader, media_server, target)
+
+    # Tudo o que o estado diz que foi baixado está no .part
+    state = json.loads((tmp_path / "video.mp4.part.ytdl").read_text())
+    data = (tmp_path / "video.mp4.part").read_bytes()
+    assert sum(done for _, _, done in state["ranges"]) > 0
+    for start, _, done in state["ranges"]:
+        assert data[start : start + done] == content[start : start + done]
+
+    downloader, _ = make_downloader()
+    download(downloader, media_server, target)
+    assert target.read_bytes() == content
+
+
+def test_falls_back_without_range_support(tmp_path):
+    target = tmp_path / "video.mp4"
+    with MediaServer(
+        progressive_size=SIZE,
+        progressive_count=1,
+        fragment_size=1024,
+        fragment_count=1,
+        ranges=False,
+    ) as server:
+        downloader, requested = make_downloader()
+        download(downloader, server, target)
+        content = expected_bytes(server)
+
+    assert target.read_bytes() == content
+    # Só a sondagem pediu um range: o resto foi o download normal do HttpFD
+    assert requested[0] == "bytes=0-0"
+    assert all(value in (None, "bytes=0-") for value in requested[1:])
+
+
+def test_retries_a_failed_range(media_server, tmp_path):
+    part = SIZE // 4
+    failed = f"bytes={part}-{2 * part - 1}"
+    downloader, requested = make_downloader(fail_ranges=[failed])
+    retries = []
+    downloader.report_retry = lambda err, count, total, *args: retries.append(count)
+
+    target = tmp_path / "video.mp4"
+    download(downloader, media_server, target)
+
+    assert target.read_bytes() == expected_bytes(media_server)
+    assert requested.count(failed) == 2
+    assert retries == [1]
+
+
+def test_cancel_interrupts_the_retry_wait(media_server, tmp_path):
+    part = SIZE // 4
+    failed = f"bytes={part}-{2 * part - 1}"
+    downloader, requested = make_downloader(fail_ranges=[failed])
+    token = CancelToken()
+    # Job cancelado logo depois da falha, durante a espera de 1 s do retry
+    downloader.report_retry = lambda *args: token.cancel()
+
+    target = tmp_path / "video.mp4"
+    started = time.monotonic()
+    with token.bind(), pytest.raises(DownloadCancelled):
+        download(downloader, media_server, target)
+
+    assert time.monotonic() - started < 0.9
+    assert requested.count(failed) == 1
+    assert not target.exists()
+    assert os.path.exists(f"{target}.part.ytdl")
@@ -0,0 +1,120 @@
+import os
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from modules import thumbnails as module
+from modules.thumbnails import ThumbnailCache, ThumbnailFetcher
+
+
+def png(color) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (320, 180), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def images(media_server):
+    """Thumbnails served by the media server: name -> (url, bytes)."""
+    folder = os.path.join(media_server.directory, "thumbnails")
+    os.makedirs(folder, exist_ok=True)
+    files = {
+        "red.png": png("red"),
+        "green.png": png("green"),
+        "blue.png": png("blue"),
+        "red-copy.png": png("red"),
+    }
+    for name, data in files.items():
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(data)
+    return {
+        name.split(".")[0]: (media_server.url(f"thumbnails/{name}"), data)
+        for name, data in files.items()
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Cada acesso ao cache em um instante diferente
+    now = [1_000_000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(module, "time", SimpleNamespace(time=tick))
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = ThumbnailFetcher(ThumbnailCache(str(tmp_path / "thumbnails")))
+    yield fetcher
+    fetcher.close()
+
+
+def stored_files(cache):
+    return sorted(
+        name for name in os.listdir(cache.directory) if not name.startswith("index.db")
+    )
+
+
+def rows(cache, table):
+    return cache._conn.execute(f"SELECT * FROM {table}").fetchall()
+
+
+def test_evicts_the_least_recently_used_images(fetcher, images, clock):
+    cache = fetcher.cache
+    red, green, blue = images["red"], images["green"], images["blue"]
+    # Cabem duas imagens
+    cache.max_size = len(red[1]) + len(green[1]) + len(blue[1]) - 1
+
+    assert fetcher.get(red[0]).result() is not None
+    assert fetcher.get(green[0]).result() is not None
+    assert cache.get(red[0]) == red[1]  # O vermelho volta a ser o mais recente
+    assert fetcher.get(blue[0]).result() is not None
+
+    assert cache.get(green[0]) is None
+    assert cache.get(red[0]) == red[1]
+    assert cache.get(blue[0]) == blue[1]
+    assert len(stored_files(cache)) == 2
+    assert len(rows(cache, "files")) == 2
+    assert {url for url, _ in rows(cache, "urls")} == {red[0], blue[0]}
+
+
+def test_same_image_is_stored_once(fetcher, images):
+    cache = fetcher.cache
+    fetcher.get(images["red"][0]).result()
+    fetcher.get(images["red-copy"][0]).result()
+
+    assert len(stored_files(cache)) == 1
+    assert len(rows(cache, "files")) == 1
+    assert len({digest for _, digest in rows(cache, "urls")}) == 1
+    assert cache.get(images["red-copy"][0]) == images["red"][1]
+
+
+def test_concurrent_requests_share_one_download(fetcher, images):
+    url = images["green"][0]
+    release = threading.Event()
+    downloads = []
+    download = fetcher.download
+
+    def slow_download(address):
+        downloads.append(address)
+        # Segura o download até o segundo pedido chegar
+        release.wait(5)
+        return download(address)
+
+    fetcher.download = slow_download
+    first = fetcher.get(url, duration=65)
+    second = fetcher.get(url, duration=65)
+    release.set()
+
+    assert first is second
+    assert first.result() is not None
+    assert downloads == [url]
+    # Depois de pronta, a imagem vem da memória
+    assert fetcher.get(url, duration=65).result() is first.result()
+    assert downloads == [url]
@@ -4,7 +4,7 @@ from CTkToolTip import CTkToolTip
 
 from modules import (
     get_image_path,
-    get_thumbnail_img,
+    traced,
 )
 
 from typing import TYPE_CHECKING
@@ -117,6 +117,8 @@ class AdvancedTab(ctk.CTkFrame):
 
         self.default_thumbnail = Image.open(get_image_path("photo_icon.png"))
         self.thumbnail_img = ctk.CTkImage(self.default_thumbnail, size=(160, 90))
+        # Miniatura pedida pela última busca
+        self.thumbnail_url = None
 
         self.thumbnail_label = ctk.CTkLabel(
             self.thumbnail_frame,
@@ -462,6 +464,7 @@ class AdvancedTab(ctk.CTkFrame):
 
         url = self.app.url2_var.get()
 
+        @traced("on_search_complete", "ui")
         def on_search_complete():
 
             self.app.check_errors(url, "search", self)
@@ -476,9 +479,16 @@ class AdvancedTab(ctk.CTkFrame):
             if thumbnail_url in "youtube":
                 thumbnail_url = f"https://img.youtube.com/vi/{thumbnail_url.split("?v=", 1)[1]}/mqdefault.jpg"
 
-            self.thumbnail_img.configure(
-                light_image=get_thumbnail_img(thumbnail_url, duration_url)
-            )
+            # Marcador até a miniatura chegar, baixada em segundo plano
+            self.thumbnail_url = thumbnail_url
+            self.thumbnail_img.configure(light_image=self.default_thumbnail)
+
+            def on_thumbnail_loaded(image):
+                # Uma busca mais nova já pediu outra miniatura
+                if image is not None and self.thumbnail_url == thumbnail_url:
+                    self.thumbnail_img.configure(light_image=image)
+
+            self.yt_dlp.load_thumbnail(thumbnail_url, duration_url, on_thumbnail_loaded)
 
             titulo = self.truncate_text(self.info_preview["title"])
 
@@ -489,7 +499,7 @@ class AdvancedTab(ctk.CTkFrame):
             self.details_view_label.configure(text=f"{view_count} ")
 
             desc_list = [self.translator.get_text("formats_custom")] + [
-                item["desc"] for item in self.info_presets
+                item.desc for item in self.info_presets
             ]
             self.format_presets_OptionMenu.configure(
                 values=desc_list,
@@ -501,7 +511,7 @@ class AdvancedTab(ctk.CTkFrame):
             self.format_frame.pack(side="top", fill="both", expand=True, padx=5, pady=5)
 
             resolucao = sorted(
-                {item["resolucao"] for item in self.info_presets},
+                {item.height for item in self.info_presets},
                 reverse=True,
             )
 
@@ -694,9 +704,9 @@ class AdvancedTab(ctk.CTkFrame):
         else:
             format_id = next(
                 (
-                    item["id"]
+                    item.format_id
                     for item in self.info_presets
-                    if item["desc"] == format_desc
+                    if item.desc == format_desc
                 ),
                 None,
             )
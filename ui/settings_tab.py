@@ -9,6 +9,9 @@ from modules import (
 
 
 class SettingsTab(ctk.CTkFrame):
+    # Opções do limite de velocidade, em KiB/s (0 = sem limite)
+    BANDWIDTH_VALUES = [0, 256, 512, 1024, 2048, 5120, 10240, 20480, 51200]
+
     def __init__(self, master, app, translator, user_prefer, **kwargs):
         super().__init__(master, **kwargs)
 
@@ -19,10 +22,10 @@ class SettingsTab(ctk.CTkFrame):
         self.settings_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.settings_frame.pack(fill="both", expand=True, pady=10)
 
-        self.settings_frame_top = ctk.CTkFrame(
+        self.settings_frame_top = ctk.CTkScrollableFrame(
             self.settings_frame, fg_color="transparent"
         )
-        self.settings_frame_top.pack(side="top", fill="both", padx=15)
+        self.settings_frame_top.pack(side="top", fill="both", expand=True, padx=15)
 
         self.settings_frame_bottom = ctk.CTkFrame(
             self.settings_frame, fg_color="transparent"
@@ -218,6 +221,188 @@ class SettingsTab(ctk.CTkFrame):
 
         # endregion
 
+        #! Downloads
+        # region Downloads
+        self.downloads_label = ctk.CTkLabel(
+            self.settings_frame_top,
+            text=self.translator.get_text("downloads_section"),
+            font=ctk.CTkFont(size=16, weight="bold"),
+        )
+        self.downloads_label.pack(side="top")
+
+        self.downloads_div = ctk.CTkFrame(
+            self.settings_frame_top, height=2, fg_color=("#D03434", "#A11D1D")
+        )
+        self.downloads_div.pack(side="top", fill="x")
+
+        self.downloads_frame = ctk.CTkFrame(
+            self.settings_frame_top, fg_color="transparent"
+        )
+        self.downloads_frame.pack(side="top", fill="x", pady=10)
+
+        # Downloads simultâneos
+        self.max_downloads_frame = ctk.CTkFrame(
+            self.downloads_frame, fg_color="transparent"
+        )
+        self.max_downloads_frame.pack(side="left", expand=True)
+
+        self.max_downloads_label = ctk.CTkLabel(
+            self.max_downloads_frame,
+            text=self.translator.get_text("max_concurrent_downloads") + ":",
+            anchor="e",
+        )
+        self.max_downloads_label.pack(side="left")
+
+        self.max_downloads_var = ctk.StringVar(
+            value=str(self.user_prefer.get("max_concurrent_downloads"))
+        )
+        self.max_downloads_dropdown = ctk.CTkOptionMenu(
+            self.max_downloads_frame,
+            values=[str(n) for n in range(1, 7)],
+            variable=self.max_downloads_var,
+            command=lambda value: self.app.yt_dlp.set_max_workers(int(value)),
+            width=60,
+        )
+        self.max_downloads_dropdown.pack(side="left", padx=(5, 0))
+
+        self.max_downloads_tooltip = CTkToolTip(
+            self.max_downloads_dropdown,
+            justify="left",
+            padding=(10, 10),
+            border_width=1,
+            x_offset=-50,
+            follow=False,
+            message=self.translator.get_text("max_concurrent_downloads_tooltip"),
+        )
+
+        # Itens da playlist em paralelo
+        self.playlist_workers_frame = ctk.CTkFrame(
+            self.downloads_frame, fg_color="transparent"
+        )
+        self.playlist_workers_frame.pack(side="left", expand=True)
+
+        self.playlist_workers_label = ctk.CTkLabel(
+            self.playlist_workers_frame,
+            text=self.translator.get_text("playlist_workers") + ":",
+            anchor="e",
+        )
+        self.playlist_workers_label.pack(side="left")
+
+        self.playlist_workers_var = ctk.StringVar(
+            value=str(self.user_prefer.get("playlist_workers"))
+        )
+        self.playlist_workers_dropdown = ctk.CTkOptionMenu(
+            self.playlist_workers_frame,
+            values=[str(n) for n in range(1, 9)],
+            variable=self.playlist_workers_var,
+            command=lambda value: self.app.yt_dlp.set_playlist_workers(int(value)),
+            width=60,
+        )
+        self.playlist_workers_dropdown.pack(side="left", padx=(5, 0))
+
+        self.playlist_workers_tooltip = CTkToolTip(
+            self.playlist_workers_dropdown,
+            justify="left",
+            padding=(10, 10),
+            border_width=1,
+            x_offset=-50,
+            follow=False,
+            message=self.translator.get_text("playlist_workers_tooltip"),
+        )
+
+        self.downloads_frame_bottom = ctk.CTkFrame(
+            self.settings_frame_top, fg_color="transparent"
+        )
+        self.downloads_frame_bottom.pack(side="top", fill="x", pady=(0, 10))
+
+        # Limite de velocidade total
+        self.bandwidth_frame = ctk.CTkFrame(
+            self.downloads_frame_bottom, fg_color="transparent"
+        )
+        self.bandwidth_frame.pack(side="left", expand=True)
+
+        self.bandwidth_label = ctk.CTkLabel(
+            self.bandwidth_frame,
+            text=self.translator.get_text("bandwidth_limit") + ":",
+            anchor="e",
+        )
+        self.bandwidth_label.pack(side="left")
+
+        self.bandwidth_var = ctk.StringVar(
+            value=self.bandwidth_text(self.user_prefer.get("bandwidth_limit"))
+        )
+        self.bandwidth_dropdown = ctk.CTkOptionMenu(
+            self.bandwidth_frame,
+            values=[self.bandwidth_text(value) for value in self.BANDWIDTH_VALUES],
+            variable=self.bandwidth_var,
+            command=lambda value: self.app.yt_dlp.set_bandwidth_limit(
+                self.bandwidth_value()
+            ),
+            width=110,
+        )
+        self.bandwidth_dropdown.pack(side="left", padx=(5, 0))
+
+        self.bandwidth_tooltip = CTkToolTip(
+            self.bandwidth_dropdown,
+            justify="left",
+            padding=(10, 10),
+            border_width=1,
+            x_offset=-50,
+            follow=False,
+            message=self.translator.get_text("bandwidth_limit_tooltip"),
+        )
+
+        # Pular vídeos já baixados
+        self.use_archive_var = ctk.BooleanVar(
+            value=self.user_prefer.get("use_download_archive")
+        )
+        self.use_archive_checkbox = ctk.CTkCheckBox(
+            self.downloads_frame_bottom,
+            text=self.translator.get_text("check_use_archive"),
+            variable=self.use_archive_var,
+            onvalue=True,
+            offvalue=False,
+            command=lambda: self.app.yt_dlp.set_use_archive(self.use_archive_var.get()),
+        )
+        self.use_archive_checkbox.pack(side="left", expand=True)
+
+        self.use_archive_tooltip = CTkToolTip(
+            self.use_archive_checkbox,
+            justify="left",
+            padding=(10, 10),
+            border_width=1,
+            x_offset=-50,
+            follow=False,
+            message=self.translator.get_text("check_use_archive_tooltip"),
+        )
+
+        # Rodar as buscas e downloads em processos separados
+        self.process_workers_var = ctk.BooleanVar(
+            value=self.user_prefer.get("worker_mode") == "process"
+        )
+        self.process_workers_checkbox = ctk.CTkCheckBox(
+            self.downloads_frame_bottom,
+            text=self.translator.get_text("check_process_workers"),
+            variable=self.process_workers_var,
+            onvalue=True,
+            offvalue=False,
+            command=lambda: self.app.yt_dlp.set_worker_mode(
+                "process" if self.process_workers_var.get() else "thread"
+            ),
+        )
+        self.process_workers_checkbox.pack(side="left", expand=True)
+
+        self.process_workers_tooltip = CTkToolTip(
+            self.process_workers_checkbox,
+            justify="left",
+            padding=(10, 10),
+            border_width=1,
+            x_offset=-50,
+            follow=False,
+            message=self.translator.get_text("check_process_workers_tooltip"),
+        )
+        # endregion
+
         #! Caminhos Padrão
         # region Default Paths
         self.default_label = ctk.CTkLabel(
@@ -343,6 +528,21 @@ class SettingsTab(ctk.CTkFrame):
             self.ffmpeg_path_entry.delete(0, "end")
             self.ffmpeg_path_entry.insert(0, file_path)
 
+    def bandwidth_text(self, value: int) -> str:
+        if not value:
+            return self.translator.get_text("unlimited")
+        if value < 1024:
+            return f"{value} KB/s"
+        return f"{value // 1024} MB/s"
+
+    def bandwidth_value(self) -> int:
+        """Returns the selected speed limit in KiB/s."""
+        text = self.bandwidth_var.get().split()
+        if len(text) != 2 or not text[0].isdigit():
+            return 0
+        value = int(text[0])
+        return value * 1024 if text[1] == "MB/s" else value
+
     def reset_settings(self):
         """Reseta todas as configurações para os valores padrão"""
         title = self.translator.get_text("popup_reset_title")
@@ -383,6 +583,24 @@ class SettingsTab(ctk.CTkFrame):
             self.clear_url_var.set(self.user_prefer.get("clear_url"))
             self.open_folder_var.set(self.user_prefer.get("open_folder"))
             self.notify_completed_var.set(self.user_prefer.get("notify_completed"))
+            self.max_downloads_var.set(
+                str(self.user_prefer.get("max_concurrent_downloads"))
+            )
+            self.app.yt_dlp.set_max_workers(
+                self.user_prefer.get("max_concurrent_downloads")
+            )
+            self.playlist_workers_var.set(str(self.user_prefer.get("playlist_workers")))
+            self.app.yt_dlp.set_playlist_workers(
+                self.user_prefer.get("playlist_workers")
+            )
+            self.use_archive_var.set(self.user_prefer.get("use_download_archive"))
+            self.app.yt_dlp.set_use_archive(self.user_prefer.get("use_download_archive"))
+            self.bandwidth_var.set(
+                self.bandwidth_text(self.user_prefer.get("bandwidth_limit"))
+            )
+            self.app.yt_dlp.set_bandwidth_limit(self.user_prefer.get("bandwidth_limit"))
+            self.process_workers_var.set(self.user_prefer.get("worker_mode") == "process")
+            self.app.yt_dlp.set_worker_mode(self.user_prefer.get("worker_mode"))
 
             # Atualizar os caminhos
             self.ffmpeg_path_entry.delete(0, "end")
@@ -447,6 +665,45 @@ class SettingsTab(ctk.CTkFrame):
             message=self.translator.get_text("check_notify_completed_tooltip")
         )
 
+        self.downloads_label.configure(
+            text=self.translator.get_text("downloads_section")
+        )
+        self.max_downloads_label.configure(
+            text=self.translator.get_text("max_concurrent_downloads") + ":"
+        )
+        self.max_downloads_tooltip.configure(
+            message=self.translator.get_text("max_concurrent_downloads_tooltip")
+        )
+        self.playlist_workers_label.configure(
+            text=self.translator.get_text("playlist_workers") + ":"
+        )
+        self.playlist_workers_tooltip.configure(
+            message=self.translator.get_text("playlist_workers_tooltip")
+        )
+        self.bandwidth_label.configure(
+            text=self.translator.get_text("bandwidth_limit") + ":"
+        )
+        self.bandwidth_tooltip.configure(
+            message=self.translator.get_text("bandwidth_limit_tooltip")
+        )
+        bandwidth_limit = self.bandwidth_value()
+        self.bandwidth_dropdown.configure(
+            values=[self.bandwidth_text(value) for value in self.BANDWIDTH_VALUES]
+        )
+        self.bandwidth_var.set(self.bandwidth_text(bandwidth_limit))
+        self.use_archive_checkbox.configure(
+            text=self.translator.get_text("check_use_archive")
+        )
+        self.use_archive_tooltip.configure(
+            message=self.translator.get_text("check_use_archive_tooltip")
+        )
+        self.process_workers_checkbox.configure(
+            text=self.translator.get_text("check_process_workers")
+        )
+        self.process_workers_tooltip.configure(
+            message=self.translator.get_text("check_process_workers_tooltip")
+        )
+
         self.default_label.configure(text=self.translator.get_text("default_paths"))
         self.ffmpeg_path_entry.configure(
             placeholder_text=self.translator.get_text("exe_path")